@@ -6,21 +6,156 @@ Created on Wed Jul 15 22:42:22 2020
 """
 
 import concurrent.futures
-import time
+import csv
+import multiprocessing
+import os
+import sqlite3
 import sys
+import threading
+import time
 
-import pandas as pd
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows
+    fcntl = None
 
 from optimizationModel import OptSys
 from datetime import datetime
 from logManager import LogManager
 
 logManager = LogManager()
-logger_main = logManager.setup_logger()
-logger_run =  logManager.setup_logger(name='logger_run', log_file='log_run.txt', level=None)
+_loggers = None
+
+
+def _get_loggers():
+    # Set up loggers on first use instead of on import, so spawned workers do not pay for it during unpickling
+    global _loggers
+    if _loggers is None:
+        _loggers = (logManager.setup_logger(), logManager.setup_logger(name='logger_run', log_file='log_run.txt', level=None))
+    return _loggers
+
+
+# Scenario matrix of format:
+#   # Scenario matrix
+#   Name	Status
+#   sce_1	pending
+#   sce_2	running
+#   sce_3	finished
+# The text file is the user input and a human readable mirror, the work queue itself lives in the database
+matrix_file = 'scenario_matrix.txt'
+matrix_header = '# Scenario matrix (pending, running, finished, error)\n'
+db_file = 'scenarios.db'
+lock_file = 'scenario_matrix.lock'
+status_width = len('finished')
+# Running scenarios without heartbeat for stale_timeout seconds are claimed again
+heartbeat_interval = 30
+stale_timeout = 300
+
+
+def connect_db():
+    # Autocommit mode, transactions are opened explicitly where needed
+    con = sqlite3.connect(db_file, timeout=5, isolation_level=None)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('PRAGMA synchronous=NORMAL')
+    con.execute('PRAGMA busy_timeout=5000')
+    return con
+
+
+def init_scenario_db():
+    # Load scenario matrix into the database, status of the text file is leading
+    with open(matrix_file, newline='') as f:
+        f.readline()
+        scenario_matrix = [(row['Name'], row['Status'].strip()) for row in csv.DictReader(f, delimiter='\t')]
+
+    # Running scenarios of the text file get no heartbeat and are therefore claimed again
+    con = connect_db()
+    con.execute('BEGIN IMMEDIATE')
+    con.execute('DROP TABLE IF EXISTS scenarios')
+    con.execute('CREATE TABLE scenarios (name TEXT PRIMARY KEY, status TEXT, heartbeat REAL, owner TEXT)')
+    # Index on status so the claim finds the next pending scenario without scanning the table
+    con.execute('CREATE INDEX scenarios_status ON scenarios (status)')
+    con.executemany('INSERT INTO scenarios (name, status) VALUES (?, ?)', scenario_matrix)
+    con.execute('COMMIT')
+    write_scenario_matrix(con)
+    con.close()
+
+
+def claim_scenario(con, owner):
+    # Atomically take the next pending or stale running scenario for owner, returns None if there is none
+    # The database acts as the shared queue, unlike an in-memory queue the state survives a crash of the coordinator
+    now = time.time()
+    con.execute('BEGIN IMMEDIATE')
+    row = con.execute("UPDATE scenarios SET status='running', heartbeat=?, owner=? WHERE name=("
+                      "SELECT name FROM scenarios WHERE status='pending' OR (status='running' AND (heartbeat IS NULL OR heartbeat<?)) LIMIT 1"
+                      ") RETURNING name", (now, owner, now - stale_timeout)).fetchone()
+    con.execute('COMMIT')
+    return row[0] if row is not None else None
+
+
+def set_status(con, sce, status, owner):
+    # Update status of the running scenario, returns False if owner lost the claim to another instance
+    cur = con.execute("UPDATE scenarios SET status=? WHERE name=? AND status='running' AND owner=?", (status, sce, owner))
+    return cur.rowcount > 0
+
+
+def heartbeat(sce, owner, stop):
+    # Refresh heartbeat of the running scenario until stop is set, uses its own connection as it runs in a thread
+    # Errors are logged and retried at the next interval, a missed heartbeat only risks the scenario being claimed again
+    logger_main, _ = _get_loggers()
+    con = connect_db()
+    while not stop.wait(heartbeat_interval):
+        try:
+            con.execute('UPDATE scenarios SET heartbeat=? WHERE name=? AND owner=?', (time.time(), sce, owner))
+        except sqlite3.Error:
+            logger_main.exception('heartbeat: Refresh of scenario %s failed', sce)
+    con.close()
+
+
+def write_scenario_matrix(con):
+    # Mirror database to the text file for monitoring, status is padded to a fixed width so it can be patched in place
+    scenario_matrix = con.execute('SELECT name, status FROM scenarios ORDER BY rowid').fetchall()
+    # Write to a temporary file and rename, so readers never see a partially written matrix
+    tmp_file = matrix_file + '.tmp'
+    with open(tmp_file, 'w', newline='') as f:
+        f.write(matrix_header)
+        w = csv.writer(f, delimiter='\t', lineterminator='\n')
+        w.writerow(['Name', 'Status'])
+        w.writerows((sce, status.ljust(status_width)) for sce, status in scenario_matrix)
+    os.replace(tmp_file, matrix_file)
+
+
+def read_status_offsets():
+    # Byte offset of the status field of every scenario in the text file
+    offsets = {}
+    pos = 0
+    with open(matrix_file, 'rb') as f:
+        lines = f.readlines()
+    for i, line in enumerate(lines):
+        if i > 1:
+            sce = line.split(b'\t')[0]
+            offsets[sce.decode()] = pos + len(sce) + 1
+        pos += len(line)
+    return offsets
+
+
+def patch_scenario_matrix(offsets, sce, status):
+    # Overwrite only the status field of the scenario in the text file
+    # Several workers may write at the same time, serialize them with an advisory lock if available
+    with open(lock_file, 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(matrix_file, 'r+b') as f:
+                f.seek(offsets[sce])
+                f.write(status.ljust(status_width).encode())
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
 
 
 def optimization_coordinator(n_parallel=1):
+    logger_main, logger_run = _get_loggers()
     start = datetime.now()
     max_workers = 20
 
@@ -28,71 +163,82 @@ def optimization_coordinator(n_parallel=1):
         n_parallel = max_workers
         logger_main.info('optimization_coordinator: reduce parallel processes to max_workers')
 
-    logger_run.info('optimization_coordinator: Starting {} processes'.format(n_parallel))
+    init_scenario_db()
 
-    results = []
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        for i  in range(n_parallel):
-            # Start optimization instance and wait to avoid overlapping
-            results.append(executor.submit(optimization_instance, i))
-            time.sleep(5)
+    logger_run.info('optimization_coordinator: Starting %s processes', n_parallel)
+
+    # Processes instead of threads: building and postprocessing the pyomo model is pure python and holds the GIL,
+    # only the glpk solve itself runs in an external process
+    # forkserver imports the heavy modules once and forks the workers from that process, not available on Windows
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(['pandas', 'numpy', 'optimizationModel'])
+    else:
+        ctx = None
 
-        for f in concurrent.futures.as_completed(results):
-            logger_main.info('Parallel process terminated: {}'.format(f.result()))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_parallel, mp_context=ctx) as executor:
+        # Start optimization instances, scenarios are claimed atomically so no stagger is needed
+        for res in executor.map(optimization_instance, range(n_parallel)):
+            logger_main.info('Parallel process terminated: %s', res)
 
     dt = datetime.now() - start
-    logger_run.info('optimization_coordinator: Finished all processes after {}min {}sec'.format(int(dt.total_seconds()/60), round(dt.total_seconds()%60)))
+    logger_run.info('optimization_coordinator: Finished all processes after %smin %ssec', int(dt.total_seconds()/60), round(dt.total_seconds()%60))
 
 
 def optimization_instance(name):
+    logger_main, logger_run = _get_loggers()
 
-    # Read scenario matrix of format:
-    #   # Scenario matrix
-    #   Name	Status
-    #   sce_1	pending
-    #   sce_2	running
-    #   sce_3	finished
-    file_name = 'scenario_matrix.txt'
-    table_header = '# Scenario matrix (pending, running, finished, error)\n'
+    con = connect_db()
+    offsets = read_status_offsets()
+    # Mirror updates run in the background so the next optimization is not delayed by file I/O
+    io_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    # Identifies the claims of this instance, so a scenario taken over after a stale heartbeat is not updated twice
+    owner = '%s-%s' % (name, os.getpid())
+    mirror_writes = []
 
     while True:
 
-        # Read next scenario
-        logger_main.info('optimization_instance_{}: Read scenario matrix'.format(name))
-        scenario_matrix = pd.read_csv(file_name, sep='\t', skiprows=1)
-        sce_pending = scenario_matrix.loc[scenario_matrix.loc[:,'Status'] == 'pending', 'Name'].values
-        if len(sce_pending) == 0:
-            logger_main.info('optimization_instance_{}: No pending scenario'.format(name))
+        # Claim next scenario -> running
+        logger_main.info('optimization_instance_%s: Claim scenario', name)
+        sce = claim_scenario(con, owner)
+        if sce is None:
+            logger_main.info('optimization_instance_%s: No pending scenario', name)
             break
-        else:
-            sce = sce_pending[0]
-
-        # Update scenario -> running
-        logger_main.info('optimization_instance_{}: Update scenario matrix'.format(name))
-        scenario_matrix.loc[scenario_matrix.loc[:,'Name'] == sce, 'Status'] = 'running'
-
-        f = open(file_name, 'w')
-        f.write(table_header)
-        scenario_matrix.to_csv(f, sep='\t', index=False, line_terminator='\n')
-        f.close()
+        mirror_writes.append(io_executor.submit(patch_scenario_matrix, offsets, sce, 'running'))
 
         # Start optimization of scenario
-        logger_run.info('optimization_instance_{}: Start optimization of scenario {}'.format(name, sce))
-        res = OptSys.optimize(scenario=sce)
+        logger_run.info('optimization_instance_%s: Start optimization of scenario %s', name, sce)
+        stop = threading.Event()
+        heartbeat_thread = threading.Thread(target=heartbeat, args=(sce, owner, stop), daemon=True)
+        heartbeat_thread.start()
+        try:
+            res = OptSys.optimize(scenario=sce)
+        except Exception:
+            logger_main.exception('optimization_instance_%s: Optimization of scenario %s failed', name, sce)
+            res = None
+        finally:
+            stop.set()
+            heartbeat_thread.join()
 
 
 # Update text fiel automatically in notepad++: https://www.raymond.cc/blog/monitor-log-or-text-file-changes-in-real-time-with-notepad/
 
         # Update scenario -> finished
-        logger_main.info('optimization_instance_{}: Update scenario matrix'.format(name, sce))
-        scenario_matrix = pd.read_csv(file_name, sep='\t', skiprows=1)
-        scenario_matrix.loc[scenario_matrix.loc[:,'Name'] == sce, 'Status'] = 'finished' if res == 1 else 'error'
-        f = open(file_name, 'w')
-        f.write(table_header)
-        scenario_matrix.to_csv(f, sep='\t', index=False, line_terminator='\n')
-        f.close()
-
-    logger_main.info('optimization_instance_{}: Closed optimization instance'.format(name))
+        logger_main.info('optimization_instance_%s: Update scenario %s', name, sce)
+        status = 'finished' if res == 1 else 'error'
+        if set_status(con, sce, status, owner):
+            mirror_writes.append(io_executor.submit(patch_scenario_matrix, offsets, sce, status))
+        else:
+            logger_main.warning('optimization_instance_%s: Scenario %s was claimed by another instance, status not updated', name, sce)
+
+    # Errors of the mirror updates are only reported, the database stays the valid state
+    for future in mirror_writes:
+        exc = future.exception()
+        if exc is not None:
+            logger_main.error('optimization_instance_%s: Updating %s failed: %r', name, matrix_file, exc)
+    io_executor.shutdown(wait=True)
+    con.close()
+    logger_main.info('optimization_instance_%s: Closed optimization instance', name)
 
     return 'optimization_instance_{}'.format(name)
 
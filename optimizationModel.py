@@ -7,8 +7,12 @@ Created on Fri Aug 23 10:29:01 2019
 
 import this is worng
 
-import cloudpickle
+import csv
+import io
+import itertools
 import numpy as np
+import os
+import pickle
 import pandas as pd
 
 from datetime import datetime
@@ -16,22 +20,24 @@ from logManager import LogManager
 
 import pyomo.environ as pyo
 from pyomo.opt import SolverFactory
+from pyomo.common.timing import report_timing
+from pyomo.core.expr.numeric_expr import LinearExpression
 
 # Setup two loggers
 logManager = LogManager()
 logger_main = logManager.setup_logger()
 logger_run =  logManager.setup_logger(name='logger_run', log_file='log_run.txt', level=None)
 
+# File buffer for model pickles [bytes], pickle reads and writes the stream in many small pieces
+pickle_buffer = 1 << 20
+
 """
 OptSys: Linear Optimization
 """
 
 class OptSys:
 
-    def __init__(self, scenario='', fixed=False, pickle_model=False, write_lp=False, unitConv=None, start_disc=None):
-        # Initiation of class
-        LogManager()
-
+    def __init__(self, scenario='', fixed=False, pickle_model=False, write_lp=False, unitConv=None, start_disc=None, save_method='pickle'):
         # Naming convention
         self.pre_input = '0_'
         self.pre_output = '1_'
@@ -64,6 +70,10 @@ class OptSys:
         else:
             self.pickle_model = False
 
+        # Save method for separate postprocessing:
+        # 'pickle' stores the whole instance, 'values' stores only the solution values and rebuilds the instance from the input data
+        self.save_method = save_method
+
         # Enable/disable writting the LP file (for debugging)
         if write_lp:
             self.write_lp = True
@@ -71,6 +81,9 @@ class OptSys:
         else:
             self.write_lp = False
 
+        # Enable/disable profiling of model construction (in debugging mode or with environment variable OPTSYS_PROFILE)
+        self.profile = self.write_lp or bool(os.environ.get('OPTSYS_PROFILE'))
+
         # Unit conversion
         if unitConv == None:
             self.unitConv = {'kW':       {'newUnit': 'MW',       'conv': 1/1000},
@@ -90,6 +103,8 @@ class OptSys:
                                'opex':   1}
         else:
             self.start_disc = start_disc
+        # Discount factors per year, shared by all calc_disc_opex* calls
+        self.disc_cache = {}
 
 
     def build_model(self):
@@ -110,14 +125,14 @@ class OptSys:
 
         # Abstract model
         step = 1
-        logger_main.info('{}/{}: Declare abstract model'.format(step, total_steps))
+        logger_main.info('%d/%d: Declare abstract model', step, total_steps)
         m = pyo.AbstractModel()
 
         # ---------------------------------------------------------------------
 		# Initialise sets -----------------------------------------------------
         # ---------------------------------------------------------------------
         step += 1
-        logger_main.info('{}/{}: Initialise sets'.format(step, total_steps))
+        logger_main.info('%d/%d: Initialise sets', step, total_steps)
 
         # Temporal sets
         m.SubHour = pyo.Set()
@@ -136,8 +151,12 @@ class OptSys:
         # Technology sets
         m.Tech = pyo.Set()
         m.StorageTech = pyo.Set(within=m.Tech)
+        # Cached complement of StorageTech, the set difference would be materialized again on every use
+        m.NonStorageTech = pyo.Set(within=m.Tech, initialize=lambda m: [T for T in m.Tech if T not in m.StorageTech])
         m.PartLoadTech = pyo.Set(within=m.Tech)
         m.ExternalTech = pyo.Set()
+        # Cached union of Tech and ExternalTech for cost components
+        m.AllTech = pyo.Set(initialize=lambda m: list(m.Tech) + [T for T in m.ExternalTech if T not in m.Tech])
 
         # Nodes
         m.Node = pyo.Set()
@@ -161,25 +180,25 @@ class OptSys:
         # Initialise parameters -----------------------------------------------
         # ---------------------------------------------------------------------
         step += 1
-        logger_main.info('{}/{}: Initialise parameters'.format(step, total_steps))
+        logger_main.info('%d/%d: Initialise parameters', step, total_steps)
 
         # Slack switch [-] -> include slack variables = 1
-        m.Slack_switch = pyo.Param(within=pyo.Binary, default=1)
+        m.Slack_switch = pyo.Param(within=pyo.Binary, default=1, mutable=False)
 
         # Slack variable costs [EUR/kWh]
-        m.F_slack_costs = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeReals, default=1e4)
+        m.F_slack_costs = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeReals, default=1e4, mutable=False)
 
         # Subsidy of CAPEX [EUR]
-        m.Subsidy_CAPEX = pyo.Param(within=pyo.NonPositiveReals, default=-0.0)
+        m.Subsidy_CAPEX = pyo.Param(within=pyo.NonPositiveReals, default=-0.0, mutable=False)
 
         # Project margin specific [EUR/kW]
-        m.Project_margin_spec = pyo.Param(within=pyo.NonNegativeReals, default=0.0)
+        m.Project_margin_spec = pyo.Param(within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Taxes for OPEX [-]
-        m.Taxes = pyo.Param(within=pyo.NonNegativeReals, default=0.0)
+        m.Taxes = pyo.Param(within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Specific energy [kWh/kg]
-        m.Spec_energy = pyo.Param(m.Fuel1, within=pyo.NonNegativeReals, default=0)
+        m.Spec_energy = pyo.Param(m.Fuel1, within=pyo.NonNegativeReals, default=0, mutable=False)
 
         # Unit of fuel
         m.F_unit = pyo.Param(m.Fuel1)
@@ -191,275 +210,285 @@ class OptSys:
         m.St_unit = pyo.Param(m.StorageTech)
 
         # Energy input [-]
-        m.E_input = pyo.Param(m.Tech, m.Fuel, within=pyo.Binary, default=0)
+        m.E_input = pyo.Param(m.Tech, m.Fuel, within=pyo.Binary, default=0, mutable=False)
 
         # Energy output [-]
-        m.E_output = pyo.Param(m.Tech, m.Fuel1, within=pyo.Binary, default=0)
+        m.E_output = pyo.Param(m.Tech, m.Fuel1, within=pyo.Binary, default=0, mutable=False)
 
         # Refer installed capacity to input fuel, else to output fuel
-        m.Cap_of_input = pyo.Param(m.Tech - m.StorageTech, within=pyo.Binary, default=0)
+        m.Cap_of_input = pyo.Param(m.NonStorageTech, within=pyo.Binary, default=0, mutable=False)
 
         # Fuel substitutes [-]
-        m.F_subst = pyo.Param(m.Fuel, m.Fuel1, within=pyo.Binary, default=0)
+        m.F_subst = pyo.Param(m.Fuel, m.Fuel1, within=pyo.Binary, default=0, mutable=False)
 
         # Year steps [y]
-        m.Delta_Y = pyo.Param(within=pyo.NonNegativeIntegers, default=1)
+        m.Delta_Y = pyo.Param(within=pyo.NonNegativeIntegers, default=1, mutable=False)
 
         # Day steps [d]
-        m.Delta_D = pyo.Param(within=pyo.NonNegativeIntegers, default=1)
+        m.Delta_D = pyo.Param(within=pyo.NonNegativeIntegers, default=1, mutable=False)
 
         # Hour steps [h]
-        m.Delta_H = pyo.Param(within=pyo.NonNegativeIntegers, default=1)
+        m.Delta_H = pyo.Param(within=pyo.NonNegativeIntegers, default=1, mutable=False)
 
         # SubHour steps []
-        m.Delta_sH = pyo.Param(within=pyo.NonNegativeIntegers, default=1)
+        m.Delta_sH = pyo.Param(within=pyo.NonNegativeIntegers, default=1, mutable=False)
 
         # Year start [y]
-        m.Y_start = pyo.Param(within=pyo.NonNegativeIntegers, default=1)
+        m.Y_start = pyo.Param(within=pyo.NonNegativeIntegers, default=1, mutable=False)
 
         # Scale simulation time range to project time range (wrt. opex, capex)
-        m.Scale_Y_to = pyo.Param(within=pyo.NonNegativeIntegers, default=1)
-        m.Scale_D_to = pyo.Param(within=pyo.NonNegativeIntegers, default=365)
-        m.Scale_H_to = pyo.Param(within=pyo.NonNegativeIntegers, default=24)
+        m.Scale_Y_to = pyo.Param(within=pyo.NonNegativeIntegers, default=1, mutable=False)
+        m.Scale_D_to = pyo.Param(within=pyo.NonNegativeIntegers, default=365, mutable=False)
+        m.Scale_H_to = pyo.Param(within=pyo.NonNegativeIntegers, default=24, mutable=False)
 
         # Fuel demand [kWh]
-        m.F_demand = pyo.Param(m.Node, m.Fuel, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.NonNegativeReals, default=0.0)
+        m.F_demand = pyo.Param(m.Node, m.Fuel, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Fixed electricity demand profiles (eg. constant self-consumption of technologies) [kWh/h]
-        m.F_edp = pyo.Param(m.Node, m.Tech, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.NonNegativeReals, default=0.0)
+        m.F_edp = pyo.Param(m.Node, m.Tech, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Variable electricity demand profiles (eg. self-consumption of wind turbines) [kWh/kW/h]
-        m.V_edp = pyo.Param(m.Node, m.Tech, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.NonNegativeReals, default=0.0)
+        m.V_edp = pyo.Param(m.Node, m.Tech, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Aux. electricity consumption [kW_el/kW_fp] (per kW fuel production)
-        m.Aux_ed = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0.0)
+        m.Aux_ed = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0.0, mutable=False)
         # Unit capacity switch: 0=disabled / 1=enabled
 
         # Unit capacity switch [-] -> constraint capacity to integer multiples of unit = 1
-        m.Unit_cap_switch = pyo.Param(within=pyo.Binary, default=0)
+        m.Unit_cap_switch = pyo.Param(within=pyo.Binary, default=0, mutable=False)
 
         # Unit capacity of technology [kW]
-        m.Unit_cap = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=1)
+        m.Unit_cap = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=1, mutable=False)
 
         # Unit volume of storage technology [kWh]
-        m.Unit_volume = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=1)
+        m.Unit_volume = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=1, mutable=False)
 
         # Max and min  added capacity of technologies [kW]
-        m.Max_cap_add = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=infinity)
-        m.Min_cap_add = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_cap_add = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=infinity, mutable=False)
+        m.Min_cap_add = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max and min  sub capacity of technologies [kW]
-        m.Max_cap_sub= pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=infinity)
-        m.Min_cap_sub = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_cap_sub= pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=infinity, mutable=False)
+        m.Min_cap_sub = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max and min installable capacity of technologies [kW]
-        m.Max_inst_cap = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=infinity)
-        m.Min_inst_cap = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_inst_cap = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=infinity, mutable=False)
+        m.Min_inst_cap = pyo.Param(m.Node, m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max and min installable capacity combined of certain technologies [kW]
-        m.Max_inst_cap_combined = pyo.Param(m.Node, m.Year_All, within=pyo.NonNegativeReals, default=infinity)
-        m.Min_inst_cap_combined = pyo.Param(m.Node, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_inst_cap_combined = pyo.Param(m.Node, m.Year_All, within=pyo.NonNegativeReals, default=infinity, mutable=False)
+        m.Min_inst_cap_combined = pyo.Param(m.Node, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Technologies for combined capacity constraint [1]
-        m.Capacity_constraint_tech = pyo.Param(m.Tech, within=pyo.Binary, default=0)
+        m.Capacity_constraint_tech = pyo.Param(m.Tech, within=pyo.Binary, default=0, mutable=False)
 
         # Available area [m2]
-        m.Max_area = pyo.Param(m.Node, m.Year_All, within=pyo.NonNegativeReals, default=infinity)
+        m.Max_area = pyo.Param(m.Node, m.Year_All, within=pyo.NonNegativeReals, default=infinity, mutable=False)
 
         # Land use of tech [m2/kW] / [m2/kWh]
-        m.Land_use = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0.0)
+        m.Land_use = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max and min added volume of storage technologies [kWh]
-        m.Max_storage_vol_add = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=infinity)
-        m.Min_storage_vol_add = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_storage_vol_add = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=infinity, mutable=False)
+        m.Min_storage_vol_add = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max and min  sub capacity of technologies [kWh]
-        m.Max_storage_vol_sub= pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=infinity)
-        m.Min_storage_vol_sub = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_storage_vol_sub= pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=infinity, mutable=False)
+        m.Min_storage_vol_sub = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max and min installable storage volume of storage technologies [kWh]
-        m.Max_inst_storage_vol = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=infinity)
-        m.Min_inst_storage_vol = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_inst_storage_vol = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=infinity, mutable=False)
+        m.Min_inst_storage_vol = pyo.Param(m.Node, m.StorageTech, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max and min storage level [-]
-        m.Max_storage_level = pyo.Param(m.Node, m.StorageTech, within=pyo.NonNegativeReals, default=1.0)
-        m.Min_storage_level = pyo.Param(m.Node, m.StorageTech, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_storage_level = pyo.Param(m.Node, m.StorageTech, within=pyo.NonNegativeReals, default=1.0, mutable=False)
+        m.Min_storage_level = pyo.Param(m.Node, m.StorageTech, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Usable storage volume ratio [-]
-        m.Availability_storage_vol = pyo.Param(m.StorageTech, within=pyo.NonNegativeReals, default=1.0)
+        m.Availability_storage_vol = pyo.Param(m.StorageTech, within=pyo.NonNegativeReals, default=1.0, mutable=False)
 
         # Ratio of storage power capacity to energy capacity [kW/kWh]
         #m.Storage_capacity_ratio = pyo.Param(m.StorageTech, within=pyo.NonNegativeReals, default=1.0)
 
 # NEW
         # Energy-to-power ratio [h] ('0' disables contraint, default = 0) {NonNegativeReals}
-        m.Energy_power_ratio = pyo.Param(m.StorageTech, within=pyo.NonNegativeReals, default=0)
+        m.Energy_power_ratio = pyo.Param(m.StorageTech, within=pyo.NonNegativeReals, default=0, mutable=False)
 
         # Incentive for high storage level, will be substracted in the end [EUR/ F_unit]
-        m.High_storage_level_incentive = pyo.Param(m.StorageTech, within=pyo.NonNegativeReals, default=0)
+        m.High_storage_level_incentive = pyo.Param(m.StorageTech, within=pyo.NonNegativeReals, default=0, mutable=False)
 
         # Min reserve storage volume [kWh]
-        m.Min_energy_reserve = pyo.Param(m.Node, m.StorageTech, m.Fuel, within=pyo.NonNegativeReals, default=0.0)
+        m.Min_energy_reserve = pyo.Param(m.Node, m.StorageTech, m.Fuel, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Window of rolling reserve capacity [h]
-        m.Window_rolling_reserve = pyo.Param(m.Node, m.StorageTech, m.Fuel, within=pyo.NonNegativeIntegers, default=0)
+        m.Window_rolling_reserve = pyo.Param(m.Node, m.StorageTech, m.Fuel, within=pyo.NonNegativeIntegers, default=0, mutable=False)
 
         # Security factor for rolling reserve [1]
-        m.F_rolling_reserve = pyo.Param(m.Node, m.StorageTech, m.Fuel, within=pyo.NonNegativeReals, default=1.0)
+        m.F_rolling_reserve = pyo.Param(m.Node, m.StorageTech, m.Fuel, within=pyo.NonNegativeReals, default=1.0, mutable=False)
 
 
 # TODO ...
 # set up start_storage_level as variable and equal to finish storage level
-        m.Start_storage_level = pyo.Param(m.Node, m.StorageTech,  within=pyo.NonNegativeReals, default=0.5)
+        m.Start_storage_level = pyo.Param(m.Node, m.StorageTech,  within=pyo.NonNegativeReals, default=0.5, mutable=False)
 
         # Efficiencies [-]
-        m.Eff = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0)
+        m.Eff = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0, mutable=False)
 
         # Part load at max. efficiency of technology [-]
-        m.Part_load_max_eff = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0)
+        m.Part_load_max_eff = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0, mutable=False)
 
         # Part load at bend point [-]
-        m.Part_load_bend = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0)
+        m.Part_load_bend = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0, mutable=False)
 
         # Factor efficiency reduction part load at max efficiency [1]
-        m.K_part_load_max_eff = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0.0)
+        m.K_part_load_max_eff = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Factor efficiency reduction part load at bend point [1]
-        m.K_part_load_bend = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0.0)
+        m.K_part_load_bend = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Specific aux medium ratio [Nm3/kg_H2]
-        m.Spec_medium_ratio = pyo.Param(m.AuxMedium, within=pyo.NonNegativeReals, default=0.0)
+        m.Spec_medium_ratio = pyo.Param(m.AuxMedium, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Firm capacity switch [-] -> apply requirement of firm capacity = 1
-        m.Cap_switch = pyo.Param(within=pyo.Binary, default=1)
+        m.Cap_switch = pyo.Param(within=pyo.Binary, default=1, mutable=False)
 
     	# Upper limit for fuel production from technology as share of annual f_demand [-]
-        m.K_f_prod_upperlimit = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=infinity)
+        m.K_f_prod_upperlimit = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=infinity, mutable=False)
 
         # Capacity value of technology [-]
-        m.Cap_value = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0)
+        m.Cap_value = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=0, mutable=False)
 
 
         # Discount rate (to discount future to present) [y]
-        m.Discount_rate = pyo.Param(within=pyo.NonNegativeReals, default=0)
+        m.Discount_rate = pyo.Param(within=pyo.NonNegativeReals, default=0, mutable=False)
 
         # Availability [-]
-        m.Availability = pyo.Param(m.Node, m.Tech, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.NonNegativeReals, default=1.0)
+        m.Availability = pyo.Param(m.Node, m.Tech, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.NonNegativeReals, default=1.0, mutable=False)
 
         # Fixed operational costs [EUR/kW/a]
-        m.Fo_costs = pyo.Param(m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Fo_costs = pyo.Param(m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Variable operational costs [EUR/kWh]
-        m.Vo_costs = pyo.Param(m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Vo_costs = pyo.Param(m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Auxiliary medium costs [EUR/Nm3]
-        m.AM_costs = pyo.Param(m.AuxMedium, m.Year_All, within=pyo.Reals, default=0.0)
+        m.AM_costs = pyo.Param(m.AuxMedium, m.Year_All, within=pyo.Reals, default=0.0, mutable=False)
 
         # Fuel costs [EUR/kWh]
-        m.F_costs = pyo.Param(m.Fuel1, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.F_costs = pyo.Param(m.Fuel1, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Fuel export prices [Eur/MWh]
-        m.F_export_price = pyo.Param(m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.F_export_price = pyo.Param(m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Spot market prices [Eur/MWh]
-        m.F_export_timeseries_price = pyo.Param(m.Fuel, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.Reals, default=0.0)
-        m.F_import_timeseries_price = pyo.Param(m.Fuel, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.Reals, default=0.0)
+        m.F_export_timeseries_price = pyo.Param(m.Fuel, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.Reals, default=0.0, mutable=False)
+        m.F_import_timeseries_price = pyo.Param(m.Fuel, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.Reals, default=0.0, mutable=False)
 
         # Spot market export [kWh/h]
-        m.Max_f_export_timeseries = pyo.Param(m.Node, m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
-        m.Min_f_export_timeseries = pyo.Param(m.Node, m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_f_export_timeseries = pyo.Param(m.Node, m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
+        m.Min_f_export_timeseries = pyo.Param(m.Node, m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Spot market import [kWh/h]
-        m.Max_f_import_timeseries = pyo.Param(m.Node, m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
-        m.Min_f_import_timeseries = pyo.Param(m.Node, m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_f_import_timeseries = pyo.Param(m.Node, m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
+        m.Min_f_import_timeseries = pyo.Param(m.Node, m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # F_export_timeseries and F_import_timeseries fee [EUR/MWh]
-        m.F_export_timeseries_fee = pyo.Param(m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
-        m.F_import_timeseries_fee = pyo.Param(m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.F_export_timeseries_fee = pyo.Param(m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
+        m.F_import_timeseries_fee = pyo.Param(m.Fuel, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max fuel import [kWh/h]
-        m.Max_f_import = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_f_import = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Min fuel import [kWh/h]
-        m.Min_f_import = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeReals, default=0.0)
+        m.Min_f_import = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max fuel export  [kWh/h]
-        m.Max_f_export = pyo.Param(m.Node, m.Fuel, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_f_export = pyo.Param(m.Node, m.Fuel, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
 		# Min fuel export  [kWh/h]
-        m.Min_f_export = pyo.Param(m.Node, m.Fuel, within=pyo.NonNegativeReals, default=0.0)
+        m.Min_f_export = pyo.Param(m.Node, m.Fuel, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Network capacity charge [EUR/kW]
-        m.F_network_capacity_charge = pyo.Param(m.Node, m.Fuel, m.Year, within=pyo.NonNegativeReals, default=0.0)
+        m.F_network_capacity_charge = pyo.Param(m.Node, m.Fuel, m.Year, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max/Min fuel injection into fuel network flow [1]
-        m.Max_f_injection = pyo.Param(m.Node, m.Fuel, within=pyo.NonNegativeReals, default=0.0)
-        m.Min_f_injection = pyo.Param(m.Node, m.Fuel, within=pyo.NonNegativeReals, default=0.0)
+        m.Max_f_injection = pyo.Param(m.Node, m.Fuel, within=pyo.NonNegativeReals, default=0.0, mutable=False)
+        m.Min_f_injection = pyo.Param(m.Node, m.Fuel, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Fuel network flow [kW]
-        m.F_network_flow = pyo.Param(m.Node, m.Fuel, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.Reals, default=0)
+        m.F_network_flow = pyo.Param(m.Node, m.Fuel, m.Year_All, m.Day_All, m.Hour_All, m.SubHour, within=pyo.Reals, default=0, mutable=False)
 
         # Fuel fix quantity import size [kWh/h]
-        m.F_fix_quant_import_size = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeReals, default=0.0)
+        m.F_fix_quant_import_size = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Max fix quantity import [1/h]
-        m.Max_f_fix_quant_import = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeIntegers, default=0)
+        m.Max_f_fix_quant_import = pyo.Param(m.Node, m.Fuel1, within=pyo.NonNegativeIntegers, default=0, mutable=False)
 
         # Fix quantity supply window: day of week and hour of day [h]
-        m.F_fix_quant_supply_day = pyo.Param(m.Node, m.Fuel1, m.Weekday, within=pyo.Binary, default=0)
-        m.F_fix_quant_supply_hour = pyo.Param(m.Node, m.Fuel1, m.Hour_All, within=pyo.Binary, default=0)
+        m.F_fix_quant_supply_day = pyo.Param(m.Node, m.Fuel1, m.Weekday, within=pyo.Binary, default=0, mutable=False)
+        m.F_fix_quant_supply_hour = pyo.Param(m.Node, m.Fuel1, m.Hour_All, within=pyo.Binary, default=0, mutable=False)
 
         # Fuel fix quantity costs [EUR/MWh]
-        m.F_fix_quant_costs =pyo.Param(m.Fuel1, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.F_fix_quant_costs =pyo.Param(m.Fuel1, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Lifetime of technologies [a]
-        m.Tech_lifetime = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0)
+        m.Tech_lifetime = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0, mutable=False)
 
         # Economic lifetime / depreciation period of technologies [a]
-        m.Econ_lifetime = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0)
+        m.Econ_lifetime = pyo.Param(m.Tech, within=pyo.NonNegativeReals, default=1.0, mutable=False)
 
         # Investment costs [EUR/kW]
-        m.Invest_costs = pyo.Param(m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0)
+        m.Invest_costs = pyo.Param(m.Tech, m.Year_All, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # CAPEX external technologies (outside system boundary), e.g. compressors, pipeline, etc [EUR/y]
-        m.capex_ExternalTech = pyo.Param(m.ExternalTech, m.Year_All, within=pyo.Reals, default=0.0)
+        m.capex_ExternalTech = pyo.Param(m.ExternalTech, m.Year_All, within=pyo.Reals, default=0.0, mutable=False)
 
         # OPEX external technologies (outside system boundary), e.g. compressors, pipeline, etc ****excl. OPEX from electricity consumption accounted for in F_demand_exo_El****   [EUR/y]
-        m.opex_ExternalTech = pyo.Param(m.ExternalTech, m.Year_All, within=pyo.Reals, default=0.0)
+        m.opex_ExternalTech = pyo.Param(m.ExternalTech, m.Year_All, within=pyo.Reals, default=0.0, mutable=False)
 
         # CAPEX System costs as share of total CAPEX [1]
-        m.Capex_system_share = pyo.Param(within=pyo.NonNegativeReals, default=0.0)
+        m.Capex_system_share = pyo.Param(within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # OPEX System costs as share of CAPEX System [1]
-        m.Opex_system_share = pyo.Param(within=pyo.NonNegativeReals, default=0.0)
+        m.Opex_system_share = pyo.Param(within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Hydrogen system components [1]
-        m.Hydrogen_system = pyo.Param(m.Tech, within=pyo.Binary, default=0)
+        m.Hydrogen_system = pyo.Param(m.Tech, within=pyo.Binary, default=0, mutable=False)
 
         # Technology accountable for system costs and external technology costs (relevant for LCOE)
-        m.System_tech = pyo.Param(m.Tech, within=pyo.Binary, default=0)
+        m.System_tech = pyo.Param(m.Tech, within=pyo.Binary, default=0, mutable=False)
 
         # Share for constant system electricity consumption of certains techs [1]
-        m.Share_const_cons_system = pyo.Param(m.Fuel1, within=pyo.NonNegativeReals, default=0.0)
+        m.Share_const_cons_system = pyo.Param(m.Fuel1, within=pyo.NonNegativeReals, default=0.0, mutable=False)
 
         # Constant elcons system components [1]
-        m.Tech_const_cons_system = pyo.Param(m.Tech, within=pyo.Binary, default=0)
+        m.Tech_const_cons_system = pyo.Param(m.Tech, within=pyo.Binary, default=0, mutable=False)
 
         # Subsidy share of certain techs [1]
-        m.Subsidy_share = pyo.Param(within=pyo.NonPositiveReals, default=0.0)
+        m.Subsidy_share = pyo.Param(within=pyo.NonPositiveReals, default=0.0, mutable=False)
 
         # Subsidized technologies [1]
-        m.Subsidy_tech = pyo.Param(m.Tech, within=pyo.Binary, default=0)
+        m.Subsidy_tech = pyo.Param(m.Tech, within=pyo.Binary, default=0, mutable=False)
 
         # ---------------------------------------------------------------------
         # Initialise variables ------------------------------------------------
         # ---------------------------------------------------------------------
         step += 1
-        logger_main.info('{}/{}: Initialise variables'.format(step, total_steps))
+        logger_main.info('%d/%d: Initialise variables', step, total_steps)
+
+        # Pairs of fuels and their substitutes, flows over Fuel x Fuel1 only exist for these pairs
+        def fuel_subst_rule(m):
+            return [(F, F1) for F in m.Fuel for F1 in m.Fuel1 if m.F_subst[F,F1]]
+        m.FuelSubst = pyo.Set(dimen=2, initialize=fuel_subst_rule)
+
+        # Fuels with slack variables, empty if slack variables are disabled
+        def slack_fuel_rule(m):
+            return list(m.Fuel1) if m.Slack_switch == 1 else []
+        m.SlackFuel = pyo.Set(within=m.Fuel1, initialize=slack_fuel_rule)
 
         # Slack variable [kW]
-        m.f_slack_pos = pyo.Var(m.Node, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
-        m.f_slack_neg = pyo.Var(m.Node, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonPositiveReals, initialize=-0.0)
+        m.f_slack_pos = pyo.Var(m.Node, m.SlackFuel, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
+        m.f_slack_neg = pyo.Var(m.Node, m.SlackFuel, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonPositiveReals, initialize=-0.0)
 
 
         # Add units of technology [-]
@@ -489,7 +518,7 @@ class OptSys:
         m.start_storage_energy_level = pyo.Var(m.Node, m.StorageTech, m.Fuel1, within=pyo.NonNegativeReals, initialize=0.0)
 
         # Fuel consumption of each technology and fuel [kW]
-        m.f_cons = pyo.Var(m.Node, m.Tech, m.Fuel, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
+        m.f_cons = pyo.Var(m.Node, m.Tech, m.FuelSubst, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
 
         # Fuel production of each technology and fuel (Fuel1) [kW]
         m.f_prod = pyo.Var(m.Node, m.Tech, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
@@ -503,16 +532,16 @@ class OptSys:
         m.f_import = pyo.Var(m.Node, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
 
         # Export of fuel [kW]
-        m.f_export = pyo.Var(m.Node, m.Fuel, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
+        m.f_export = pyo.Var(m.Node, m.FuelSubst, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
 
         # Delivery of fuel demand [kW]
-        m.f_delivery = pyo.Var(m.Node, m.Fuel, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
+        m.f_delivery = pyo.Var(m.Node, m.FuelSubst, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
 
         # Supply of constant system consumption [kW]
-        m.f_supply_cons_system = pyo.Var(m.Node, m.Fuel, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
+        m.f_supply_cons_system = pyo.Var(m.Node, m.FuelSubst, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
 
         # Spot market export and import of fuel [kW]
-        m.f_export_timeseries = pyo.Var(m.Node, m.Fuel, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
+        m.f_export_timeseries = pyo.Var(m.Node, m.FuelSubst, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
         m.f_import_timeseries = pyo.Var(m.Node, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, within=pyo.NonNegativeReals, initialize=0.0)
 
         # Network capacity for import, export, import_timeseries, export_timeseries [kW]
@@ -531,80 +560,169 @@ class OptSys:
 
         # Expressions ---------------------------------------------------------
         step += 1
-        logger_main.info('{}/{}: Formulate expressions'.format(step, total_steps))
-
+        logger_main.info('%d/%d: Formulate expressions', step, total_steps)
+
+        # Lookup tables of input data, computed once when the instance is created
+        def lookup_tables_rule(m):
+            # Ordered time steps and their position
+            m.time_steps = [(Y, D, H, sH) for Y in sorted(m.Year) for D in sorted(m.Day) for H in sorted(m.Hour) for sH in sorted(m.SubHour)]
+            m.time_step_index = {t: k for k, t in enumerate(m.time_steps)}
+
+            # Binary mapping params and VreFuel as plain containers, a dict probe skips the index validation of Param
+            m.vre_fuel = frozenset(m.VreFuel)
+            m.f_subst = {(F, F1): bool(m.F_subst[F,F1]) for F in m.Fuel for F1 in m.Fuel1}
+            m.e_input = {(T, F): bool(m.E_input[T,F]) for T in m.Tech for F in m.Fuel}
+            m.e_output = {(T, F1): bool(m.E_output[T,F1]) for T in m.Tech for F1 in m.Fuel1}
+
+            # Input and output fuels of each tech, and non-storage techs producing each fuel
+            m.input_fuels = {T: [F for F in m.Fuel if m.e_input[T,F]] for T in m.Tech}
+            m.output_fuels = {T: [F1 for F1 in m.Fuel1 if m.e_output[T,F1]] for T in m.Tech}
+            # Fuels with consumption costs of each tech in postprocessing, electricity is always included for the auxiliary demand
+            m.cost_fuels = {T: [F for F in m.Fuel if m.e_input[T,F] or F == 'Electricity'] for T in m.Tech}
+            m.output_tech = {F1: [T for T in m.NonStorageTech if m.e_output[T,F1]] for F1 in m.Fuel1}
+            # Fuel type of each storage, storages without input fuel are skipped by the storage rules
+            m.storage_input_fuel = {StoreT: m.input_fuels[StoreT][0] for StoreT in m.StorageTech if m.input_fuels[StoreT]}
+
+            # Cumulative F_demand over two cycles of time steps for rolling reserve window sums [kWh/h]
+            m.cum_demand = {}
+            for N in m.Node:
+                for StoreT in m.StorageTech:
+                    for F in m.Fuel:
+                        if m.Window_rolling_reserve[N, StoreT, F] > 0 and m.F_rolling_reserve[N, StoreT, F] > 0 and (N, F) not in m.cum_demand:
+                            demand = np.fromiter((m.F_demand[N,F,Y,D,H,sH] for Y, D, H, sH in m.time_steps), dtype=np.float64, count=len(m.time_steps))
+                            m.cum_demand[N, F] = np.concatenate(([0.0], np.cumsum(np.tile(demand, 2))))
+
+            # Efficiency factors of part load points, capacity refers to input fuel (eg. Electrolysis) or output fuel (eg. GenSet, Wind) [-]
+            eff_cap = {T: (m.Eff[T] if m.Cap_of_input[T] else 1) for T in m.NonStorageTech}
+            m.eff_part_load_max_eff = {T: eff_cap[T] * m.Part_load_max_eff[T] for T in eff_cap}
+            m.eff_part_load_bend = {T: eff_cap[T] * m.Part_load_bend[T] for T in eff_cap}
+
+            # Techs with constant system consumption
+            m.const_cons_system_tech = [T for T in m.Tech if m.Tech_const_cons_system[T]]
+
+            # Techs and storage techs that can be installed (Max_inst_cap > 0, for storage also Max_inst_storage_vol > 0)
+            m.active_tech = frozenset((N, T, Y) for N in m.Node for T in m.Tech for Y in m.Year if m.Max_inst_cap[N,T,Y] > 0)
+            m.active_storage = frozenset((N, StoreT, Y) for N, StoreT, Y in m.active_tech if StoreT in m.StorageTech and m.Max_inst_storage_vol[N,StoreT,Y] > 0)
+
+            # Techs and storage techs that occupy area
+            m.land_use_tech = [T for T in m.NonStorageTech if m.Land_use[T] != 0]
+            m.land_use_storage = [StoreT for StoreT in m.StorageTech if m.Land_use[StoreT] != 0]
+
+            # Unit conversion factor of each fuel for the cost rules
+            m.conv = {F: self.unitConv[m.F_unit[F]]['conv'] for F in m.Fuel}
+
+            # Filtered index lists of the cost and balance rules, so the rules only iterate over nonzero entries
+            m.time_idx = [(D, H, sH) for D in m.Day for H in m.Hour for sH in m.SubHour]
+            m.subst_fuels = {F1: [F for F in m.Fuel if m.f_subst[F,F1]] for F1 in m.Fuel1}
+            m.sub_fuels = {F: [F1 for F1 in m.Fuel1 if m.f_subst[F,F1]] for F in m.Fuel}
+            # Sub fuels that are substituted by exactly one fuel, fuels substituting several sub fuels only represent a superset
+            m.F1_unique = {F1: sum(m.f_subst[F1,F2] for F2 in m.Fuel1) == 1 for F1 in m.Fuel1}
+            m.subst_pairs = {F: [F1 for F1 in m.Fuel1 if m.f_subst[F,F1] and m.F1_unique[F1]] for F in m.Fuel}
+            m.export_nodes = {F: [N for N in m.Node if m.Max_f_export[N,F] > 0 or m.Max_f_injection[N,F] > 0] for F in m.Fuel}
+            m.export_timeseries_nodes = {(F, Y): [N for N in m.Node if m.Max_f_export_timeseries[N,F,Y] > 0] for F in m.Fuel for Y in m.Year}
+            m.import_timeseries_nodes = {(F1, Y): [N for N in m.Node if m.Max_f_import_timeseries[N,F1,Y] > 0] for F1 in m.Fuel1 for Y in m.Year}
+
+            # Time series input data as arrays in time_idx order, conditions over time become vectorized scans
+            def time_array(param, idx):
+                return np.fromiter((param[idx + t] for t in m.time_idx), dtype=np.float64, count=len(m.time_idx))
+            m.F_demand_arr = {(N, F, Y): time_array(m.F_demand, (N, F, Y)) for N in m.Node for F in m.Fuel for Y in m.Year}
+            m.F_edp_arr = {(N, T, Y): time_array(m.F_edp, (N, T, Y)) for N in m.Node for T in m.Tech for Y in m.Year}
+            m.V_edp_arr = {(N, T, Y): time_array(m.V_edp, (N, T, Y)) for N in m.Node for T in m.Tech for Y in m.Year}
+            # (N,F1,Y) without any demand of the fuels substituted by F1
+            m.zero_subst_demand = frozenset((N, F1, Y) for N in m.Node for F1 in m.Fuel1 for Y in m.Year if sum(m.F_demand_arr[N,F,Y].sum() for F in m.subst_fuels[F1]) == 0)
+
+            # Flow variables of the cost rules in time_idx order, summing over time then iterates a flat list instead of indexing each time step
+            def time_series(var, idx):
+                return [var[idx + t] for t in m.time_idx]
+            m.f_prod_time = {(N, T, F1, Y): time_series(m.f_prod, (N, T, F1, Y)) for N in m.Node for T in m.Tech for F1 in (m.Fuel1 if T in m.StorageTech else m.output_fuels[T]) for Y in m.Year}
+            m.f_cons_time = {(N, T, F, F1, Y): time_series(m.f_cons, (N, T, F, F1, Y)) for N in m.Node for T in m.NonStorageTech if m.Cap_of_input[T] for F in m.input_fuels[T] for F1 in m.subst_pairs[F] for Y in m.Year}
+            m.f_import_time = {(N, F1, Y): time_series(m.f_import, (N, F1, Y)) for N in m.Node for F1 in m.Fuel1 if m.Max_f_import[N,F1] > 0 for Y in m.Year}
+            m.f_fix_quant_import_time = {(N, F1, Y): time_series(m.f_fix_quant_import, (N, F1, Y)) for N in m.Node for F1 in m.Fuel1 if m.Max_f_fix_quant_import[N,F1] > 0 for Y in m.Year}
+            m.f_import_timeseries_time = {(N, F1, Y): time_series(m.f_import_timeseries, (N, F1, Y)) for (F1, Y), nodes in m.import_timeseries_nodes.items() for N in nodes}
+            m.f_export_time = {(N, F, F1, Y): time_series(m.f_export, (N, F, F1, Y)) for F in m.Fuel for N in m.export_nodes[F] for F1 in m.subst_pairs[F] for Y in m.Year}
+            m.f_export_timeseries_time = {(N, F, F1, Y): time_series(m.f_export_timeseries, (N, F, F1, Y)) for (F, Y), nodes in m.export_timeseries_nodes.items() for N in nodes for F1 in m.subst_pairs[F]}
+        m.Lookup_tables = pyo.BuildAction(rule=lookup_tables_rule)
+
+        # Scaling factors are constant once the sets are known, immutable params are inlined as numbers into expressions
         def calc_scale_y(m):
             """[1]"""
-            return m.Scale_Y_to / len(m.Year)
-        m.Scale_Y = pyo.Expression(rule=calc_scale_y)
+            return pyo.value(m.Scale_Y_to) / len(m.Year)
+        m.Scale_Y = pyo.Param(within=pyo.NonNegativeReals, initialize=calc_scale_y, mutable=False)
 
         def calc_scale_d(m):
             """[1]"""
-            return m.Scale_D_to / len(m.Day)
-        m.Scale_D = pyo.Expression(rule=calc_scale_d)
+            return pyo.value(m.Scale_D_to) / len(m.Day)
+        m.Scale_D = pyo.Param(within=pyo.NonNegativeReals, initialize=calc_scale_d, mutable=False)
 
         def calc_scale_h(m):
             """[1]"""
-            return m.Scale_H_to / len(m.Hour)
-        m.Scale_H = pyo.Expression(rule=calc_scale_h)
+            return pyo.value(m.Scale_H_to) / len(m.Hour)
+        m.Scale_H = pyo.Param(within=pyo.NonNegativeReals, initialize=calc_scale_h, mutable=False)
 
         def calc_delta_t(m):
             """[h]"""
             return 1 / len(m.SubHour)
-        m.Delta_T = pyo.Expression(rule=calc_delta_t)
+        m.Delta_T = pyo.Param(within=pyo.NonNegativeReals, initialize=calc_delta_t, mutable=False)
+
+        # Scalar params as plain numbers for the rules, multiplying by a float skips the param lookup
+        def scalars_rule(m):
+            m.delta_t = pyo.value(m.Delta_T)
+            m.time_scale = pyo.value(m.Delta_T) * pyo.value(m.Scale_H) * pyo.value(m.Scale_D)  # [h] per time step and year
+            m.count_scale = pyo.value(m.Scale_H) * pyo.value(m.Scale_D)  # [1] per time step and year
+            m.scale_y = pyo.value(m.Scale_Y)
+            m.taxes = pyo.value(m.Taxes)
+            m.capex_system_share = pyo.value(m.Capex_system_share)
+            m.opex_system_share = pyo.value(m.Opex_system_share)
+            m.subsidy_share = pyo.value(m.Subsidy_share)
+            m.project_margin_spec = pyo.value(m.Project_margin_spec)
+            # Bounds of the time sets
+            m.y_min, m.y_max = min(m.Year), max(m.Year)
+            m.d_min, m.d_max = min(m.Day), max(m.Day)
+            m.h_min, m.h_max = min(m.Hour), max(m.Hour)
+            m.sh_min, m.sh_max = min(m.SubHour), max(m.SubHour)
+        m.Scalars = pyo.BuildAction(rule=scalars_rule)
 
         # Capacity motion
         def cap_motion_rule(m, N, T, Y):
             """[kW]"""
-            if Y == m.Y_start:
-                return m.cap_add[N, T, Y]
-            else:
-                return m.inst_cap[N, T, Y-m.Delta_Y] + m.cap_add[N, T, Y] - m.cap_sub[N, T, Y]
+            # Flat sum over all previous years instead of recursion on inst_cap of previous year, no decommissioning in start year
+            return pyo.quicksum(m.cap_add[N, T, Yk] - (m.cap_sub[N, T, Yk] if Yk != m.Y_start else 0) for Yk in m.Year if Yk <= Y)
         m.inst_cap = pyo.Expression(m.Node, m.Tech, m.Year, rule=cap_motion_rule)
 
+        # Installed capacity of techs with constant system consumption [kW]
+        def inst_cap_const_cons_system_rule(m, N, Y):
+            return pyo.quicksum(m.inst_cap[N,T,Y] for T in m.const_cons_system_tech)
+        m.inst_cap_const_cons_system = pyo.Expression(m.Node, m.Year, rule=inst_cap_const_cons_system_rule)
+
         # Constant electricity consumption of system [kW]
         def const_cons_system_rule(m, N, F1, Y):
-            return m.Share_const_cons_system[F1] * sum(m.inst_cap[N,T,Y] for T in m.Tech if m.Tech_const_cons_system[T])
+            return m.Share_const_cons_system[F1] * m.inst_cap_const_cons_system[N,Y]
         m.Const_cons_system = pyo.Expression(m.Node, m.Fuel1, m.Year, rule=const_cons_system_rule)
 
         # Storage volume motion
         def storage_vol_motion_rule(m, N, StoreT, Y):
             """[kWh]"""
-            if Y == m.Y_start:
-                return m.storage_vol_add[N, StoreT, Y]
-            else:
-                return m.inst_storage_vol[N, StoreT, Y-m.Delta_Y] + m.storage_vol_add[N, StoreT, Y] - m.storage_vol_sub[N, StoreT, Y]
+            # Flat sum over all previous years instead of recursion on inst_storage_vol of previous year
+            return pyo.quicksum(m.storage_vol_add[N, StoreT, Yk] - (m.storage_vol_sub[N, StoreT, Yk] if Yk != m.Y_start else 0) for Yk in m.Year if Yk <= Y)
 
         m.inst_storage_vol = pyo.Expression(m.Node, m.StorageTech, m.Year, rule=storage_vol_motion_rule)
 
         # Fuel production at max efficiency [kW]
         def fuel_production_part_load_max_eff_rule(m, N, T, Y):
             """[kW]"""
-            if m.Max_inst_cap[N,T,Y]>0:
-                if m.Cap_of_input[T]:
-                    # eg: Electrolysis
-                    Eff_temp = m.Eff[T]
-                else:
-                    # eg: GenSet, Wind
-                    Eff_temp = 1
-                return m.inst_cap[N,T,Y] * Eff_temp * m.Part_load_max_eff[T]
+            if (N,T,Y) in m.active_tech:
+                return m.inst_cap[N,T,Y] * m.eff_part_load_max_eff[T]
             else:
                 return 0
-        m.F_prod_part_load_max_eff = pyo.Expression(m.Node, m.Tech-m.StorageTech, m.Year, rule=fuel_production_part_load_max_eff_rule)
+        m.F_prod_part_load_max_eff = pyo.Expression(m.Node, m.NonStorageTech, m.Year, rule=fuel_production_part_load_max_eff_rule)
 
         def fuel_production_part_load_bend_rule(m, N, T, Y):
             """[kW]"""
-            if m.Max_inst_cap[N,T,Y]>0:
-                if m.Cap_of_input[T]:
-                    # eg: Electrolysis
-                    Eff_temp = m.Eff[T]
-                else:
-                    # eg: GenSet, Wind
-                    Eff_temp = 1
-                return m.inst_cap[N,T,Y] * Eff_temp * m.Part_load_bend[T]
+            if (N,T,Y) in m.active_tech:
+                return m.inst_cap[N,T,Y] * m.eff_part_load_bend[T]
             else:
                 return 0
-        m.F_prod_part_load_bend = pyo.Expression(m.Node, m.Tech-m.StorageTech, m.Year, rule=fuel_production_part_load_bend_rule)
+        m.F_prod_part_load_bend = pyo.Expression(m.Node, m.NonStorageTech, m.Year, rule=fuel_production_part_load_bend_rule)
 
 
 
@@ -631,32 +749,14 @@ class OptSys:
             """Rolling reserve capacity to secure supply of F_demand for defined time period"""
             if m.Window_rolling_reserve[N, StoreT, F] > 0 and m.F_rolling_reserve[N, StoreT, F] > 0:
 
-                # Sum up F_demand of following time steps [kWh]
-                rolling_sum = 0
-
-                for i in range(m.Window_rolling_reserve[N, StoreT, F] * len(m.SubHour)):
+                # Sum up F_demand of following time steps (cyclic) [kWh]
+                cum = m.cum_demand[N, F]
+                n = len(m.time_steps)
+                k = m.time_step_index[Y, D, H, sH]
+                cycles, steps = divmod(m.Window_rolling_reserve[N, StoreT, F] * len(m.SubHour), n)
+                rolling_sum = float(cycles * cum[n] + cum[k + 1 + steps] - cum[k + 1])
 
-                    # Next time step
-                    sH = sH + m.Delta_sH
-
-                    if sH > max(m.SubHour):
-                        sH = min(m.SubHour)
-                        H += m.Delta_H
-
-                        if H > max(m.Hour):
-                            H = min(m.Hour)
-                            D += m.Delta_D
-
-                            if D > max(m.Day):
-                                D = min(m.Day)
-                                Y += m.Delta_Y
-
-                                if Y > max(m.Year):
-                                    Y = min(m.Day)
-
-                    rolling_sum += m.F_demand[N,F,Y,D,H,sH]
-
-                return rolling_sum * m.F_rolling_reserve[N, StoreT, F] * m.Delta_T
+                return rolling_sum * m.F_rolling_reserve[N, StoreT, F] * m.delta_t
             else:
                 return 0
 
@@ -664,13 +764,14 @@ class OptSys:
 
 
         # Auxiliary medium [Nm3/h] ... equivalent unit to [kW]
-        def aux_medium_flow_rule(m, N, T, A, Y, D, H, sH):
         # TODO...
         # for Tech with output H2
+        aux_medium_fuel = 'PtX_Hydrogen_LP'
+        aux_medium_tech = 'Electrolysis'   # aux_medium_flow is calculated only for T containing Tech, small and caps are ignored
+        def aux_medium_flow_rule(m, N, T, A, Y, D, H, sH):
             """[Nm3/h]"""
-            F1 = 'PtX_Hydrogen_LP'
-            Tech = 'Electrolysis'   # aux_medium_flow is calculated only for T containing Tech, small and caps are ignored
-            if Tech.lower() in T.lower() and m.E_output[T, F1]:
+            F1 = aux_medium_fuel
+            if aux_medium_tech.lower() in T.lower() and m.e_output[T, F1]:
                 return m.f_prod[N, T, F1, Y, D, H, sH] / m.Spec_energy[F1] * m.Spec_medium_ratio[A]
             else:
                 return 0
@@ -680,14 +781,20 @@ class OptSys:
         # Revenues
         def revenue_rule(m, F, Y):
             """[EUR]"""
-            conv = self.unitConv[m.F_unit[F]]['conv']
-            return - m.F_export_price[F,Y] * conv * sum(m.f_export[N,F,F1,Y,D,H,sH] for N in m.Node if (m.Max_f_export[N,F] > 0 or m.Max_f_injection[N,F] > 0) for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1 for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            conv = m.conv[F]
+            return - m.F_export_price[F,Y] * conv * pyo.quicksum((v for N in m.export_nodes[F] for F1 in m.subst_pairs[F] for v in m.f_export_time[N,F,F1,Y]), linear=True) * m.time_scale
         m.revenue = pyo.Expression(m.Fuel, m.Year, rule=revenue_rule)
 
         def revenue_timeseries_rule(m, F, Y):
             """[EUR]"""
-            conv = self.unitConv[m.F_unit[F]]['conv']
-            return - conv * sum((m.F_export_timeseries_price[F,Y,D,H,sH] - m.F_export_timeseries_fee[F,Y]) * m.f_export_timeseries[N,F,F1,Y,D,H,sH] for N in m.Node if m.Max_f_export_timeseries[N,F,Y] > 0 for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1 for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            conv = m.conv[F]
+            var_list = [v for N in m.export_timeseries_nodes[F,Y] for F1 in m.subst_pairs[F] for v in m.f_export_timeseries_time[N,F,F1,Y]]
+            if not var_list:
+                return 0
+            # Coefficients of all time steps at once, the variables repeat time_idx for each node and sub fuel
+            coefs = np.fromiter((m.F_export_timeseries_price[F,Y,D,H,sH] for D, H, sH in m.time_idx), dtype=np.float64, count=len(m.time_idx))
+            coefs = - (coefs - m.F_export_timeseries_fee[F,Y]) * conv * m.time_scale
+            return LinearExpression(constant=0, linear_coefs=np.tile(coefs, len(var_list) // len(coefs)).tolist(), linear_vars=var_list)
         m.revenue_timeseries = pyo.Expression(m.Fuel, m.Year, rule=revenue_timeseries_rule)
 
 
@@ -696,7 +803,7 @@ class OptSys:
         def slack_rule(m):
             """Sum all slack variable vaules over time and fuel [EUR]"""
             if m.Slack_switch == 1:
-                return sum(sum(m.f_slack_pos[N, F1, Y, D, H, sH] - m.f_slack_neg[N, F1, Y, D, H, sH] for Y in m.Year for D in m.Day for H in m.Hour for sH in m.SubHour) * m.F_slack_costs[N, F1] for N in m.Node for F1 in m.Fuel1) * m.Delta_T * m.Scale_H * m.Scale_D * m.Scale_Y
+                return pyo.quicksum(pyo.quicksum(m.f_slack_pos[N, F1, Y, D, H, sH] - m.f_slack_neg[N, F1, Y, D, H, sH] for Y in m.Year for D in m.Day for H in m.Hour for sH in m.SubHour) * m.F_slack_costs[N, F1] for N in m.Node for F1 in m.SlackFuel) * m.time_scale * m.scale_y
             else:
                 return 0
         m.slack_costs = pyo.Expression(rule=slack_rule)
@@ -714,7 +821,7 @@ class OptSys:
             if T in m.StorageTech:
                 # OPEX StorageTech
                 opex_temp = m.Fo_costs[T,Y] * m.inst_storage_vol[N,T,Y] if m.Fo_costs[T,Y] != 0 else 0 \
-                          + m.Vo_costs[T,Y] * sum(m.f_prod[N, T, F1, Y, D, H, sH] for F1 in m.Fuel1 for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D if m.Vo_costs[T,Y] != 0 else 0
+                          + m.Vo_costs[T,Y] * pyo.quicksum((v for F1 in m.Fuel1 for v in m.f_prod_time[N,T,F1,Y]), linear=True) * m.time_scale if m.Vo_costs[T,Y] != 0 else 0
 
             elif T in m.ExternalTech:
                 # OPEX ExternalTech
@@ -725,47 +832,78 @@ class OptSys:
                 if m.Cap_of_input[T]:
                     # eg: Electrolysis
                     opex_temp = m.Fo_costs[T,Y] * m.inst_cap[N,T,Y] if m.Fo_costs[T,Y] != 0 else 0 \
-                              + m.Vo_costs[T,Y] * sum(m.f_cons[N, T, F, F1, Y, D, H, sH] for F in m.Fuel if m.E_input[T,F] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1 for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D if m.Vo_costs[T,Y] != 0 else 0
+                              + m.Vo_costs[T,Y] * pyo.quicksum((v for F in m.input_fuels[T] for F1 in m.subst_pairs[F] for v in m.f_cons_time[N,T,F,F1,Y]), linear=True) * m.time_scale if m.Vo_costs[T,Y] != 0 else 0
                 else:
                     # eg: GenSet, Wind
                     opex_temp = m.Fo_costs[T,Y] * m.inst_cap[N,T,Y] if m.Fo_costs[T,Y] != 0 else 0 \
-                              + m.Vo_costs[T,Y] * sum(m.f_prod[N,T,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.E_output[T,F1] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D if m.Vo_costs[T,Y] != 0 else 0
+                              + m.Vo_costs[T,Y] * pyo.quicksum((v for F1 in m.output_fuels[T] for v in m.f_prod_time[N,T,F1,Y]), linear=True) * m.time_scale if m.Vo_costs[T,Y] != 0 else 0
 
             return opex_temp
 
-        m.opex = pyo.Expression(m.Node, m.Tech | m.ExternalTech, m.Year, rule=opex_rule)
+        # Only (N,T,Y) with operational costs get an opex expression
+        def opex_index_rule(m):
+            return [(N, T, Y) for N in m.Node for T in m.AllTech for Y in m.Year if T in m.ExternalTech or m.Fo_costs[T,Y] != 0 or m.Vo_costs[T,Y] != 0]
+        m.OpexIndex = pyo.Set(dimen=3, initialize=opex_index_rule)
+
+        m.opex = pyo.Expression(m.OpexIndex, rule=opex_rule)
 
 
         # OPEX Fuel
         def opex_fuel_rule(m, N, F1, Y):
             """[EUR]"""
-            conv = self.unitConv[m.F_unit[F1]]['conv']
-            opex_import = 1 * conv * m.F_costs[F1,Y] * sum(m.f_import[N,F1,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D if m.Max_f_import[N,F1] > 0 else 0
-            opex_fix_quant_import = 1 * conv * m.F_fix_quant_costs[F1,Y] * m.F_fix_quant_import_size[N, F1] * sum(m.f_fix_quant_import[N, F1, Y, D, H, sH]  for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Scale_H * m.Scale_D if m.Max_f_fix_quant_import[N,F1] > 0 else 0
-
-            return opex_import + opex_fix_quant_import
+            conv = m.conv[F1]
+            coefs = []
+            var_list = []
+            if m.Max_f_import[N,F1] > 0:
+                # Import
+                var_list.extend(m.f_import_time[N,F1,Y])
+                coefs.extend([conv * m.F_costs[F1,Y] * m.time_scale] * len(m.time_idx))
+            if m.Max_f_fix_quant_import[N,F1] > 0:
+                # Fix quantity import
+                var_list.extend(m.f_fix_quant_import_time[N,F1,Y])
+                coefs.extend([conv * m.F_fix_quant_costs[F1,Y] * m.F_fix_quant_import_size[N, F1] * m.count_scale] * len(m.time_idx))
+
+            if not var_list:
+                return 0
+            return LinearExpression(constant=0, linear_coefs=coefs, linear_vars=var_list)
 
         m.opex_fuel = pyo.Expression(m.Node, m.Fuel1, m.Year, rule=opex_fuel_rule)
 
         # OPEX spot market fuel import
         def opex_timeseries_rule(m,F1,Y):
             """[EUR]"""
-            conv = self.unitConv[m.F_unit[F1]]['conv']
-            return conv * sum((m.F_import_timeseries_price[F1,Y,D,H,sH] + m.F_import_timeseries_fee[F1,Y]) * m.f_import_timeseries[N,F1,Y,D,H,sH] for N in m.Node if m.Max_f_import_timeseries[N,F1,Y] > 0 for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            conv = m.conv[F1]
+            var_list = [v for N in m.import_timeseries_nodes[F1,Y] for v in m.f_import_timeseries_time[N,F1,Y]]
+            if not var_list:
+                return 0
+            # Coefficients of all time steps at once, the variables repeat time_idx for each node
+            coefs = np.fromiter((m.F_import_timeseries_price[F1,Y,D,H,sH] for D, H, sH in m.time_idx), dtype=np.float64, count=len(m.time_idx))
+            coefs = (coefs + m.F_import_timeseries_fee[F1,Y]) * conv * m.time_scale
+            return LinearExpression(constant=0, linear_coefs=np.tile(coefs, len(var_list) // len(coefs)).tolist(), linear_vars=var_list)
 
         m.opex_timeseries = pyo.Expression(m.Fuel1, m.Year, rule=opex_timeseries_rule)
 
         # OPEX Auxiliary medium
         def opex_auxmedium_rule(m, N, T, A, Y):
             """[EUR]"""
-            return sum(m.Aux_medium_flow[N, T, A, Y, D, H, sH] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.AM_costs[A, Y] * m.Delta_T * m.Scale_H * m.Scale_D
+            F1 = aux_medium_fuel
+            if aux_medium_tech.lower() in T.lower() and m.e_output[T, F1]:
+                # Aux_medium_flow is proportional to f_prod, coefficient of each time step
+                coef = m.AM_costs[A, Y] * m.Spec_medium_ratio[A] / m.Spec_energy[F1] * m.time_scale
+                var_list = m.f_prod_time[N,T,F1,Y]
+                return LinearExpression(constant=0, linear_coefs=[coef] * len(var_list), linear_vars=var_list)
+            else:
+                return 0
         m.opex_auxmedium = pyo.Expression(m.Node, m.Tech, m.AuxMedium, m.Year, rule=opex_auxmedium_rule)
 
         # OPEX Network capacity charges
         def opex_network_capacity_rule(m, N, F, Y):
             """[EUR]"""
             return m.F_network_capacity_charge[N,F,Y] * m.f_network_capacity[N,F,Y] if m.F_network_capacity_charge[N,F,Y] > 0 else 0
-        m.opex_network_capacity = pyo.Expression(m.Node, m.Fuel, m.Year, rule=opex_network_capacity_rule)
+        def opex_network_capacity_index_rule(m):
+            return [(N, F, Y) for N in m.Node for F in m.Fuel for Y in m.Year if m.F_network_capacity_charge[N,F,Y] > 0]
+        m.OpexNetworkCapacityIndex = pyo.Set(dimen=3, initialize=opex_network_capacity_index_rule)
+        m.opex_network_capacity = pyo.Expression(m.OpexNetworkCapacityIndex, rule=opex_network_capacity_rule)
 
         # CAPEX
         def capex_rule(m, N, T, Y):
@@ -787,33 +925,33 @@ class OptSys:
 
             return capex_temp
 
-        m.capex = pyo.Expression(m.Node, m.Tech | m.ExternalTech , m.Year, rule=capex_rule)
+        m.capex = pyo.Expression(m.Node, m.AllTech, m.Year, rule=capex_rule)
 
 
         # CAPEX subsidy share for certains technologies
         def subsidy_tech_rule(m, N, Y):
-            if m.Subsidy_share == 0:
+            if m.subsidy_share == 0:
                 return 0
             else:
-                return m.Subsidy_share * sum(m.capex[N,T,Y] for T in m.Tech if m.Subsidy_tech[T])
+                return m.subsidy_share * pyo.quicksum(m.capex[N,T,Y] for T in m.Tech if m.Subsidy_tech[T])
         m.capex_subsidy = pyo.Expression(m.Node, m.Year, rule=subsidy_tech_rule)
 
         # CAPEX System
         def capex_system_rule(m, N, Y):
-            return m.Capex_system_share * sum(m.capex[N,T,Y] for T in m.Tech if m.Hydrogen_system[T])
+            return m.capex_system_share * pyo.quicksum(m.capex[N,T,Y] for T in m.Tech if m.Hydrogen_system[T])
         m.capex_system = pyo.Expression(m.Node, m.Year, rule=capex_system_rule)
 
         # OPEX System
         def opex_system_rule(m, N, Y):
-            return m.Opex_system_share * m.capex_system[N,Y]
+            return m.opex_system_share * m.capex_system[N,Y]
         m.opex_system = pyo.Expression(m.Node, m.Year, rule=opex_system_rule)
 
 
         # Discounting costs
-        m.Capex_disc = pyo.Expression(m.Tech | m.ExternalTech, rule=self.calc_disc_capex)
+        m.Capex_disc = pyo.Expression(m.AllTech, rule=self.calc_disc_capex)
         m.Capex_subsidy_disc = pyo.Expression(rule=self.calc_disc_capex_subsidy)
         m.Capex_system_disc = pyo.Expression(rule=self.calc_disc_capex_system)
-        m.Opex_disc = pyo.Expression(m.Tech | m.ExternalTech, rule=self.calc_disc_opex)
+        m.Opex_disc = pyo.Expression(m.AllTech, rule=self.calc_disc_opex)
         m.Opex_system_disc = pyo.Expression(rule=self.calc_disc_opex_system)
         m.Opex_fuel_disc = pyo.Expression(m.Fuel1, rule=self.calc_disc_opex_fuel)
         m.Opex_timeseries_disc = pyo.Expression(m.Fuel1, rule=self.calc_disc_opex_timeseries)
@@ -823,16 +961,20 @@ class OptSys:
         m.Revenue_timeseries_disc = pyo.Expression(m.Fuel, rule=self.calc_disc_revenue_timeseries)
 
         def calc_project_margin(m, Y):
-            return sum(m.Project_margin_spec * m.cap_add[N, T, Y] for N in m.Node for T in m.Tech - m.StorageTech)
+            return pyo.quicksum(m.project_margin_spec * m.cap_add[N, T, Y] for N in m.Node for T in m.NonStorageTech)
 
         m.Project_margin = pyo.Expression(m.Year, rule=calc_project_margin)
         m.Project_Margin_disc = pyo.Expression(rule=self.calc_disc_project_margin)
 
         def calc_opex_taxes(m, Y):
-            return (sum(m.opex[N,T,Y] for N in m.Node for T in m.Tech | m.ExternalTech) \
-                  + sum(m.opex_fuel[N,F1,Y] for N in m.Node for F1 in m.Fuel1) \
-                  + sum(m.opex_auxmedium[N,T,A,Y] for N in m.Node for T in m.Tech-m.StorageTech for A in m.AuxMedium)
-                  + sum(m.opex_network_capacity[N,F,Y] for N in m.Node for F in m.Fuel)) * m.Taxes
+            if m.taxes == 0:
+                return 0
+            # One sum over all taxed opex terms instead of four partial sums
+            return m.taxes * pyo.quicksum(itertools.chain(
+                (m.opex[N,T,Y] for N in m.Node for T in m.AllTech if (N,T,Y) in m.opex),
+                (m.opex_fuel[N,F1,Y] for N in m.Node for F1 in m.Fuel1),
+                (m.opex_auxmedium[N,T,A,Y] for N in m.Node for T in m.NonStorageTech for A in m.AuxMedium),
+                (m.opex_network_capacity[N,F,Y] for N in m.Node for F in m.Fuel if (N,F,Y) in m.opex_network_capacity)))
 
         m.Opex_taxes = pyo.Expression(m.Year, rule=calc_opex_taxes)
         m.Opex_taxes_disc = pyo.Expression(rule=self.calc_disc_opex_taxes)
@@ -840,41 +982,40 @@ class OptSys:
 
         # Incentive for high storage level
         def high_storage_level_incentive_rule(m, StoreT):
-            if m.High_storage_level_incentive[StoreT] > 0:
-                F = [F for F in m.Fuel if m.E_input[StoreT, F]][0]
-                return sum(m.storage_energy_level[N,StoreT,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] for N in m.Node for Y in m.Year for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D * m.High_storage_level_incentive[StoreT]
+            if m.High_storage_level_incentive[StoreT] > 0 and StoreT in m.storage_input_fuel:
+                F = m.storage_input_fuel[StoreT]
+                return pyo.quicksum((m.storage_energy_level[N,StoreT,F1,Y,D,H,sH] for F1 in m.sub_fuels[F] for N in m.Node for Y in m.Year for D in m.Day for H in m.Hour for sH in m.SubHour), linear=True) * m.time_scale * m.High_storage_level_incentive[StoreT]
             else:
                 return 0
-        m.high_storage_level_incentive = pyo.Expression(m.StorageTech, rule=high_storage_level_incentive_rule)
+        def incentive_storage_tech_rule(m):
+            return [StoreT for StoreT in m.StorageTech if m.High_storage_level_incentive[StoreT] > 0]
+        m.IncentiveStorageTech = pyo.Set(within=m.StorageTech, initialize=incentive_storage_tech_rule)
+        m.high_storage_level_incentive = pyo.Expression(m.IncentiveStorageTech, rule=high_storage_level_incentive_rule)
 
 
 
 
         # Objective -----------------------------------------------------------
         step += 1
-        logger_main.info('{}/{}: Formulate objective'.format(step, total_steps))
+        logger_main.info('%d/%d: Formulate objective', step, total_steps)
 
 
         # Minimise total cost
         def total_cost_rule(m):
             """[EUR]"""
 
-            return sum(m.Capex_disc[T] for T in m.Tech | m.ExternalTech) \
-                  + m.Capex_system_disc \
-                  +sum(m.Opex_disc[T] for T in m.Tech | m.ExternalTech) \
-                  + m.Opex_system_disc \
-                  +sum(m.Opex_fuel_disc[F1] for F1 in m.Fuel1) \
-                  +sum(m.Opex_timeseries_disc[F1] for F1 in m.Fuel1) \
-                  +sum(m.Opex_auxmedium_disc[A] for A in m.AuxMedium) \
-                  +sum(m.Opex_network_capacity_disc[F] for F in m.Fuel) \
-                  +sum(m.Revenue_disc[F] for F in m.Fuel) \
-                  +sum(m.Revenue_timeseries_disc[F] for F in m.Fuel) \
-                  + m.Subsidy_CAPEX \
-                  + m.Capex_subsidy_disc \
-                  + m.Project_Margin_disc \
-                  + m.Opex_taxes_disc \
-                  + m.slack_costs \
-                  + sum(m.high_storage_level_incentive[StoreT] for StoreT in m.StorageTech)
+            # All cost terms in one sum, so the objective is a single flat sum instead of nested partial sums
+            return pyo.quicksum(itertools.chain(
+                (m.Capex_disc[T] for T in m.AllTech),
+                (m.Opex_disc[T] for T in m.AllTech),
+                (m.Opex_fuel_disc[F1] for F1 in m.Fuel1),
+                (m.Opex_timeseries_disc[F1] for F1 in m.Fuel1),
+                (m.Opex_auxmedium_disc[A] for A in m.AuxMedium),
+                (m.Opex_network_capacity_disc[F] for F in m.Fuel),
+                (m.Revenue_disc[F] for F in m.Fuel),
+                (m.Revenue_timeseries_disc[F] for F in m.Fuel),
+                (m.high_storage_level_incentive[StoreT] for StoreT in m.IncentiveStorageTech),
+                (m.Capex_system_disc, m.Opex_system_disc, m.Subsidy_CAPEX, m.Capex_subsidy_disc, m.Project_Margin_disc, m.Opex_taxes_disc, m.slack_costs)))
 
         m.tc_obj = pyo.Objective(rule=total_cost_rule, sense=pyo.minimize)
 
@@ -882,7 +1023,7 @@ class OptSys:
 
         # Constraints ---------------------------------------------------------
         step += 1
-        logger_main.info('{}/{}: Formulate constraints'.format(step, total_steps))
+        logger_main.info('%d/%d: Formulate constraints', step, total_steps)
 
 
         # Peak demand constraint
@@ -892,30 +1033,34 @@ class OptSys:
         """
         def peak_V_edp_constraint_rule(m, N, Y, D, H, sH):
             """[kW]"""
-            if sum(m.V_edp[N,T,Y,D,H,sH] for T in m.Tech) == 0:
+            v_edp_tech = [T for T in m.Tech if m.V_edp[N,T,Y,D,H,sH] > 0]
+            if not v_edp_tech:
                 # Constraint is not required!
                 return pyo.Constraint.Skip
             else:
-                return m.peak_V_edp[N,Y] >= sum(m.V_edp[N,T,Y,D,H,sH] * m.inst_cap[N,T,Y] for T in m.Tech)
+                return m.peak_V_edp[N,Y] >= pyo.quicksum(m.V_edp[N,T,Y,D,H,sH] * m.inst_cap[N,T,Y] for T in v_edp_tech)
         m.peak_V_edp_constraint = pyo.Constraint(m.Node, m.Year, m.Day, m.Hour, m.SubHour, rule=peak_V_edp_constraint_rule)
 
-        def peak_F_edp_constraint_rule(m, N, Y, D, H, sH):
+        # F_edp and F_demand are input data, one bound on their maximum over time replaces a constraint per time step
+        def peak_F_edp_constraint_rule(m, N, Y):
             """[kW]"""
-            if sum(m.F_edp[N,T,Y,D,H,sH] for T in m.Tech) == 0:
+            peak = np.sum([m.F_edp_arr[N,T,Y] for T in m.Tech], axis=0).max()
+            if peak == 0:
                 # Constraint is not required!
                 return pyo.Constraint.Skip
             else:
-                return m.peak_F_edp[N,Y] >= sum(m.F_edp[N,T,Y,D,H,sH] for T in m.Tech)
-        m.peak_F_edp_constraint = pyo.Constraint(m.Node, m.Year, m.Day, m.Hour, m.SubHour, rule=peak_F_edp_constraint_rule)
+                return m.peak_F_edp[N,Y] >= peak
+        m.peak_F_edp_constraint = pyo.Constraint(m.Node, m.Year, rule=peak_F_edp_constraint_rule)
 
-        def peak_F_demand_el_constraint_rule(m, N, Y, D, H, sH):
+        def peak_F_demand_el_constraint_rule(m, N, Y):
             """[kW]"""
-            if m.F_demand[N,'Electricity',Y,D,H,sH] == 0:
+            peak = m.F_demand_arr[N,'Electricity',Y].max()
+            if peak == 0:
                 # Constraint is not required!
                 return pyo.Constraint.Skip
             else:
-                return m.peak_F_demand_el[N,Y] >= m.F_demand[N,'Electricity',Y,D,H,sH]
-        m.peak_F_demand_el_constraint = pyo.Constraint(m.Node, m.Year, m.Day, m.Hour, m.SubHour, rule=peak_F_demand_el_constraint_rule)
+                return m.peak_F_demand_el[N,Y] >= peak
+        m.peak_F_demand_el_constraint = pyo.Constraint(m.Node, m.Year, rule=peak_F_demand_el_constraint_rule)
 
         def peak_Aux_demand_el_constraint_rule(m, N, Y):
             """[kW]"""
@@ -923,7 +1068,7 @@ class OptSys:
                 # Constraint is not required!
                 return pyo.Constraint.Skip
             else:
-                return m.peak_Aux_demand_el[N,Y] >= sum(m.Aux_ed[T] * m.inst_cap[N,T,Y] for T in m.Tech if m.Aux_ed[T] > 0)
+                return m.peak_Aux_demand_el[N,Y] >= pyo.quicksum(m.Aux_ed[T] * m.inst_cap[N,T,Y] for T in m.Tech if m.Aux_ed[T] > 0)
         m.peak_Aux_demand_el_constraint = pyo.Constraint(m.Node, m.Year, rule=peak_Aux_demand_el_constraint_rule)
 
         def peak_el_demand_constraint_rule(m, N, Y):
@@ -935,7 +1080,7 @@ class OptSys:
         def peak_cap_constraint_rule(m, N, Y):
             """Define firm capacity to be able to satisfy peak demand [kW]"""
             if m.Cap_switch == 1:
-                firm_capacity = sum(m.inst_cap[N, T, Y] * m.Cap_value[T] for T in m.Tech)
+                firm_capacity = pyo.quicksum(m.inst_cap[N, T, Y] * m.Cap_value[T] for T in m.Tech)
                 return m.peak_el_demand[N, Y] <= firm_capacity
             else:
                 return pyo.Constraint.Skip
@@ -951,8 +1096,8 @@ class OptSys:
                 f_import_temp = m.f_import[N,F,Y,D,H,sH] if m.Max_f_import[N,F] > 0 else 0
                 f_import_timeseries_temp = m.f_import_timeseries[N,F,Y,D,H,sH] if m.Max_f_import_timeseries[N,F,Y] > 0 else 0
 
-                f_export_temp = sum(m.f_export[N,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] if m.Max_f_export[N,F] > 0)
-                f_export_timeseries_temp = sum(m.f_export_timeseries[N,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] if m.Max_f_export_timeseries[N,F,Y] > 0)
+                f_export_temp = pyo.quicksum((m.f_export[N,F,F1,Y,D,H,sH] for F1 in m.sub_fuels[F]), linear=True) if m.Max_f_export[N,F] > 0 else 0
+                f_export_timeseries_temp = pyo.quicksum((m.f_export_timeseries[N,F,F1,Y,D,H,sH] for F1 in m.sub_fuels[F]), linear=True) if m.Max_f_export_timeseries[N,F,Y] > 0 else 0
 
                 return m.f_network_capacity[N,F,Y] >= f_import_temp + f_import_timeseries_temp + f_export_temp + f_export_timeseries_temp
             else:
@@ -973,7 +1118,7 @@ class OptSys:
         def inst_cap_combined_constraint_rule(m, N, Y):
             """[kW]"""
             if m.Min_inst_cap_combined[N,Y] > 0 or m.Max_inst_cap_combined[N,Y] < infinity:
-                combined_cap = sum(m.inst_cap[N,T,Y] for T in m.Tech if m.Capacity_constraint_tech[T])
+                combined_cap = pyo.quicksum(m.inst_cap[N,T,Y] for T in m.Tech if m.Capacity_constraint_tech[T])
                 return pyo.inequality(m.Min_inst_cap_combined[N, Y], combined_cap, m.Max_inst_cap_combined[N, Y])
             else:
                 return pyo.Constraint.Skip
@@ -983,7 +1128,7 @@ class OptSys:
         def inst_cap_area_constraint_rule(m, N, Y):
             """[m2]"""
             if m.Max_area[N,Y] < infinity:
-                area_used = sum(m.inst_cap[N,T,Y] * m.Land_use[T] for T in m.Tech - m.StorageTech) + sum(m.inst_storage_vol[N,StoreT,Y] * m.Land_use[StoreT] for StoreT in m.StorageTech)
+                area_used = pyo.quicksum(itertools.chain((m.inst_cap[N,T,Y] * m.Land_use[T] for T in m.land_use_tech), (m.inst_storage_vol[N,StoreT,Y] * m.Land_use[StoreT] for StoreT in m.land_use_storage)))
                 return area_used <= m.Max_area[N,Y]
             else:
                 return pyo.Constraint.Skip
@@ -1008,25 +1153,27 @@ class OptSys:
         m.cap_sub_constraint = pyo.Constraint(m.Node, m.Tech, m.Year, rule=cap_sub_constraint_rule)
 
 
-        # Set cap add and cap sub to integer multiple of cap unit
-        def unit_add_constraint_rule(m, N, T, Y):
+        # Set cap add and cap sub to integer multiple of cap unit, the switch is checked once and the lists stay empty if it is off
+        def unit_add_constraint_rule(m):
             """[kW]"""
             if m.Unit_cap_switch == 1:
-                return m.cap_add[N, T, Y] == m.unit_add[N, T, Y] * m.Unit_cap[N, T, Y]
-            else:
-                return pyo.Constraint.Skip
+                for N in m.Node:
+                    for T in m.Tech:
+                        for Y in m.Year:
+                            yield m.cap_add[N, T, Y] == m.unit_add[N, T, Y] * m.Unit_cap[N, T, Y]
 
-        m.unit_add_constraint = pyo.Constraint(m.Node, m.Tech, m.Year, rule=unit_add_constraint_rule)
+        m.unit_add_constraint = pyo.ConstraintList(rule=unit_add_constraint_rule)
 
 
-        def unit_sub_constraint_rule(m, N, T, Y):
+        def unit_sub_constraint_rule(m):
             """[kW]"""
             if m.Unit_cap_switch == 1:
-                return m.cap_sub[N, T, Y] == m.unit_sub[N, T, Y] * m.Unit_cap[N, T, Y]
-            else:
-                return pyo.Constraint.Skip
+                for N in m.Node:
+                    for T in m.Tech:
+                        for Y in m.Year:
+                            yield m.cap_sub[N, T, Y] == m.unit_sub[N, T, Y] * m.Unit_cap[N, T, Y]
 
-        m.unit_sub_constraint = pyo.Constraint(m.Node, m.Tech, m.Year, rule=unit_sub_constraint_rule)
+        m.unit_sub_constraint = pyo.ConstraintList(rule=unit_sub_constraint_rule)
 
 
         # Max min storage volume addition constraint
@@ -1050,83 +1197,103 @@ class OptSys:
 
 
         # Set storage vol add and storage vol sub to integer multiple of storage unit
-        def storage_unit_add_constraint_rule(m, N, T, Y):
+        def storage_unit_add_constraint_rule(m):
             """[kWh]"""
             if m.Unit_cap_switch == 1:
-                return m.storage_vol_add[N, T, Y] == m.storage_unit_add[N, T, Y] * m.Unit_volume[N, T, Y]
-            else:
-                return pyo.Constraint.Skip
+                for N in m.Node:
+                    for T in m.StorageTech:
+                        for Y in m.Year:
+                            yield m.storage_vol_add[N, T, Y] == m.storage_unit_add[N, T, Y] * m.Unit_volume[N, T, Y]
 
-        m.storage_unit_add_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Year, rule=storage_unit_add_constraint_rule)
+        m.storage_unit_add_constraint = pyo.ConstraintList(rule=storage_unit_add_constraint_rule)
 
 
-        def storage_unit_sub_constraint_rule(m, N, T, Y):
+        def storage_unit_sub_constraint_rule(m):
             """[kW]"""
             if m.Unit_cap_switch == 1:
-                return m.storage_vol_sub[N, T, Y] == m.storage_unit_sub[N, T, Y] * m.Unit_volume[N, T, Y]
-            else:
-                return pyo.Constraint.Skip
+                for N in m.Node:
+                    for T in m.StorageTech:
+                        for Y in m.Year:
+                            yield m.storage_vol_sub[N, T, Y] == m.storage_unit_sub[N, T, Y] * m.Unit_volume[N, T, Y]
 
-        m.storage_unit_sub_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Year, rule=storage_unit_sub_constraint_rule)
+        m.storage_unit_sub_constraint = pyo.ConstraintList(rule=storage_unit_sub_constraint_rule)
 
 
         # Fuel balance constraint
         def fuel_balance_constraint_rule(m, N, F1, Y, D, H, sH):
             """[kW]"""
 
-            if sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1 and not F1 in m.VreFuel:
+            if m.F1_unique[F1] and not F1 in m.vre_fuel:
                 # Filter fuels that are superordinated to more than one sub fuels.
                 # Those fuels represent only the superset of a fuel type and are not used in particular
                 # skip.constraint for superset fuels
 
-                # Sum consumption over all technologies
-                f_cons_temp = sum(m.f_cons[N,T,F,F1,Y,D,H,sH] for T in m.Tech - m.StorageTech if m.Max_inst_cap[N,T,Y] > 0 for F in m.Fuel if m.F_subst[F,F1] and (m.E_input[T,F] or m.F_subst['Electricity',F1] and (m.F_edp[N,T,Y,D,H,sH]>0 or m.V_edp[N,T,Y,D,H,sH]>0 or m.Aux_ed[T]>0)))
-
-                # Sum production over technologies except storages
-                f_prod_temp = sum(m.f_prod[N,T,F1,Y,D,H,sH] for T in m.Tech - m.StorageTech if m.Max_inst_cap[N,T,Y] > 0 if m.E_output[T,F1])
-
-                # Sum charge of storages
-                f_charge_temp = sum(m.f_cons[N,T,F,F1,Y,D,H,sH] for T in m.StorageTech if (m.Max_inst_cap[N,T,Y] > 0 and m.Max_inst_storage_vol[N,T,Y] > 0) for F in m.Fuel if m.E_input[T,F] and m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1)
-
-                # Sum discharge of storages
-                f_discharge_temp = sum(m.f_prod[N,T,F1,Y,D,H,sH] for T in m.StorageTech if (m.Max_inst_cap[N,T,Y] > 0 and m.Max_inst_storage_vol[N,T,Y] > 0) for F in m.Fuel if m.E_output[T,F] and m.F_subst[F, F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1)
-
-                f_import_temp = m.f_import[N,F1,Y,D,H,sH] if m.Max_f_import[N,F1] > 0 else 0
-
-                f_fix_quant_import_temp = (m.f_fix_quant_import[N,F1,Y,D,H,sH] * m.F_fix_quant_import_size[N,F1] / m.Delta_T) if m.Max_f_fix_quant_import[N,F1] > 0 else 0
-
-                f_import_timeseries_temp = m.f_import_timeseries[N,F1,Y,D,H,sH] if m.Max_f_import_timeseries[N,F1,Y] > 0 else 0
-
-                f_delivery_temp = sum(m.f_delivery[N,F,F1,Y,D,H,sH] for F in m.Fuel if m.F_subst[F,F1] and m.F_demand[N,F,Y,D,H,sH] > 0 and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1)
-
-                f_supply_cons_system_temp = sum(m.f_supply_cons_system[N,F,F1,Y,D,H,sH] for F in m.Fuel if m.F_subst[F,F1] and m.Share_const_cons_system[F] > 0 and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1)
-
-                f_export_temp = sum(m.f_export[N,F,F1,Y,D,H,sH] for F in m.Fuel if m.F_subst[F, F1] and (m.Max_f_export[N,F] > 0 or m.Max_f_injection[N,F] > 0) and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1)
-                f_export_timeseries_temp = sum(m.f_export_timeseries[N,F,F1,Y,D,H,sH] for F in m.Fuel if m.F_subst[F,F1] and m.Max_f_export_timeseries[N,F,Y] > 0 and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1)
-
-                f_slack_pos = m.f_slack_pos[N,F1,Y,D,H,sH] if m.Slack_switch == 1 else 0
-                f_slack_neg = m.f_slack_neg[N,F1,Y,D,H,sH] if m.Slack_switch == 1 else 0
-
-                balance = f_prod_temp + f_discharge_temp + f_import_temp + f_fix_quant_import_temp + f_import_timeseries_temp + f_slack_pos + f_slack_neg == f_cons_temp + f_supply_cons_system_temp + f_charge_temp + f_delivery_temp + f_export_temp + f_export_timeseries_temp
-
-                # Filter constraints, if balance is 0 == 0 (True) skip constraint
-                if not isinstance(balance, bool) :
-                    return balance
-                elif balance:
+                # Supply: production of technologies except storages, discharge of storages, imports and slack
+                supply = [m.f_prod[N,T,F1,Y,D,H,sH] for T in m.output_tech[F1] if (N,T,Y) in m.active_tech]
+                supply.extend(m.f_prod[N,T,F1,Y,D,H,sH] for T in m.StorageTech if (N,T,Y) in m.active_storage for F in m.subst_fuels[F1] if m.e_output[T,F])
+                if m.Max_f_import[N,F1] > 0:
+                    supply.append(m.f_import[N,F1,Y,D,H,sH])
+                if m.Max_f_fix_quant_import[N,F1] > 0:
+                    supply.append(m.F_fix_quant_import_size[N,F1] / m.delta_t * m.f_fix_quant_import[N,F1,Y,D,H,sH])
+                if m.Max_f_import_timeseries[N,F1,Y] > 0:
+                    supply.append(m.f_import_timeseries[N,F1,Y,D,H,sH])
+                if m.Slack_switch == 1:
+                    supply.extend((m.f_slack_pos[N,F1,Y,D,H,sH], m.f_slack_neg[N,F1,Y,D,H,sH]))
+
+                # Demand: consumption over all technologies, constant system consumption, charge of storages, delivery and exports
+                demand = [m.f_cons[N,T,F,F1,Y,D,H,sH] for T in m.NonStorageTech if (N,T,Y) in m.active_tech for F in m.subst_fuels[F1] if (m.e_input[T,F] or m.f_subst['Electricity',F1] and (m.F_edp[N,T,Y,D,H,sH]>0 or m.V_edp[N,T,Y,D,H,sH]>0 or m.Aux_ed[T]>0))]
+                demand.extend(m.f_supply_cons_system[N,F,F1,Y,D,H,sH] for F in m.subst_fuels[F1] if m.Share_const_cons_system[F] > 0)
+                demand.extend(m.f_cons[N,T,F,F1,Y,D,H,sH] for T in m.StorageTech if (N,T,Y) in m.active_storage for F in m.subst_fuels[F1] if m.e_input[T,F])
+                demand.extend(m.f_delivery[N,F,F1,Y,D,H,sH] for F in m.subst_fuels[F1] if m.F_demand[N,F,Y,D,H,sH] > 0)
+                demand.extend(m.f_export[N,F,F1,Y,D,H,sH] for F in m.subst_fuels[F1] if N in m.export_nodes[F])
+                demand.extend(m.f_export_timeseries[N,F,F1,Y,D,H,sH] for F in m.subst_fuels[F1] if N in m.export_timeseries_nodes[F,Y])
+
+                # Skip constraint if there is no flow at all, the balance would be 0 == 0
+                if not supply and not demand:
                     return pyo.Constraint.Skip
-                else:
-                    return None
+                return pyo.quicksum(supply, linear=True) == pyo.quicksum(demand, linear=True)
 
             else:
                 return pyo.Constraint.Skip
 
-        m.fuel_balance_constraint = pyo.Constraint(m.Node, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_balance_constraint_rule)
+        # Balances with at least one possible flow, all other balances are 0 == 0 and would be skipped after building them
+        def fuel_balance_index_rule(m):
+            index = []
+            for N in m.Node:
+                for F1 in m.Fuel1:
+                    if not m.F1_unique[F1] or F1 in m.vre_fuel:
+                        continue
+                    subst_fuels = m.subst_fuels[F1]
+                    el = subst_fuels and m.f_subst['Electricity',F1]
+                    for Y in m.Year:
+                        tech = [T for T in m.NonStorageTech if (N,T,Y) in m.active_tech]
+                        storage = [T for T in m.StorageTech if (N,T,Y) in m.active_storage]
+                        static = F1 in m.SlackFuel or m.Max_f_import[N,F1] > 0 or m.Max_f_fix_quant_import[N,F1] > 0 or m.Max_f_import_timeseries[N,F1,Y] > 0 \
+                            or any(m.e_output[T,F1] for T in tech) \
+                            or any(m.e_input[T,F] or (el and m.Aux_ed[T] > 0) for T in tech for F in subst_fuels) \
+                            or any(m.e_input[T,F] or m.e_output[T,F] for T in storage for F in subst_fuels) \
+                            or any(m.Share_const_cons_system[F] > 0 or N in m.export_nodes[F] or N in m.export_timeseries_nodes[F,Y] for F in subst_fuels)
+                        if static:
+                            index.extend((N, F1, Y) + t for t in m.time_idx)
+                            continue
+                        # Time steps with demand of a substituted fuel or with electricity demand profiles of active techs
+                        active = np.zeros(len(m.time_idx), dtype=bool)
+                        for F in subst_fuels:
+                            active |= m.F_demand_arr[N,F,Y] > 0
+                        if el:
+                            for T in tech:
+                                active |= (m.F_edp_arr[N,T,Y] > 0) | (m.V_edp_arr[N,T,Y] > 0)
+                        index.extend((N, F1, Y) + m.time_idx[k] for k in np.flatnonzero(active))
+            return index
+        m.FuelBalanceIndex = pyo.Set(dimen=6, initialize=fuel_balance_index_rule)
+
+        m.fuel_balance_constraint = pyo.Constraint(m.FuelBalanceIndex, rule=fuel_balance_constraint_rule)
 
 
         def fuel_delivery_constraint_rule(m, N, F, Y, D, H, sH):
             """[kW]"""
             if m.F_demand[N,F,Y,D,H,sH] > 0:
-                return sum(m.f_delivery[N,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1) == m.F_demand[N,F,Y,D,H,sH]
+                return pyo.quicksum((m.f_delivery[N,F,F1,Y,D,H,sH] for F1 in m.subst_pairs[F]), linear=True) == m.F_demand[N,F,Y,D,H,sH]
             else:
                 return pyo.Constraint.Skip
         m.fuel_delivery_constraint = pyo.Constraint(m.Node, m.Fuel, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_delivery_constraint_rule)
@@ -1135,17 +1302,22 @@ class OptSys:
         def fuel_supply_cons_system_constraint_rule(m, N, F, Y, D, H, sH):
             """[kW]"""
             if m.Share_const_cons_system[F] > 0:
-                return sum(m.f_supply_cons_system[N,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1) == m.Const_cons_system[N,F,Y]
+                return pyo.quicksum((m.f_supply_cons_system[N,F,F1,Y,D,H,sH] for F1 in m.subst_pairs[F]), linear=True) == m.Const_cons_system[N,F,Y]
             else:
                 return pyo.Constraint.Skip
         m.f_supply_cons_system_constraint = pyo.Constraint(m.Node, m.Fuel, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_supply_cons_system_constraint_rule)
 
 
 
+        # Static part (N,T,F1,Y) of the production constraints, so rules are only called for active techs and their output fuels
+        def production_index_rule(m):
+            return [(N, T, F1, Y) for N, T, Y in sorted(m.active_tech) if T in m.NonStorageTech for F1 in m.output_fuels[T]]
+        m.ProductionIndex = pyo.Set(dimen=4, initialize=production_index_rule)
+
         # Fuel production for technologies except storages, storage consumption and production (charge/discharge) are treated in storage balance
         def fuel_production_linear_constraint_rule(m, N, T, F1, Y, D, H, sH):
             """[kW]"""
-            if m.E_output[T,F1] and m.Max_inst_cap[N,T,Y] > 0:
+            if m.e_output[T,F1] and (N,T,Y) in m.active_tech:
                 if m.Cap_of_input[T]:
                     # eg: Electrolysis
                     Eff_temp = m.Eff[T]
@@ -1158,75 +1330,80 @@ class OptSys:
             else:
                 return pyo.Constraint.Skip
 
-        m.fuel_production_linear_constraint = pyo.Constraint(m.Node, m.Tech - m.StorageTech, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_production_linear_constraint_rule)
+        m.fuel_production_linear_constraint = pyo.Constraint(m.ProductionIndex, m.Day, m.Hour, m.SubHour, rule=fuel_production_linear_constraint_rule)
 
 
         # Fuel production over fuel production at max. efficiency [kW]
         def fuel_production_over_part_load_max_eff_rule(m,N,T,F1,Y,D,H,sH):
             """ [kW] """
-            if m.E_output[T, F1] and m.K_part_load_max_eff[T] > 0 and m.Max_inst_cap[N,T,Y] > 0:
+            if m.e_output[T, F1] and m.K_part_load_max_eff[T] > 0 and (N,T,Y) in m.active_tech:
                 return m.f_prod_over_max_eff[N,T,F1,Y,D,H,sH] >= m.f_prod_lin[N,T,F1,Y,D,H,sH] - m.F_prod_part_load_max_eff[N,T,Y]
             else:
                 return pyo.Constraint.Skip
-        m.fuel_production_over_partload_max_eff_constraint = pyo.Constraint(m.Node, m.Tech-m.StorageTech, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_production_over_part_load_max_eff_rule)
+        m.fuel_production_over_partload_max_eff_constraint = pyo.Constraint(m.ProductionIndex, m.Day, m.Hour, m.SubHour, rule=fuel_production_over_part_load_max_eff_rule)
 
         def fuel_production_over_part_load_bend_rule(m,N,T,F1,Y,D,H,sH):
             """ [kW] """
-            if m.E_output[T, F1] and m.K_part_load_bend[T] > 0 and m.Max_inst_cap[N,T,Y] > 0:
+            if m.e_output[T, F1] and m.K_part_load_bend[T] > 0 and (N,T,Y) in m.active_tech:
                 return m.f_prod_over_bend[N,T,F1,Y,D,H,sH] >= m.f_prod_lin[N,T,F1,Y,D,H,sH] - m.F_prod_part_load_bend[N,T,Y]
             else:
                 return pyo.Constraint.Skip
-        m.fuel_production_over_partload_bend_constraint = pyo.Constraint(m.Node, m.Tech-m.StorageTech, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_production_over_part_load_bend_rule)
+        m.fuel_production_over_partload_bend_constraint = pyo.Constraint(m.ProductionIndex, m.Day, m.Hour, m.SubHour, rule=fuel_production_over_part_load_bend_rule)
 
 
         def fuel_production_constraint_rule(m, N, T, F1, Y, D, H, sH):
             """[kW]"""
-            if m.E_output[T,F1] and m.Max_inst_cap[N,T,Y] > 0:
+            if m.e_output[T,F1] and (N,T,Y) in m.active_tech:
                 f_prod_temp = m.f_prod_lin[N,T,F1,Y,D,H,sH] - m.f_prod_over_max_eff[N,T,F1,Y,D,H,sH] * m.K_part_load_max_eff[T] - m.f_prod_over_bend[N,T,F1,Y,D,H,sH] * m.K_part_load_bend[T]
                 return m.f_prod[N,T,F1,Y,D,H,sH] <= f_prod_temp
             else:
                 return pyo.Constraint.Skip
 
-        m.fuel_production_constraint = pyo.Constraint(m.Node, m.Tech - m.StorageTech, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_production_constraint_rule)
+        m.fuel_production_constraint = pyo.Constraint(m.ProductionIndex, m.Day, m.Hour, m.SubHour, rule=fuel_production_constraint_rule)
 
 
         def fuel_production_upperlimit_constraint_rule(m, N, T, F1, Y):
             """[kW]"""
-            if m.E_output[T,F1] and m.Max_inst_cap[N,T,Y] > 0 and m.K_f_prod_upperlimit[T] < infinity:
-                if sum(m.F_demand[N,F,Y,D,H,sH] for F in m.Fuel if m.F_subst[F,F1] for D in m.Day for H in m.Hour for sH in m.SubHour) == 0:
+            if m.e_output[T,F1] and (N,T,Y) in m.active_tech and m.K_f_prod_upperlimit[T] < infinity:
+                if (N,F1,Y) in m.zero_subst_demand:
                     f_demand_upperlimit_temp = 0
                 else:
-                    f_demand_upperlimit_temp  = m.K_f_prod_upperlimit[T] * sum(m.f_delivery[N,F,F1,Y,D,H,sH] for F in m.Fuel if m.F_subst[F,F1] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
-                return sum(m.f_prod[N,T,F1,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D  <= f_demand_upperlimit_temp
+                    f_demand_upperlimit_temp  = m.K_f_prod_upperlimit[T] * pyo.quicksum((m.f_delivery[(N,F,F1,Y) + t] for F in m.subst_fuels[F1] for t in m.time_idx), linear=True) * m.time_scale
+                return pyo.quicksum(m.f_prod_time[N,T,F1,Y], linear=True) * m.time_scale  <= f_demand_upperlimit_temp
             else:
                 return pyo.Constraint.Skip
 
-        m.fuel_production_upperlimit_constraint = pyo.Constraint(m.Node, m.Tech - m.StorageTech, m.Fuel1, m.Year, rule=fuel_production_upperlimit_constraint_rule)
+        m.fuel_production_upperlimit_constraint = pyo.Constraint(m.ProductionIndex, rule=fuel_production_upperlimit_constraint_rule)
 
 
+        # Static part (N,T,F,Y) of the consumption constraint, electricity demand profiles are checked per time step in the rule
+        def consumption_index_rule(m):
+            return [(N, T, F, Y) for N, T, Y in sorted(m.active_tech) if T in m.NonStorageTech for F in m.Fuel if not F in m.vre_fuel and (m.e_input[T,F] or F == 'Electricity')]
+        m.ConsumptionIndex = pyo.Set(dimen=4, initialize=consumption_index_rule)
+
         # Fuel consumption for technologies not in storage technologies, storage cons&prod are treated in storage balances
         def fuel_consumption_constraint_rule(m, N, T, F, Y, D, H, sH):
             """[kW]"""
-            if m.Max_inst_cap[N,T,Y] > 0 and not F in m.VreFuel and (m.E_input[T,F] or (F == 'Electricity' and (m.F_edp[N,T,Y,D,H,sH]>0 or m.V_edp[N,T,Y,D,H,sH]>0 or m.Aux_ed[T]>0))):
-                f_cons_total = sum(m.f_prod_lin[N,T,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.E_output[T,F1]) / m.Eff[T] if m.E_input[T,F] else 0
+            if (N,T,Y) in m.active_tech and not F in m.vre_fuel and (m.e_input[T,F] or (F == 'Electricity' and (m.F_edp[N,T,Y,D,H,sH]>0 or m.V_edp[N,T,Y,D,H,sH]>0 or m.Aux_ed[T]>0))):
+                f_cons_total = pyo.quicksum((m.f_prod_lin[N,T,F1,Y,D,H,sH] for F1 in m.output_fuels[T]), linear=True) / m.Eff[T] if m.e_input[T,F] else 0
 
                 if F == 'Electricity':
                     # Add electricity demand profils
                     f_cons_total += m.F_edp[N,T,Y,D,H,sH] + m.V_edp[N,T,Y,D,H,sH] * m.inst_cap[N,T,Y] \
-                                  + (sum(m.f_prod_lin[N,T,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.E_output[T,F1]) * m.Aux_ed[T] if m.Aux_ed[T] > 0 else 0)
+                                  + (pyo.quicksum((m.f_prod_lin[N,T,F1,Y,D,H,sH] for F1 in m.output_fuels[T]), linear=True) * m.Aux_ed[T] if m.Aux_ed[T] > 0 else 0)
 # SHE: parenthesis are necessary around ( ... if m.Aux_ed[T] != 0 else 0 ) otherwise whole eq is set to zero
 
-                return sum(m.f_cons[N,T,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1) == f_cons_total
+                return pyo.quicksum((m.f_cons[N,T,F,F1,Y,D,H,sH] for F1 in m.subst_pairs[F]), linear=True) == f_cons_total
             else:
                 return pyo.Constraint.Skip
 
-        m.fuel_consumption_constraint = pyo.Constraint(m.Node, m.Tech - m.StorageTech, m.Fuel, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_consumption_constraint_rule)
+        m.fuel_consumption_constraint = pyo.Constraint(m.ConsumptionIndex, m.Day, m.Hour, m.SubHour, rule=fuel_consumption_constraint_rule)
 
 
         # Fuel import constraint
         def fuel_import_constraint_rule(m, N, F1, Y, D, H, sH):
             """[kW]"""
-            if not F1 in m.VreFuel and (m.Min_f_import[N,F1] > 0 or m.Max_f_import[N,F1] < infinity) and not m.Max_f_import[N,F1] == 0:
+            if not F1 in m.vre_fuel and (m.Min_f_import[N,F1] > 0 or m.Max_f_import[N,F1] < infinity) and not m.Max_f_import[N,F1] == 0:
                 return pyo.inequality(m.Min_f_import[N,F1], m.f_import[N,F1,Y,D,H,sH], m.Max_f_import[N,F1])
             else:
                 return pyo.Constraint.Skip
@@ -1235,23 +1412,44 @@ class OptSys:
 
 
 
+        # Fix quantity import is possible only at supply days and hours
+        # f_fix_quant_import is not used for Max_f_fix_quant_import == 0
+        def fix_quant_import_index_rule(m):
+            index = []
+            for N in m.Node:
+                for F1 in m.Fuel1:
+                    if m.Max_f_fix_quant_import[N,F1] == 0:
+                        continue
+                    for Y in m.Year:
+                        for D, H, sH in m.time_idx:
+                            # Weekday from 1 to 7; for D=5 -> (5-1)%7 + 1 = 5 and (12-1)%7 + 1 = 5
+                            if m.F_fix_quant_supply_day[N,F1, (D-1) % 7 + 1] and m.F_fix_quant_supply_hour[N, F1, H] and sH == 0:
+                                index.append((N, F1, Y, D, H, sH))
+            return index
+        m.FixQuantImportIndex = pyo.Set(dimen=6, initialize=fix_quant_import_index_rule)
+
+        # f_fix_quant_import of the other time steps is fixed to zero before the constraint is declared
+        def fix_quant_import_zero_rule(m):
+            for N in m.Node:
+                for F1 in m.Fuel1:
+                    if m.Max_f_fix_quant_import[N,F1] == 0:
+                        continue
+                    for Y in m.Year:
+                        for D, H, sH in m.time_idx:
+                            if (N, F1, Y, D, H, sH) not in m.FixQuantImportIndex:
+                                m.f_fix_quant_import[N, F1, Y, D, H, sH].fix(0)
+        m.Fix_quant_import_zero = pyo.BuildAction(rule=fix_quant_import_zero_rule)
+
         def fuel_fix_quant_import_constraint_rule(m, N, F1, Y, D, H, sH):
             """[1/h]"""
-            if m.Max_f_fix_quant_import[N,F1] == 0:
-                return pyo.Constraint.Skip
-            else:
-            	# Weekday from 1 to 7; for D=5 -> (5-1)%7 + 1 = 5 and (12-1)%7 + 1 = 5
-                if m.F_fix_quant_supply_day[N,F1, (D-1) % 7 + 1] and m.F_fix_quant_supply_hour[N, F1, H] and sH == 0:
-                    return m.f_fix_quant_import[N,F1,Y,D,H,sH] <= m.Max_f_fix_quant_import[N, F1]
-                else:
-                    return m.f_fix_quant_import[N, F1, Y, D, H, sH] == 0
-        m.fuel_fix_quant_import_constraint = pyo.Constraint(m.Node, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_fix_quant_import_constraint_rule)
+            return m.f_fix_quant_import[N,F1,Y,D,H,sH] <= m.Max_f_fix_quant_import[N, F1]
+        m.fuel_fix_quant_import_constraint = pyo.Constraint(m.FixQuantImportIndex, rule=fuel_fix_quant_import_constraint_rule)
 
         # Fuel export constraint
         def fuel_export_constraint_rule(m, N, F, Y, D, H, sH):
             """[kW]"""
-            if not F in m.VreFuel and (m.Min_f_export[N,F] > 0 or m.Max_f_export[N,F] < infinity) and not m.Max_f_export[N,F] == 0:
-                return pyo.inequality(m.Min_f_export[N, F], sum(m.f_export[N,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1), m.Max_f_export[N, F])
+            if not F in m.vre_fuel and (m.Min_f_export[N,F] > 0 or m.Max_f_export[N,F] < infinity) and not m.Max_f_export[N,F] == 0:
+                return pyo.inequality(m.Min_f_export[N, F], pyo.quicksum((m.f_export[N,F,F1,Y,D,H,sH] for F1 in m.subst_pairs[F]), linear=True), m.Max_f_export[N, F])
             else:
                 return pyo.Constraint.Skip
         m.fuel_export_constraint = pyo.Constraint(m.Node, m.Fuel, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_export_constraint_rule)
@@ -1259,8 +1457,8 @@ class OptSys:
         # Fuel injection constraint
         def fuel_injection_constraint_rule(m, N, F, Y, D, H, sH):
             """[kW]"""
-            if not F in m.VreFuel and (m.Min_f_injection[N,F] > 0 or m.Max_f_injection[N,F] < infinity) and not m.Max_f_injection[N,F] == 0:
-                return pyo.inequality(m.Min_f_injection[N,F] * m.F_network_flow[N,F,Y,D,H,sH], sum(m.f_export[N,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1), m.Max_f_injection[N,F] * m.F_network_flow[N,F,Y,D,H,sH])
+            if not F in m.vre_fuel and (m.Min_f_injection[N,F] > 0 or m.Max_f_injection[N,F] < infinity) and not m.Max_f_injection[N,F] == 0:
+                return pyo.inequality(m.Min_f_injection[N,F] * m.F_network_flow[N,F,Y,D,H,sH], pyo.quicksum((m.f_export[N,F,F1,Y,D,H,sH] for F1 in m.subst_pairs[F]), linear=True), m.Max_f_injection[N,F] * m.F_network_flow[N,F,Y,D,H,sH])
             else:
                 return pyo.Constraint.Skip
         m.fuel_injection_constraint = pyo.Constraint(m.Node, m.Fuel, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_injection_constraint_rule)
@@ -1269,7 +1467,7 @@ class OptSys:
         def fuel_timeseries_export_constraint_rule(m, N, F, Y, D, H, sH):
             """[kW]"""
             if m.Min_f_export_timeseries[N,F,Y] > 0 or m.Max_f_export_timeseries[N,F,Y] < infinity and not m.Max_f_export_timeseries[N,F,Y] == 0:
-                return pyo.inequality(m.Min_f_export_timeseries[N,F,Y], sum(m.f_export_timeseries[N,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1), m.Max_f_export_timeseries[N,F,Y])
+                return pyo.inequality(m.Min_f_export_timeseries[N,F,Y], pyo.quicksum((m.f_export_timeseries[N,F,F1,Y,D,H,sH] for F1 in m.subst_pairs[F]), linear=True), m.Max_f_export_timeseries[N,F,Y])
             else:
                 return pyo.Constraint.Skip
         m.fuel_timeseries_export_constraint = pyo.Constraint(m.Node, m.Fuel, m.Year, m.Day, m.Hour, m.SubHour, rule=fuel_timeseries_export_constraint_rule)
@@ -1287,9 +1485,9 @@ class OptSys:
         # Define start storage energy levels for F1, sum of F1 == Start_storage_level[F]
         def start_storage_energy_level_constraint_rule(m, N, StoreT):
             """[kWh]"""
-            if m.Max_inst_cap[N,StoreT,max(m.Year)] > 0 and m.Max_inst_storage_vol[N,StoreT,max(m.Year)] > 0:
-                F = [F for F in m.Fuel if m.E_input[StoreT, F]][0]
-                return sum(m.start_storage_energy_level[N, StoreT, F1] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1) == m.Start_storage_level[N, StoreT] * m.inst_storage_vol[N, StoreT, min(m.Year)]
+            if m.Max_inst_cap[N,StoreT,m.y_max] > 0 and m.Max_inst_storage_vol[N,StoreT,m.y_max] > 0 and StoreT in m.storage_input_fuel:
+                F = m.storage_input_fuel[StoreT]
+                return pyo.quicksum((m.start_storage_energy_level[N, StoreT, F1] for F1 in m.subst_pairs[F]), linear=True) == m.Start_storage_level[N, StoreT] * m.inst_storage_vol[N, StoreT, m.y_min]
             else:
                 return pyo.Constraint.Skip
 
@@ -1299,90 +1497,126 @@ class OptSys:
         # End storage energy level for each F1
         def end_storage_energy_level_constraint_rule(m, N, StoreT, F1):
             """[kWh]"""
+            if StoreT not in m.storage_input_fuel:
+                return pyo.Constraint.Skip
             # Fuel of tech
-            F = [F for F in m.Fuel if m.E_input[StoreT, F]][0]
-            if m.Max_inst_cap[N,StoreT,max(m.Year)] > 0 and m.Max_inst_storage_vol[N,StoreT,max(m.Year)] > 0 and m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1:
-                return m.storage_energy_level[N, StoreT, F1, max(m.Year), max(m.Day), max(m.Hour), max(m.SubHour)] == m.start_storage_energy_level[N, StoreT, F1]
+            F = m.storage_input_fuel[StoreT]
+            if m.Max_inst_cap[N,StoreT,m.y_max] > 0 and m.Max_inst_storage_vol[N,StoreT,m.y_max] > 0 and m.f_subst[F,F1] and m.F1_unique[F1]:
+                return m.storage_energy_level[N, StoreT, F1, m.y_max, m.d_max, m.h_max, m.sh_max] == m.start_storage_energy_level[N, StoreT, F1]
             else:
                 return pyo.Constraint.Skip
 
         m.end_storage_energy_level_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Fuel1, rule=end_storage_energy_level_constraint_rule)
 
 
+        # Static parts of the storage constraints, only active storages with a fuel type
+        def storage_balance_index_rule(m):
+            return [(N, StoreT, F1, Y) for N, StoreT, Y in sorted(m.active_storage) if StoreT in m.storage_input_fuel for F1 in m.subst_pairs[m.storage_input_fuel[StoreT]]]
+        m.StorageBalanceIndex = pyo.Set(dimen=4, initialize=storage_balance_index_rule)
+
+        def storage_charge_index_rule(m):
+            return [(N, StoreT, F, Y) for N, StoreT, Y in sorted(m.active_storage) for F in m.input_fuels[StoreT]]
+        m.StorageChargeIndex = pyo.Set(dimen=4, initialize=storage_charge_index_rule)
+
+        def storage_discharge_index_rule(m):
+            return [(N, StoreT, F, Y) for N, StoreT, Y in sorted(m.active_storage) for F in m.Fuel if m.e_output[StoreT, F]]
+        m.StorageDischargeIndex = pyo.Set(dimen=4, initialize=storage_discharge_index_rule)
+
+        def storage_level_index_rule(m):
+            return [(N, StoreT, Y) for N, StoreT, Y in sorted(m.active_storage) if StoreT in m.storage_input_fuel]
+        m.StorageLevelIndex = pyo.Set(dimen=3, initialize=storage_level_index_rule)
+
+        # Previous time stamp of each time step, None if the storage balance starts from the start storage level
+        def previous_time_step_rule(m):
+            m.previous_time_step = {}
+            for Y in m.Year:
+                for D in m.Day:
+                    for H in m.Hour:
+                        for sH in m.SubHour:
+                            preSubH = sH - m.Delta_sH
+                            preH = H; preD = D; preY = Y
+
+                            if preSubH < m.sh_min:
+                                preSubH = m.sh_max
+                                preH -= m.Delta_H
+
+                                if preH < m.h_min:
+                                    preH = m.h_max
+                                    preD -= m.Delta_D
+
+                                    if preD < m.d_min:
+                                        preD = m.d_max
+                                        preY -= m.Delta_Y
+
+                            if preY < m.Y_start or preY < m.y_min:
+                                m.previous_time_step[Y, D, H, sH] = None
+                            else:
+                                m.previous_time_step[Y, D, H, sH] = (preY, preD, preH, preSubH)
+        m.Previous_time_step = pyo.BuildAction(rule=previous_time_step_rule)
+
         # Storage balance discharge, charge and change in storage level
         def storage_energy_balance_constraint_rule(m, N, StoreT, F1, Y, D, H, sH):
             """[kWh]"""
-            if m.Max_inst_cap[N,StoreT,Y] > 0 and m.Max_inst_storage_vol[N,StoreT,Y] > 0 and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1:
+            if (N,StoreT,Y) in m.active_storage and m.F1_unique[F1] and StoreT in m.storage_input_fuel:
                 # Filter fuels that are superordinated to more than one sub fuels.
         		# Those fuels represent only the superset of a fuel type and are not used in particular
         		# skip.constraint for superset fuels
 
                 # Fuel type of storage
-                F = [F for F in m.Fuel if m.E_input[StoreT, F]][0]
+                F = m.storage_input_fuel[StoreT]
 
-                if not m.F_subst[F,F1]:
+                if not m.f_subst[F,F1]:
                     return pyo.Constraint.Skip
 
                 # Determine charged and discharged energy compromised by efficiency: [kW] * dT[h]
-                charge = m.f_cons[N, StoreT, F, F1, Y, D, H, sH] * m.Eff[StoreT] * m.Delta_T
-                discharge = m.f_prod[N, StoreT, F1, Y, D, H, sH] / m.Eff[StoreT] * m.Delta_T
-
-                # Previous time stamp
-                preSubH = sH - m.Delta_sH
-                preH = H; preD = D; preY = Y
-
-                if preSubH < min(m.SubHour):
-                    preSubH = max(m.SubHour)
-                    preH -= m.Delta_H
-
-                    if preH < min(m.Hour):
-                        preH = max(m.Hour)
-                        preD -= m.Delta_D
-
-                        if preD < min(m.Day):
-                            preD = max(m.Day)
-                            preY -= m.Delta_Y
+                charge_coef = m.Eff[StoreT] * m.delta_t
+                discharge_coef = m.delta_t / m.Eff[StoreT]
 
                 # Balance for first time step
-                if preY < m.Y_start or preY < min(m.Year):
+                pre = m.previous_time_step[Y, D, H, sH]
+                if pre is None:
                     preLevel = m.start_storage_energy_level[N, StoreT, F1]
                 else:
-                    preLevel = m.storage_energy_level[N, StoreT, F1, preY, preD, preH, preSubH]
+                    preLevel = m.storage_energy_level[(N, StoreT, F1) + pre]
 
-                return m.storage_energy_level[N, StoreT, F1, Y, D, H, sH] == preLevel + charge - discharge
+                # level - preLevel - charge + discharge == 0
+                balance = LinearExpression(constant=0,
+                                           linear_coefs=[1, -1, -charge_coef, discharge_coef],
+                                           linear_vars=[m.storage_energy_level[N, StoreT, F1, Y, D, H, sH], preLevel, m.f_cons[N, StoreT, F, F1, Y, D, H, sH], m.f_prod[N, StoreT, F1, Y, D, H, sH]])
+                return balance == 0
             else:
                 # Skip constraint if no storage is allowed
                 return pyo.Constraint.Skip
 
-        m.storage_energy_balance_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Fuel1, m.Year, m.Day, m.Hour, m.SubHour, rule=storage_energy_balance_constraint_rule)
+        m.storage_energy_balance_constraint = pyo.Constraint(m.StorageBalanceIndex, m.Day, m.Hour, m.SubHour, rule=storage_energy_balance_constraint_rule)
 
 
         # Storage charge constraint
         def storage_charge_constraint_rule(m, N, StoreT, F, Y, D, H, sH):
             """[kW]"""
-            if m.Max_inst_cap[N,StoreT,Y] > 0 and m.Max_inst_storage_vol[N,StoreT,Y] > 0 and m.E_input[StoreT, F]:
-                return sum(m.f_cons[N, StoreT, F, F1, Y, D, H, sH] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1) <= m.inst_cap[N, StoreT, Y]
+            if (N,StoreT,Y) in m.active_storage and m.e_input[StoreT, F]:
+                return pyo.quicksum((m.f_cons[N, StoreT, F, F1, Y, D, H, sH] for F1 in m.subst_pairs[F]), linear=True) <= m.inst_cap[N, StoreT, Y]
             else:
                 return pyo.Constraint.Skip
 
-        m.storage_charge_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Fuel, m.Year, m.Day, m.Hour, m.SubHour, rule=storage_charge_constraint_rule)
+        m.storage_charge_constraint = pyo.Constraint(m.StorageChargeIndex, m.Day, m.Hour, m.SubHour, rule=storage_charge_constraint_rule)
 
         # Storage discharge constraint
         def storage_discharge_constraint_rule(m, N, StoreT, F, Y, D, H, sH):
             """[kW]"""
-            if m.Max_inst_cap[N,StoreT,Y] > 0 and m.Max_inst_storage_vol[N,StoreT,Y] > 0 and m.E_output[StoreT, F]:
-                return sum(m.f_prod[N, StoreT, F1, Y, D, H, sH] for F1 in m.Fuel1 if m.F_subst[F,F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1) <= m.inst_cap[N, StoreT, Y]
+            if (N,StoreT,Y) in m.active_storage and m.e_output[StoreT, F]:
+                return pyo.quicksum((m.f_prod[N, StoreT, F1, Y, D, H, sH] for F1 in m.subst_pairs[F]), linear=True) <= m.inst_cap[N, StoreT, Y]
             else:
                 return pyo.Constraint.Skip
 
-        m.storage_discharge_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Fuel, m.Year, m.Day, m.Hour, m.SubHour, rule=storage_discharge_constraint_rule)
+        m.storage_discharge_constraint = pyo.Constraint(m.StorageDischargeIndex, m.Day, m.Hour, m.SubHour, rule=storage_discharge_constraint_rule)
 
 
 
         def storage_energy_level_reserve_constraint_rule(m, N, StoreT, F, Y, D, H, sH):
             """Storage level greater than reserve capacity [kWh]"""
             if m.Min_energy_reserve[N, StoreT, F] > 0:
-                return m.Min_energy_reserve[N, StoreT, F] + (1-m.Availability_storage_vol[StoreT]) * m.inst_storage_vol[N, StoreT, Y] <= sum(m.storage_energy_level[N, StoreT, F1, Y, D, H, sH] for F1 in m.Fuel1 if m.F_subst[F, F1])
+                return m.Min_energy_reserve[N, StoreT, F] + (1-m.Availability_storage_vol[StoreT]) * m.inst_storage_vol[N, StoreT, Y] <= pyo.quicksum((m.storage_energy_level[N, StoreT, F1, Y, D, H, sH] for F1 in m.sub_fuels[F]), linear=True)
             else:
                 return pyo.Constraint.Skip
 
@@ -1392,7 +1626,7 @@ class OptSys:
         def storage_energy_level_rolling_reserve_constraint_rule(m, N, StoreT, F, Y, D, H, sH):
             """Storage level greater than rolling reserve capacity [kWh]"""
             if m.Window_rolling_reserve[N, StoreT, F] > 0 and m.F_rolling_reserve[N, StoreT, F] > 0:
-                return m.Rolling_energy_reserve[N,StoreT,F,Y,D,H,sH] + (1-m.Availability_storage_vol[StoreT]) * m.inst_storage_vol[N,StoreT,Y] <= sum(m.storage_energy_level[N, StoreT, F1, Y, D, H, sH] for F1 in m.Fuel1 if m.F_subst[F, F1])
+                return m.Rolling_energy_reserve[N,StoreT,F,Y,D,H,sH] + (1-m.Availability_storage_vol[StoreT]) * m.inst_storage_vol[N,StoreT,Y] <= pyo.quicksum((m.storage_energy_level[N, StoreT, F1, Y, D, H, sH] for F1 in m.sub_fuels[F]), linear=True)
             else:
                 return pyo.Constraint.Skip
 
@@ -1402,25 +1636,25 @@ class OptSys:
         # Min and max storage level constraints [kWh]
         def storage_energy_level_min_constraint_rule(m, N, StoreT, Y, D, H, sH):
             """Storage level between min and max allowed storage levels. [kWh]"""
-            if m.Max_inst_cap[N,StoreT,Y] > 0 and m.Max_inst_storage_vol[N,StoreT,Y] > 0:
+            if (N,StoreT,Y) in m.active_storage and StoreT in m.storage_input_fuel:
                 # Fuel type of storage
-                F = [F for F in m.Fuel if m.E_input[StoreT, F]][0]
-                return m.min_storage_energy_level[N, StoreT, Y] <= sum(m.storage_energy_level[N, StoreT, F1, Y, D, H, sH] for F1 in m.Fuel1 if m.F_subst[F, F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1)
+                F = m.storage_input_fuel[StoreT]
+                return m.min_storage_energy_level[N, StoreT, Y] <= pyo.quicksum((m.storage_energy_level[N, StoreT, F1, Y, D, H, sH] for F1 in m.subst_pairs[F]), linear=True)
             else:
                 return pyo.Constraint.Skip
 
-        m.storage_energy_level_min_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Year, m.Day, m.Hour, m.SubHour, rule=storage_energy_level_min_constraint_rule)
+        m.storage_energy_level_min_constraint = pyo.Constraint(m.StorageLevelIndex, m.Day, m.Hour, m.SubHour, rule=storage_energy_level_min_constraint_rule)
 
         def storage_energy_level_max_constraint_rule(m, N, StoreT, Y, D, H, sH):
             """Storage level between min and max allowed storage levels. [kWh]"""
-            if m.Max_inst_cap[N,StoreT,Y] > 0 and m.Max_inst_storage_vol[N,StoreT,Y] > 0:
+            if (N,StoreT,Y) in m.active_storage and StoreT in m.storage_input_fuel:
                 # Fuel type of storage
-                F = [F for F in m.Fuel if m.E_input[StoreT, F]][0]
-                return sum(m.storage_energy_level[N, StoreT, F1, Y, D, H, sH] for F1 in m.Fuel1 if m.F_subst[F, F1] and sum(m.F_subst[F1,F2] for F2 in m.Fuel1) == 1) <= m.max_storage_energy_level[N, StoreT, Y]
+                F = m.storage_input_fuel[StoreT]
+                return pyo.quicksum((m.storage_energy_level[N, StoreT, F1, Y, D, H, sH] for F1 in m.subst_pairs[F]), linear=True) <= m.max_storage_energy_level[N, StoreT, Y]
             else:
                 return pyo.Constraint.Skip
 
-        m.storage_energy_level_max_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Year, m.Day, m.Hour, m.SubHour, rule=storage_energy_level_max_constraint_rule)
+        m.storage_energy_level_max_constraint = pyo.Constraint(m.StorageLevelIndex, m.Day, m.Hour, m.SubHour, rule=storage_energy_level_max_constraint_rule)
 
 
         # Installed storage volume min/max constraint [kWh]
@@ -1431,20 +1665,21 @@ class OptSys:
         m.inst_storage_vol_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Year, rule=inst_storage_vol_constraint_rule)
 
 
-        # Energy-to-power ratio storage constraint
+        # Energy-to-power ratio storage constraint, only for active storages with a ratio
+        def storage_power_index_rule(m):
+            return [(N, StoreT, Y) for N, StoreT, Y in sorted(m.active_storage) if m.Energy_power_ratio[StoreT] > 0]
+        m.StoragePowerIndex = pyo.Set(dimen=3, initialize=storage_power_index_rule)
+
         def inst_storage_power_constraint_rule(m, N, StoreT, Y):
             """[h]"""
-            if m.Max_inst_cap[N,StoreT,Y] > 0 and m.Max_inst_storage_vol[N,StoreT,Y] > 0 and m.Energy_power_ratio[StoreT] > 0:
-                return m.inst_cap[N,StoreT,Y] <= m.inst_storage_vol[N,StoreT,Y] / m.Energy_power_ratio[StoreT]
-            else:
-                return pyo.Constraint.Skip
+            return m.inst_cap[N,StoreT,Y] <= m.inst_storage_vol[N,StoreT,Y] / m.Energy_power_ratio[StoreT]
 
-        m.inst_storage_power_constraint = pyo.Constraint(m.Node, m.StorageTech, m.Year, rule=inst_storage_power_constraint_rule)
+        m.inst_storage_power_constraint = pyo.Constraint(m.StoragePowerIndex, rule=inst_storage_power_constraint_rule)
 
 
         # Write model as class attribute
         step += 1
-        logger_main.info('{}/{}: Write model to class'.format(step, total_steps))
+        logger_main.info('%d/%d: Write model to class', step, total_steps)
         logger_main.info('Finished building pyomo model')
 
         return m
@@ -1492,6 +1727,28 @@ class OptSys:
         return res
 
 
+    def calc_disc_opex_factors(self, model):
+        """
+        Discount factor of each year for operational costs, summed over the years represented by it.
+        The missing years up to Scale_Y_to are valued with the last year.
+        """
+        y_offset = self.start_disc['opex']
+        key = (pyo.value(model.Discount_rate), pyo.value(model.Scale_Y_to), tuple(sorted(model.Year)), y_offset)
+        if key not in self.disc_cache:
+            nY = len(model.Year)
+            Y_max = max(model.Year)
+            Scale_Y_int = int(model.Scale_Y_to / nY)
+            r_frac = 1/(1+model.Discount_rate)
+            considered_years = nY * Scale_Y_int
+            #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
+            missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+
+            disc_y = {Y: sum(r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y2 in range(Scale_Y_int)) for Y in model.Year}
+            disc_y[Y_max] += sum(r_frac**Y for Y in missing_years)
+            self.disc_cache[key] = disc_y
+        return self.disc_cache[key]
+
+
     def calc_disc_opex(self, model, T):
         """
         Discount operational costs as sum Years and Nodes.
@@ -1501,31 +1758,19 @@ class OptSys:
             Set: Year, Day, Hour
             Param: Discount_rate, Scale_Y_to
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
 
-        return sum(model.opex[N,T,Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int) for N in model.Node) \
-           	 + sum(model.opex[N,T,max(model.Year)] * r_frac**Y for Y in missing_years for N in model.Node)
+        return sum(model.opex[N,T,Y] * disc_y[Y] for Y in model.Year for N in model.Node if (N,T,Y) in model.opex)
 
 
     def calc_disc_opex_system(self, model):
         """
         Discount system operational costs as sum Years and Nodes.
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
-        return sum(model.opex_system[N,Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int) for N in model.Node) \
-           	 + sum(model.opex_system[N,max(model.Year)] * r_frac**Y for Y in missing_years for N in model.Node)
+        return sum(model.opex_system[N,Y] * disc_y[Y] for Y in model.Year for N in model.Node)
 
 
 
@@ -1538,28 +1783,16 @@ class OptSys:
             Set: Year, Day, Hour
             Param: Discount_rate, Scale_Y_to
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
-        return sum(model.opex_fuel[N,F1,Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int) for N in model.Node) \
-           	 + sum(model.opex_fuel[N,F1,max(model.Year)] * r_frac**Y for Y in missing_years for N in model.Node)
+        return sum(model.opex_fuel[N,F1,Y] * disc_y[Y] for Y in model.Year for N in model.Node)
 
     def calc_disc_opex_network_capacity(self, model, F):
         """
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
-        return sum(model.opex_network_capacity[N,F,Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int) for N in model.Node) \
-           	 + sum(model.opex_network_capacity[N,F,max(model.Year)] * r_frac**Y for Y in missing_years for N in model.Node)
+        return sum(model.opex_network_capacity[N,F,Y] * disc_y[Y] for Y in model.Year for N in model.Node if (N,F,Y) in model.opex_network_capacity)
 
     def calc_disc_opex_auxmedium(self, model, A):
         """
@@ -1570,15 +1803,9 @@ class OptSys:
             Set: Year, Day, Hour
             Param: Discount_rate, Scale_Y_to
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
-        return sum(model.opex_auxmedium[N,T,A,Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int) for N in model.Node for T in model.Tech-model.StorageTech) \
-           	 + sum(model.opex_auxmedium[N,T,A,max(model.Year)] * r_frac**Y for Y in missing_years for N in model.Node for T in model.Tech-model.StorageTech)
+        return sum(model.opex_auxmedium[N,T,A,Y] * disc_y[Y] for Y in model.Year for N in model.Node for T in model.NonStorageTech)
 
     def calc_disc_revenue(self, model, F):
         """
@@ -1589,15 +1816,9 @@ class OptSys:
             Set: Year, Day, Hour
             Param: Discount_rate, Scale_Y_to
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
-        return sum(model.revenue[F,Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int)) \
-           	 + sum(model.revenue[F,max(model.Year)] * r_frac**Y for Y in missing_years)
+        return sum(model.revenue[F,Y] * disc_y[Y] for Y in model.Year)
 
 
     def calc_disc_revenue_timeseries(self, model, F):
@@ -1609,15 +1830,9 @@ class OptSys:
             Set: Year, Day, Hour
             Param: Discount_rate, Scale_Y_to
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
-        return sum(model.revenue_timeseries[F,Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int)) \
-           	 + sum(model.revenue_timeseries[F,max(model.Year)] * r_frac**Y for Y in missing_years)
+        return sum(model.revenue_timeseries[F,Y] * disc_y[Y] for Y in model.Year)
 
 
     def calc_disc_opex_timeseries(self, model,F1):
@@ -1629,15 +1844,9 @@ class OptSys:
             Set: Year, Day, Hour
             Param: Discount_rate, Scale_Y_to
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
-        return sum(model.opex_timeseries[F1,Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int)) \
-           	 + sum(model.opex_timeseries[F1,max(model.Year)] * r_frac**Y for Y in missing_years)
+        return sum(model.opex_timeseries[F1,Y] * disc_y[Y] for Y in model.Year)
 
 
     def calc_disc_opex_taxes(self, model):
@@ -1648,15 +1857,9 @@ class OptSys:
             Set: Year, Day, Hour
             Param: Discount_rate, Scale_Y_to
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
-        return sum(model.Opex_taxes[Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int)) \
-           	 + sum(model.Opex_taxes[max(model.Year)] * r_frac**Y for Y in missing_years)
+        return sum(model.Opex_taxes[Y] * disc_y[Y] for Y in model.Year)
 
 
     def calc_disc_opex_postprocessing(self, model, component, index1=None, index2=None, index3=None):
@@ -1668,34 +1871,11 @@ class OptSys:
             Set: Year, Day, Hour
             Param: Discount_rate, Scale_Y_to
         """
-        Scale_Y_int = int(model.Scale_Y_to / len(model.Year))
-        r_frac = 1/(1+model.Discount_rate)
-        y_offset = self.start_disc['opex']
-        considered_years = len(model.Year) * Scale_Y_int
-        #missing_years = [model.Scale_Y_to - (i+1) for i in range(model.Scale_Y_to - considered_years)]
-        missing_years = [model.Scale_Y_to - i-(1-y_offset) for i in range(model.Scale_Y_to - considered_years)]
+        disc_y = self.calc_disc_opex_factors(model)
 
-        if index1 == None and index2 == None and index3==None:
-            # Component of domain [Year]
-            res = sum(component[Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int)) \
-        		+ sum(component[max(model.Year)] * r_frac**Y for Y in missing_years)
-
-        elif index2 == None and index3==None:
-            # Component of domain [index1, Year]
-            res = sum(component[index1, Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int)) \
-        		+ sum(component[index1, max(model.Year)] * r_frac**Y for Y in missing_years)
-
-        elif index3==None:
-            # Component of domain [index1, index2, Year]
-            res = sum(component[index1, index2, Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int)) \
-        		+ sum(component[index1, index2, max(model.Year)] * r_frac**Y for Y in missing_years)
-
-        else:
-            # Component of domain [index1, index2, index3, Year]
-        	res = sum(component[index1, index2, index3, Y] * r_frac**(Y2+y_offset + (Y-1)*Scale_Y_int) for Y in model.Year for Y2 in range(Scale_Y_int)) \
-        		+ sum(component[index1, index2, index3, max(model.Year)] * r_frac**Y for Y in missing_years)
-
-        return res
+        # Component of domain [index1, index2, index3, Year], omitted indexes are None
+        idx = tuple(i for i in (index1, index2, index3) if i is not None)
+        return sum(component[idx + (Y,) if idx else Y] * disc_y[Y] for Y in model.Year)
 
     def calc_disc_capex_postprocessing(self, model, component, index1=None, index2=None):
         """
@@ -1732,9 +1912,12 @@ class OptSys:
         model.slack_pos_balance = pyo.Param(model.Fuel, default=0.0, mutable=True)
         model.slack_neg_balance = pyo.Param(model.Fuel, default=0.0, mutable=True)
 
-        for F in model.Fuel:
-            model.slack_pos_balance[F] = pyo.value(sum(model.f_slack_pos[N, F, Y, D, H,sH] for N in model.Node for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour) * model.Delta_T * model.Scale_H * model.Scale_D * model.Scale_Y)
-            model.slack_neg_balance[F] = pyo.value(sum(model.f_slack_neg[N, F, Y, D, H,sH] for N in model.Node for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour) * model.Delta_T * model.Scale_H * model.Scale_D * model.Scale_Y)
+        # Sum solved values as array instead of building an expression only to evaluate it
+        idx = [(N, Y) + t for N in model.Node for Y in model.Year for t in model.time_idx]
+        scale = model.time_scale * model.scale_y
+        for F in model.SlackFuel:
+            model.slack_pos_balance[F] = np.fromiter((model.f_slack_pos[N, F, Y, D, H, sH].value for N, Y, D, H, sH in idx), dtype=np.float64, count=len(idx)).sum() * scale
+            model.slack_neg_balance[F] = np.fromiter((model.f_slack_neg[N, F, Y, D, H, sH].value for N, Y, D, H, sH in idx), dtype=np.float64, count=len(idx)).sum() * scale
 
 
     def calc_energy_balance(self, model):
@@ -1747,15 +1930,17 @@ class OptSys:
             Do not use formulations like if F_subst[F,F1] or E_input[T,F] to check if any fuels are used besides constraints
             [kWh]
             """
-            return sum(m.f_prod_y[N,T,F1,Y] for N in m.Node for T in m.Tech for Y in m.Year) \
-                 + sum(m.f_import_y[F1,Y] for Y in m.Year) \
-                 + sum(m.f_import_timeseries_y[F1,Y] for Y in m.Year) \
-                 + sum(m.f_fix_quant_import_y[F1,Y] for Y in m.Year) \
-                 - sum(m.f_cons_y[N,T,F,F1,Y] for N in m.Node for T in m.Tech for F in m.Fuel for Y in m.Year) \
-                 - sum(m.f_export_y[F,F1,Y] for F in m.Fuel for Y in m.Year) \
-                 - sum(m.f_export_timeseries_y[F,F1,Y] for F in m.Fuel for Y in m.Year) \
-                 - sum(m.f_delivery_y[F,F1,Y] for F in m.Fuel for Y in m.Year) \
-                 - sum(m.f_supply_cons_system_y[F,F1,Y] for F in m.Fuel for Y in m.Year)
+            # All terms in one flat sum instead of nine nested ones
+            return pyo.quicksum(itertools.chain(
+                (m.f_prod_y[N,T,F1,Y] for N in m.Node for T in m.Tech for Y in m.Year),
+                (m.f_import_y[F1,Y] for Y in m.Year),
+                (m.f_import_timeseries_y[F1,Y] for Y in m.Year),
+                (m.f_fix_quant_import_y[F1,Y] for Y in m.Year),
+                (-m.f_cons_y[N,T,F,F1,Y] for N in m.Node for T in m.Tech for F in m.Fuel for Y in m.Year),
+                (-m.f_export_y[F,F1,Y] for F in m.Fuel for Y in m.Year),
+                (-m.f_export_timeseries_y[F,F1,Y] for F in m.Fuel for Y in m.Year),
+                (-m.f_delivery_y[F,F1,Y] for F in m.Fuel for Y in m.Year),
+                (-m.f_supply_cons_system_y[F,F1,Y] for F in m.Fuel for Y in m.Year)))
 
         model.energy_balance = pyo.Expression(model.Fuel1, rule=energy_balance_rule)
 
@@ -1766,35 +1951,37 @@ class OptSys:
 
         def land_use_rule(m, N, Y):
             """Sum over tech and storage tech"""
-            return sum(m.inst_cap[N,T,Y] * m.Land_use[T] for T in m.Tech - m.StorageTech) + sum(m.inst_storage_vol[N,StoreT,Y] * m.Land_use[StoreT] for StoreT in m.StorageTech)
+            return sum(m.inst_cap[N,T,Y] * m.Land_use[T] for T in m.NonStorageTech) + sum(m.inst_storage_vol[N,StoreT,Y] * m.Land_use[StoreT] for StoreT in m.StorageTech)
 
         model.land_use = pyo.Expression(model.Node, model.Year, rule=land_use_rule)
 
 
-    def calc_ldc(self, model, Node, Tech, Year):
-        """ """
+    def calc_ldc(self, model, Node, Tech, Year, sort=True):
+        """ Load duration curve of Tech at Node in Year, unsorted load if not sort """
         if type(Tech) is not list:
             Tech = [Tech]
 
         #inst_cap = dict()
-        values = []
+        ldc = np.zeros(len(model.time_idx))
 
         for T in Tech:
             if model.Cap_of_input[T]:
                 # Electrolysis: f_cons and E_input are relevant for load
-                F = [F for F in model.Fuel if model.E_input[T,F]][0]
-                values.append([pyo.value(sum(model.f_cons[Node,T,F,F1,Year,D,H,sH] for F1 in model.Fuel1 if model.F_subst[F,F1])) for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour])
+                F = model.input_fuels[T][0]
+                for F1 in model.sub_fuels[F]:
+                    ldc += np.fromiter((model.f_cons[(Node,T,F,F1,Year) + t].value for t in model.time_idx), dtype=np.float64, count=len(model.time_idx))
 
             else:
                 # GenSet: f_prod and E_output are relevant for load
-                F1 = [F1 for F1 in model.Fuel1 if model.E_output[T,F1]][0]
-                values.append([pyo.value(model.f_prod[Node, T, F1, Year, D, H, sH]) for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour])
+                F1 = model.output_fuels[T][0]
+                ldc += np.fromiter((model.f_prod[(Node,T,F1,Year) + t].value for t in model.time_idx), dtype=np.float64, count=len(model.time_idx))
 
-        # Sum of rows, unsorted
-        ldc = np.sum(values, 0)
+        # Every time step stands for Delta_H hours, the order is lost by sorting anyway
+        ldc = np.repeat(ldc, pyo.value(model.Delta_H))
 
         # Sort
-        ldc = - np.sort(-ldc)
+        if sort:
+            ldc = np.sort(ldc)[::-1]
 
         # Normalize
         #inst_cap_sum = sum([inst_cap[k] for k in inst_cap.keys()])
@@ -1822,15 +2009,15 @@ class OptSys:
             else:
 
                 if model.Cap_of_input[T]:
-                    F = [F for F in model.Fuel if model.E_input[T,F]][0]
-                    load = sum(m.f_cons[N,T,F,F1,Y,D,H,sH] for F1 in model.Fuel1 if model.F_subst[F,F1] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+                    F = model.input_fuels[T][0]
+                    load = sum(m.f_cons[N,T,F,F1,Y,D,H,sH] for F1 in model.sub_fuels[F] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
                 else:
-                    F1 = [F for F in model.Fuel if model.E_output[T,F]][0]
+                    F1 = model.output_fuels[T][0]
                     load = sum(m.f_prod[N,T,F1,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
 
                 return load / inst_cap
 
-        model.flh = pyo.Expression(model.Node, model.Tech - model.StorageTech, model.Year, rule=flh_rule)
+        model.flh = pyo.Expression(model.Node, model.NonStorageTech, model.Year, rule=flh_rule)
 
         def flh_possible_rule(m, N, T, Y):
             """Possible FLH of technology ignoring constraints of simulated system [h]"""
@@ -1847,8 +2034,8 @@ class OptSys:
                 inst_storage_vol = model.inst_storage_vol[N,StoreT,Y]
 
                 # Daily consumption + exogenous demand
-                daily_cons = [sum(sum(m.f_cons[N,T,F,F1,Y,D,H,sH] for T in (m.Tech - m.StorageTech)) \
-                                  + m.f_delivery[N,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F, F1] for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H for D in m.Day]
+                daily_cons = [sum(sum(m.f_cons[N,T,F,F1,Y,D,H,sH] for T in m.NonStorageTech) \
+                                  + m.f_delivery[N,F,F1,Y,D,H,sH] for F1 in m.sub_fuels[F] for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H for D in m.Day]
 
                 avg_cons = sum(daily_cons) / len(daily_cons)
 
@@ -1873,69 +2060,41 @@ class OptSys:
         logger_main.info('Calculating energy share.')
         start = datetime.now()
 
-        # Total availability of electricity [kW]
+        # Time steps in fixed order and scaling to the modelled time range
         F = 'Electricity'
-        power_total = [pyo.value(sum(model.f_prod[N,T,F1,Y,D,H,sH] for N in model.Node for T in model.Tech for F1 in model.Fuel1 if model.F_subst[F, F1]) \
-                                 + sum(model.f_import[N,F1,Y,D,H,sH] +  model.f_import_timeseries[N,F1,Y,D,H,sH] + model.f_fix_quant_import[N,F1,Y,D,H,sH] for N in model.Node for F1 in model.Fuel1 if model.F_subst[F, F1])) \
-                       for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour]
+        steps = [(Y,) + t for Y in model.Year for t in model.time_idx]
+        scale = model.time_scale * model.scale_y
+
+        def power(component, prefix):
+            """Values of component summed over nodes and substitutes of F per time step [kW]"""
+            values = [[component[(N,) + prefix + (F1,) + ts].value for ts in steps] for N in model.Node for F1 in model.sub_fuels[F]]
+            return np.array(values, dtype=np.float64).reshape(-1, len(steps)).sum(axis=0)
 
         # Create matrix with producers in rows and consumers in columns
         add_producer = ['f_import', 'f_import_timeseries']
         add_consumer = ['f_export', 'f_export_timeseries', 'f_delivery']
         manual_consumer = ['const_cons_system']
         dim = (len(model.Tech)+len(add_producer), len(model.Tech)+len(add_consumer)+len(manual_consumer))
-        M = pd.DataFrame(np.zeros(dim), index=[p for p in model.Tech]+add_producer, columns=[c for c in model.Tech]+add_consumer+manual_consumer)
-
-        # Loop through producer
-        for T in model.Tech:
-            # Power of considered tech [kW]
-            power_tech = [pyo.value(sum(model.f_prod[N,T,F1,Y,D,H,sH] for N in model.Node for F1 in model.Fuel1 if model.F_subst[F, F1])) for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour]
-            share_tech = [x/y if y != 0 else 0 for x,y in zip(power_tech, power_total)]
+        M_arr = np.zeros(dim)
 
-            # Loop through consumer
-            for C in model.Tech:
-                # load of considered tech [kW]
-                power_consumer = [pyo.value(sum(model.f_cons[N,C,F,F1,Y,D,H,sH] for N in model.Node for F1 in model.Fuel1 if model.F_subst[F, F1])) for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour]
+        # Power of producers and loads of consumers [kW], one row per producer or consumer
+        power_prod = np.array([power(model.f_prod, (T,)) for T in model.Tech] + [power(model.component(P), ()) for P in add_producer]).reshape(-1, len(steps))
+        power_cons = np.array([power(model.f_cons, (C, F)) for C in model.Tech] + [power(model.component(C), (F,)) for C in add_consumer]).reshape(-1, len(steps))
 
-                # Energy share over modelled time range [kWh]
-                M.loc[T,C] = sum([x*y for x,y in zip(share_tech, power_consumer)]) * pyo.value(model.Delta_T * model.Scale_H * model.Scale_D * model.Scale_Y)
-
-            # Loop through added consumers
-            for C in add_consumer:
-                power_consumer = [pyo.value(sum(model.component(C)[N,F,F1,Y,D,H,sH] for N in model.Node for F1 in model.Fuel1 if model.F_subst[F, F1])) for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour]
-
-                # Energy share over modelled time range [kWh]
-                M.loc[T,C] = sum([x*y for x,y in zip(share_tech, power_consumer)]) * pyo.value(model.Delta_T * model.Scale_H * model.Scale_D * model.Scale_Y)
-
-            # For const_cons_system as 'manual_consumer'
-            C = 'Const_cons_system'
-            power_consumer = [pyo.value(sum(model.component(C)[N,F1,Y] for F1 in model.Fuel1 if model.F_subst[F,F1] for N in model.Node)) for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour]
-            M.loc[T,C] = sum([x*y for x,y in zip(share_tech, power_consumer)]) * pyo.value(model.Delta_T * model.Scale_H * model.Scale_D * model.Scale_Y)
-
-        # Again for P = f_import & f_import_timeseries
-        for P in add_producer:
-            power_tech = [pyo.value(sum(model.component(P)[N,F1,Y,D,H,sH] for N in model.Node for F1 in model.Fuel1 if model.F_subst[F, F1])) for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour]
-            share_tech = [x/y if y != 0 else 0 for x,y in zip(power_tech, power_total)]
-
-            # Loop through consumer
-            for C in model.Tech:
-                # load of considered tech [kW]
-                power_consumer = [pyo.value(sum(model.f_cons[N,C,F,F1,Y,D,H,sH] for N in model.Node for F1 in model.Fuel1 if model.F_subst[F, F1])) for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour]
-
-                # Energy share over modelled time range [kWh]
-                M.loc[P,C] = sum([x*y for x,y in zip(share_tech, power_consumer)]) * pyo.value(model.Delta_T * model.Scale_H * model.Scale_D * model.Scale_Y)
+        # Total availability of electricity [kW]
+        power_total = power_prod.sum(axis=0) + power(model.f_fix_quant_import, ())
 
-            # Loop through added consumers
-            for C in add_consumer:
-                power_consumer = [pyo.value(sum(model.component(C)[N,F,F1,Y,D,H,sH] for N in model.Node for F1 in model.Fuel1 if model.F_subst[F, F1])) for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour]
+        # Share of producers per time step
+        share = np.divide(power_prod, power_total, out=np.zeros_like(power_prod), where=power_total != 0)
 
-                # Energy share over modelled time range [kWh]
-                M.loc[P,C] = sum([x*y for x,y in zip(share_tech, power_consumer)]) * pyo.value(model.Delta_T * model.Scale_H * model.Scale_D * model.Scale_Y)
+        # Energy share over modelled time range [kWh], wrapped with labels only once filled
+        M_arr[:, :len(power_cons)] = share @ power_cons.T * scale
+        M = pd.DataFrame(M_arr, index=[p for p in model.Tech]+add_producer, columns=[c for c in model.Tech]+add_consumer+manual_consumer)
 
-            # For const_cons_system as 'manual_consumer'
-            C = 'Const_cons_system'
-            power_consumer = [pyo.value(sum(model.component(C)[N,F1,Y] for F1 in model.Fuel1 if model.F_subst[F,F1] for N in model.Node)) for Y in model.Year for D in model.Day for H in model.Hour for sH in model.SubHour]
-            M.loc[P,C] = sum([x*y for x,y in zip(share_tech, power_consumer)]) * pyo.value(model.Delta_T * model.Scale_H * model.Scale_D * model.Scale_Y)
+        # For const_cons_system as 'manual_consumer', constant over the time steps of a year
+        C = 'Const_cons_system'
+        cons_system_y = {Y: sum(pyo.value(model.component(C)[N,F1,Y]) for F1 in model.sub_fuels[F] for N in model.Node) for Y in model.Year}
+        M[C] = share @ np.array([cons_system_y[ts[0]] for ts in steps], dtype=np.float64) * scale
 
         # Store matrix to model
         model.energy_share = M
@@ -1954,21 +2113,42 @@ class OptSys:
         """
         logger_main.info('Calculating LCOEnergy.')
         start = datetime.now()
-        # Fuel production at nodes over time [kW]
-        model.f_prod_node = pyo.Param(model.Node, model.Fuel1, model.Year, model.Day, model.Hour, model.SubHour, default=0.0, mutable=True)
-
-        # Parameter tracking internal fuel costs at nodes over time [EUR/MWh]
-        # Set equal to 'F_costs' for first iteration
-        model.lcoEnergy = pyo.Param(model.Node, model.Fuel1, model.Year, model.Day, model.Hour, model.SubHour, default=0.0, mutable=True)
-
-        # Loop through sets
+        # Solved flows and time series prices as arrays in time_idx order, the values do not change while iterating
+        # Every component is read once with extract_values, the arrays are then filled from the plain dicts
+        snapshot = {}
+        def values(component, idx):
+            if component.name not in snapshot:
+                snapshot[component.name] = component.extract_values()
+            data = snapshot[component.name]
+            return np.fromiter((data[idx + t] for t in model.time_idx), dtype=np.float64, count=len(model.time_idx))
+        model.f_prod_arr = {k: np.fromiter((v.value for v in var_list), dtype=np.float64, count=len(var_list)) for k, var_list in model.f_prod_time.items()}
+        model.f_import_arr = {(N, F1, Y): values(model.f_import, (N, F1, Y)) for N in model.Node for F1 in model.Fuel1 for Y in model.Year}
+        model.f_import_timeseries_arr = {(N, F1, Y): values(model.f_import_timeseries, (N, F1, Y)) for N in model.Node for F1 in model.Fuel1 for Y in model.Year}
+        model.f_fix_quant_import_arr = {(N, F1, Y): values(model.f_fix_quant_import, (N, F1, Y)) for N in model.Node for F1 in model.Fuel1 for Y in model.Year}
+        model.import_timeseries_price_arr = {(F1, Y): values(model.F_import_timeseries_price, (F1, Y)) for F1 in model.Fuel1 for Y in model.Year}
+        # Export including time series export, delivery and consumption of each substitute fuel
+        model.f_export_arr = {(N, F, F1, Y): values(model.f_export, (N, F, F1, Y)) + values(model.f_export_timeseries, (N, F, F1, Y)) for N in model.Node for F in model.Fuel for F1 in model.sub_fuels[F] for Y in model.Year}
+        model.f_delivery_arr = {(N, F, F1, Y): values(model.f_delivery, (N, F, F1, Y)) for N in model.Node for F in model.Fuel for F1 in model.sub_fuels[F] for Y in model.Year}
+        model.f_cons_arr = {(N, T, F, F1, Y): values(model.f_cons, (N, T, F, F1, Y)) for N in model.Node for T in model.Tech for F in model.Fuel for F1 in model.sub_fuels[F] for Y in model.Year}
+
+        # Techs with production of each fuel at nodes
+        model.node_prod_tech = {(N, F1, Y): tuple(T for T in model.Tech if (N,T,F1,Y) in model.f_prod_arr) for N in model.Node for F1 in model.Fuel1 for Y in model.Year}
+
+        # Fuel production and import at nodes over time [kW]
+        model.f_node_arr = {}
         for N in model.Node:
             for F1 in model.Fuel1:
                 for Y in model.Year:
-                    for D in model.Day:
-                        for H in model.Hour:
-                            for sH in model.SubHour:
-                                model.f_prod_node[N,F1,Y,D,H,sH] = pyo.value(sum(model.f_prod[N,T,F1,Y,D,H,sH] for T in model.Tech) + model.f_import[N,F1,Y,D,H,sH] + model.f_import_timeseries[N,F1,Y,D,H,sH] + model.f_fix_quant_import[N,F1,Y,D,H,sH] * model.F_fix_quant_import_size[N,F1] / model.Delta_T)
+                    # Production first, then imports, same summation order as the former f_prod_node Param
+                    f_node = np.zeros(len(model.time_idx))
+                    for T in model.node_prod_tech[N,F1,Y]:
+                        f_node = f_node + model.f_prod_arr[N,T,F1,Y]
+                    model.f_node_arr[N,F1,Y] = f_node + model.f_import_arr[N,F1,Y] + model.f_import_timeseries_arr[N,F1,Y] + model.f_fix_quant_import_arr[N,F1,Y] * model.F_fix_quant_import_size[N,F1] / model.delta_t
+
+        # Internal fuel costs at nodes over time, zero for the first iteration [EUR/MWh]
+        model.lcoEnergy_arr = {k: np.zeros_like(f_node) for k, f_node in model.f_node_arr.items()}
+        # Position of (D,H,sH) in the arrays
+        model.time_idx_pos = {t: k for k, t in enumerate(model.time_idx)}
 
         # Calculate constant numbers per technology and fuel
         def ideal_prod_rule(m, N, T, F1, Y):
@@ -1982,7 +2162,7 @@ class OptSys:
                 else:                   # eg: GenSet, Wind
                     Eff_temp = 1
 
-                return m.inst_cap[N,T,Y] * sum(m.Availability[N,T,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour) * Eff_temp * m.Delta_T * m.Scale_H * m.Scale_D
+                return m.inst_cap[N,T,Y] * sum(m.Availability[N,T,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour) * Eff_temp * m.time_scale
             else:
                 return 0
 
@@ -1998,7 +2178,7 @@ class OptSys:
                 else:                   # eg: GenSet, Wind
                     Eff_temp = m.Eff[T]
 
-                return m.inst_cap[N,T,Y] * sum([m.Availability[N,T,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour]) / Eff_temp * m.Delta_T * m.Scale_H * m.Scale_D
+                return m.inst_cap[N,T,Y] * sum([m.Availability[N,T,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour]) / Eff_temp * m.time_scale
             else:
                 return 0
 
@@ -2039,15 +2219,14 @@ class OptSys:
                 for F1 in model.Fuel:
                     for Y in model.Year:
 
-                        w_lcoe = [pyo.value(model.lcoEnergy[N,F1,Y,D,H,sH] * (sum(model.f_prod[N,T,F1,Y,D,H,sH] for T in model.Tech) + model.f_import[N,F1,Y,D,H,sH] + model.f_import_timeseries[N,F1,Y,D,H,sH] + model.f_fix_quant_import[N,F1,Y,D,H,sH] * model.F_fix_quant_import_size[N,F1] / model.Delta_T)) \
-                                for D in model.Day for H in model.Hour for sH in model.SubHour]
-
-                        nominator = pyo.value(sum(sum(model.f_prod[N,T,F1,Y,D,H,sH] for T in model.Tech) + model.f_import[N,F1,Y,D,H,sH] + model.f_import_timeseries[N,F1,Y,D,H,sH] + model.f_fix_quant_import[N,F1,Y,D,H,sH] * model.F_fix_quant_import_size[N,F1] / model.Delta_T for D in model.Day for H in model.Hour for sH in model.SubHour))
+                        # Mean LCOEnergy weighted by the available energy at the node
+                        f_node = model.f_node_arr[N,F1,Y]
+                        nominator = f_node.sum()
 
                         if nominator == 0:
                             model.lcoEnergy_mean[N,F1,Y] = 0
                         else:
-                            model.lcoEnergy_mean[N,F1,Y] = sum(w_lcoe) / nominator
+                            model.lcoEnergy_mean[N,F1,Y] = float(model.lcoEnergy_arr[N,F1,Y] @ f_node) / nominator
 
             self.update_tech_LCOEnergy(model)
 
@@ -2064,6 +2243,11 @@ class OptSys:
 
 
 
+    def lcoEnergy_at(self, model, N, F1, Y, D, H, sH):
+        """Internal fuel costs at node N over time [EUR/MWh], formerly the Param lcoEnergy[N,F1,Y,D,H,sH]"""
+        return float(model.lcoEnergy_arr[N,F1,Y][model.time_idx_pos[D,H,sH]])
+
+
     def update_LCOEnergy(self, m):
         """ Update Levelized Costs of Energy at nodes over time [EUR/MWh]"""
         #logger_main.info('Updating LCOEnergy at nodes.')
@@ -2074,19 +2258,15 @@ class OptSys:
                 conv = self.unitConv[m.F_unit[F1]]['conv']
 
                 for Y in m.Year:
-                    for D in m.Day:
-                        for H in m.Hour:
-                            for sH in m.SubHour:
-
-                                # Join streams of available energy
-                                f_sum = pyo.value(sum(m.f_prod[N,T,F1,Y,D,H,sH] for T in m.Tech) + m.f_import[N,F1,Y,D,H,sH] + m.f_import_timeseries[N,F1,Y,D,H,sH] + m.f_fix_quant_import[N,F1,Y,D,H,sH] * m.F_fix_quant_import_size[N,F1] / m.Delta_T)
-                                if f_sum < self.zero_threshold:
-                                    m.lcoEnergy[N,F1,Y,D,H,sH] = 0
-                                else:
-                                    m.lcoEnergy[N,F1,Y,D,H,sH] = 1/f_sum * pyo.value(sum(m.f_prod[N,T,F1,Y,D,H,sH] * m.tech_LCOEnergy[N,T,F1,Y] for T in m.Tech) \
-                                                                           + m.f_import[N,F1,Y,D,H,sH] * m.F_costs[F1,Y] * conv \
-                                                                           + m.f_import_timeseries[N,F1,Y,D,H,sH] * (m.F_import_timeseries_price[F1,Y,D,H,sH] + m.F_import_timeseries_fee[F1,Y]) * conv \
-                                                                           + m.f_fix_quant_import[N,F1,Y,D,H,sH] * m.F_fix_quant_import_size[N,F1] / m.Delta_T * m.F_fix_quant_costs[F1,Y] * conv)
+                    # Join streams of available energy, arrays over time_idx
+                    f_sum = m.f_node_arr[N,F1,Y]
+                    costs = m.f_import_arr[N,F1,Y] * m.F_costs[F1,Y] * conv \
+                          + m.f_import_timeseries_arr[N,F1,Y] * (m.import_timeseries_price_arr[F1,Y] + m.F_import_timeseries_fee[F1,Y]) * conv \
+                          + m.f_fix_quant_import_arr[N,F1,Y] * m.F_fix_quant_import_size[N,F1] / m.delta_t * m.F_fix_quant_costs[F1,Y] * conv
+                    for T in m.node_prod_tech[N,F1,Y]:
+                        costs = costs + m.f_prod_arr[N,T,F1,Y] * pyo.value(m.tech_LCOEnergy[N,T,F1,Y])
+                    lcoe = np.divide(costs, f_sum, out=np.zeros_like(f_sum), where=f_sum >= self.zero_threshold)
+                    m.lcoEnergy_arr[N,F1,Y] = lcoe
 
         #dt = datetime.now() - start
         #logger_main.info('\tDuration: {}min {}sec'.format(int(dt.total_seconds()/60), round(dt.total_seconds()%60)))
@@ -2096,38 +2276,40 @@ class OptSys:
         """ Update Levelized Costs of Energy of technology at nodes over time [ERU/MWh]"""
         #start = datetime.now()
         print_switch = True
+        # Sets are iterated for every node and year, take them as tuples once
+        techs, fuels, fuels1 = tuple(m.Tech), tuple(m.Fuel), tuple(m.Fuel1)
         for N in m.Node:
             for Y in m.Year:
 
                 # Print interation results
                 if print_switch:
                     print_switch = False
-                    m.delta_lcoe = 0 # reset delta tracker
+                    ref_fuels = list(m.pre_lcoe.keys())
+                    lcoe = np.array([pyo.value(m.lcoEnergy_mean[N,F,Y]) for F in ref_fuels])
+                    delta = lcoe - np.array([m.pre_lcoe[F] for F in ref_fuels])
+                    m.delta_lcoe = float(np.abs(delta).sum())
 
-                    for F in m.pre_lcoe.keys():
-                        lcoe = pyo.value(m.lcoEnergy_mean[N,F,Y])
-                        m.delta_lcoe += abs(lcoe - m.pre_lcoe[F])
+                    for F, lcoe_F, delta_F in zip(ref_fuels, lcoe.tolist(), delta.tolist()):
                         unit = m.F_unit[F]
-
-                        print('\tLCOE mean {} [EUR/{}] \t= {}  (delta = {})'.format(F, unit, round(lcoe, 4), lcoe - m.pre_lcoe[F]))
-                        m.pre_lcoe.update({F: lcoe})
+                        print('\tLCOE mean {} [EUR/{}] \t= {}  (delta = {})'.format(F, unit, round(lcoe_F, 4), delta_F))
+                    m.pre_lcoe.update(zip(ref_fuels, lcoe.tolist()))
 
                 # export_LCOEnergy and demand_LCOEnergy
-                for F in m.Fuel:
+                for F in fuels:
 
                     # Export of energy
-                    sum_f_export = pyo.value(sum(m.f_export[N,F,F1,Y,D,H,sH] + m.f_export_timeseries[N,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] for D in m.Day for H in m.Hour for sH in m.SubHour))
+                    sum_f_export = sum(m.f_export_arr[N,F,F1,Y].sum() for F1 in m.sub_fuels[F])
                     if  sum_f_export < self.zero_threshold:
                         m.export_LCOEnergy[N,F,Y] = 0
                     else:
-                        m.export_LCOEnergy[N,F,Y] = pyo.value(sum((m.f_export[N,F,F1,Y,D,H,sH] + m.f_export_timeseries[N,F,F1,Y,D,H,sH]) * m.lcoEnergy[N,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] for D in m.Day for H in m.Hour for sH in m.SubHour)) / sum_f_export
+                        m.export_LCOEnergy[N,F,Y] = sum(float(m.f_export_arr[N,F,F1,Y] @ m.lcoEnergy_arr[N,F1,Y]) for F1 in m.sub_fuels[F]) / sum_f_export
 
                     # Supply of demand of energy
-                    sum_f_demand = pyo.value(sum(m.F_demand[N,F,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour))
+                    sum_f_demand = m.F_demand_arr[N,F,Y].sum()
                     if  sum_f_demand < self.zero_threshold:
                         m.demand_LCOEnergy[N,F,Y] = 0
                     else:
-                        m.demand_LCOEnergy[N,F,Y] = pyo.value(sum(m.f_delivery[N,F,F1,Y,D,H,sH] * m.lcoEnergy[N,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] for D in m.Day for H in m.Hour for sH in m.SubHour)) / sum_f_demand
+                        m.demand_LCOEnergy[N,F,Y] = sum(float(m.f_delivery_arr[N,F,F1,Y] @ m.lcoEnergy_arr[N,F1,Y]) for F1 in m.sub_fuels[F]) / sum_f_demand
 
 
                 # tech_LCOEnergy_cons, tech_LCOEnergy_ideal and tech_LCOEnergy
@@ -2137,92 +2319,87 @@ class OptSys:
                 opex_system_disc = pyo.value(m.Opex_system_disc + sum(m.Opex_disc[T] for T in m.ExternalTech))
 
                 # Sum capex of technologies as reference
-                capex_tech_disc = pyo.value(sum(m.Capex_disc[T] for T in m.Tech if m.System_tech[T]))
+                capex_tech_disc = pyo.value(sum(m.Capex_disc[T] for T in techs if m.System_tech[T]))
 
-                for T in m.Tech:
+                # Techs without capacity keep their default LCOEnergy of zero
+                inst_cap = {T: pyo.value(m.inst_cap[N,T,Y]) for T in techs}
+                active_tech = [T for T in techs if inst_cap[T] >= self.zero_threshold]
 
-                    if pyo.value(m.inst_cap[N,T,Y]) < self.zero_threshold:
-                        continue
-                    for F in m.Fuel:
+                for T in active_tech:
+                    cap = inst_cap[T]
 
-                        # Energy consumption of technology
-                        sum_f_cons = pyo.value(sum(m.f_cons[N,T,F,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] for D in m.Day for H in m.Hour for sH in m.SubHour))
-                        if  sum_f_cons < self.zero_threshold:
-                            m.tech_LCOEnergy_cons[N,T,F,Y] = 0
-                        else:
-                            m.tech_LCOEnergy_cons[N,T,F,Y] = pyo.value(sum(m.f_cons[N,T,F,F1,Y,D,H,sH] * m.lcoEnergy[N,F1,Y,D,H,sH] for F1 in m.Fuel1 if m.F_subst[F,F1] for D in m.Day for H in m.Hour for sH in m.SubHour)) / sum_f_cons
+                    # Energy consumption of technology and its costs per fuel over all time steps
+                    sum_f_cons = {F: sum(m.f_cons_arr[N,T,F,F1,Y].sum() for F1 in m.sub_fuels[F]) for F in fuels}
+                    cons_costs = {F: sum(float(m.f_cons_arr[N,T,F,F1,Y] @ m.lcoEnergy_arr[N,F1,Y]) for F1 in m.sub_fuels[F]) for F in fuels}
+                    ideal_prod = pyo.value(sum(m.ideal_prod[N,T,F1,Y] for F1 in fuels1))
 
-                        m.fuel_costs_ideal[N,T,Y] = pyo.value(sum((m.ideal_cons[N,T,F,Y] + m.Share_const_cons_system[F] * m.inst_cap[N,T,Y] * m.Tech_const_cons_system[T] * len(m.Day)*len(m.Hour)*len(m.SubHour)*m.Delta_T*m.Scale_H*m.Scale_D) * m.lcoEnergy_mean[N,F,Y] for F in m.Fuel) \
-                                                  + sum(m.ideal_prod[N,T,F1,Y] for F1 in m.Fuel1) * m.Aux_ed[T] * m.lcoEnergy_mean[N,'Electricity',Y] \
-                                                  + sum((m.F_edp[N,T,Y,D,H,sH] + m.inst_cap[N,T,Y] * m.V_edp[N,T,Y,D,H,sH]) * m.lcoEnergy[N,'Electricity',Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D)
-                                                    # missing AuxMedium costs
+                    # Fuel and variable costs do not depend on the output fuel
+                    m.fuel_costs_ideal[N,T,Y] = pyo.value(sum((m.ideal_cons[N,T,F,Y] + m.Share_const_cons_system[F] * cap * m.Tech_const_cons_system[T] * len(m.time_idx) * m.time_scale) * m.lcoEnergy_mean[N,F,Y] for F in fuels) \
+                                              + ideal_prod * m.Aux_ed[T] * m.lcoEnergy_mean[N,'Electricity',Y]) \
+                                              + float((m.F_edp_arr[N,T,Y] + cap * m.V_edp_arr[N,T,Y]) @ m.lcoEnergy_arr[N,'Electricity',Y]) * m.time_scale
+                                                # missing AuxMedium costs
 
-                        m.fuel_costs[N,T,Y] = pyo.value(sum((m.f_cons[N,T,F,F1,Y,D,H,sH] + m.Share_const_cons_system[F1] * m.inst_cap[N,T,Y] * m.Tech_const_cons_system[T]) * m.lcoEnergy[N,F1,Y,D,H,sH] for F in m.Fuel if m.E_input[T,F] or F=='Electricity' for F1 in m.Fuel1 if m.F_subst[F,F1] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D \
-                                                      + sum(m.Aux_medium_flow[N,T,A,Y,D,H,sH] * m.AM_costs[A,Y] for A in m.AuxMedium if m.AM_costs[A,Y] > 0 for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D)
+                    m.fuel_costs[N,T,Y] = sum(cons_costs[F] + sum(m.Share_const_cons_system[F1] * m.lcoEnergy_arr[N,F1,Y].sum() for F1 in m.sub_fuels[F]) * cap * m.Tech_const_cons_system[T] for F in m.cost_fuels[T]) * m.time_scale \
+                                          + pyo.value(sum(m.Aux_medium_flow[N,T,A,Y,D,H,sH] * m.AM_costs[A,Y] for A in m.AuxMedium if m.AM_costs[A,Y] > 0 for D in m.Day for H in m.Hour for sH in m.SubHour)) * m.time_scale
 
-                        m.var_costs_ideal[N,T,Y] = pyo.value(sum(m.ideal_prod[N,T,F1,Y] for F1 in m.Fuel1) * m.Vo_costs[T, Y])
-                        m.var_costs[N,T,Y] = pyo.value(sum(m.f_prod_y[N,T,F1,Y] for F1 in m.Fuel1) * m.Vo_costs[T, Y])
+                    m.var_costs_ideal[N,T,Y] = ideal_prod * m.Vo_costs[T, Y]
+                    m.var_costs[N,T,Y] = pyo.value(sum(m.f_prod_y[N,T,F1,Y] for F1 in fuels1)) * m.Vo_costs[T, Y]
 
+                    # Discounted costs, the same for all output fuels
+                    fixed_costs_disc = self.calc_disc_opex_postprocessing(m, m.fixed_costs, N, T)
+                    capex_disc = self.calc_disc_capex_postprocessing(m, m.capex, N, T)
 
-                        # tech_LCOEnergy_ideal
-                        if m.E_output[T,F]:
+                    # Share at system costs and external costs
+                    system_share_disc = (capex_disc/capex_tech_disc) * (capex_system_disc + opex_system_disc) if m.System_tech[T] else 0
 
-                            # Energy
-                            prod_disc = self.calc_disc_opex_postprocessing(m, m.ideal_prod, N,T,F)
+                    costs_ideal_disc = pyo.value(capex_disc + fixed_costs_disc + system_share_disc \
+                                                 + self.calc_disc_opex_postprocessing(m, m.fuel_costs_ideal, N, T) + self.calc_disc_opex_postprocessing(m, m.var_costs_ideal, N, T))
+                    costs_disc = pyo.value(capex_disc + fixed_costs_disc + system_share_disc \
+                                           + self.calc_disc_opex_postprocessing(m, m.fuel_costs, N, T) + self.calc_disc_opex_postprocessing(m, m.var_costs, N, T))
 
-                            # Costs
-                            fuel_costs_disc = self.calc_disc_opex_postprocessing(m, m.fuel_costs_ideal, N, T)
-                            fixed_costs_disc = self.calc_disc_opex_postprocessing(m, m.fixed_costs, N, T)
-                            var_costs_disc = self.calc_disc_opex_postprocessing(m, m.var_costs_ideal, N, T)
-                            capex_disc = self.calc_disc_capex_postprocessing(m, m.capex, N, T)
+                    for F in fuels:
 
-                            # Share at system costs and external costs
-                            system_share_disc = (capex_disc/capex_tech_disc) * (capex_system_disc + opex_system_disc) if m.System_tech[T] else 0
+                        if  sum_f_cons[F] < self.zero_threshold:
+                            m.tech_LCOEnergy_cons[N,T,F,Y] = 0
+                        else:
+                            m.tech_LCOEnergy_cons[N,T,F,Y] = cons_costs[F] / sum_f_cons[F]
 
-                            # LCOE = 0 if electricity consumption and production are equal
-                            if pyo.value(prod_disc) < self.zero_threshold:
-                                m.tech_LCOEnergy_ideal[N,T,F,Y] = 0
-                            else:
-                                m.tech_LCOEnergy_ideal[N,T,F,Y] = pyo.value((capex_disc + fuel_costs_disc + fixed_costs_disc + var_costs_disc + system_share_disc) / prod_disc)
 
-                        else:
+                        # tech_LCOEnergy_ideal and tech_LCOEnergy only for output fuels
+                        if not m.e_output[T,F]:
                             m.tech_LCOEnergy_ideal[N,T,F,Y] = 0
+                            continue
 
-                        # tech_LCOEnergy
-                        if m.E_output[T,F]:
-
-                            # Energy
-                            if T in m.StorageTech:
-                                # Storages can discharge several fuels, as they charge several fuels
-                                prod_disc = sum(self.calc_disc_opex_postprocessing(m, m.f_prod_y, N,T,F1) for F1 in m.Fuel1 if m.F_subst[F,F1])
-                            else:
-                                prod_disc = self.calc_disc_opex_postprocessing(m, m.f_prod_y, N,T,F)
+                        # tech_LCOEnergy_ideal
+                        # Energy
+                        prod_disc = pyo.value(self.calc_disc_opex_postprocessing(m, m.ideal_prod, N,T,F))
 
-                            # Costs
-                            fuel_costs_disc = self.calc_disc_opex_postprocessing(m, m.fuel_costs, N, T)
-                            fixed_costs_disc = self.calc_disc_opex_postprocessing(m, m.fixed_costs, N, T)
-                            var_costs_disc = self.calc_disc_opex_postprocessing(m, m.var_costs, N, T)
-                            capex_disc = self.calc_disc_capex_postprocessing(m, m.capex, N, T)
+                        # LCOE = 0 if electricity consumption and production are equal
+                        if prod_disc < self.zero_threshold:
+                            m.tech_LCOEnergy_ideal[N,T,F,Y] = 0
+                        else:
+                            m.tech_LCOEnergy_ideal[N,T,F,Y] = costs_ideal_disc / prod_disc
 
-                            # Share at system costs and external costs
-                            system_share_disc = (capex_disc/capex_tech_disc) * (capex_system_disc + opex_system_disc) if m.System_tech[T] else 0
+                        # tech_LCOEnergy
+                        # Energy
+                        if T in m.StorageTech:
+                            # Storages can discharge several fuels, as they charge several fuels
+                            prod_disc = pyo.value(sum(self.calc_disc_opex_postprocessing(m, m.f_prod_y, N,T,F1) for F1 in m.sub_fuels[F]))
+                        else:
+                            prod_disc = pyo.value(self.calc_disc_opex_postprocessing(m, m.f_prod_y, N,T,F))
 
-                            # LCOE = 0 if electricity consumption and production are equal
-                            if pyo.value(prod_disc) < self.zero_threshold:
-                                continue
-                                #m.tech_LCOEnergy[N,T,F,Y] = 0
-                            else:
-                                lcoe_temp = pyo.value((capex_disc + fuel_costs_disc + fixed_costs_disc + var_costs_disc + system_share_disc) / prod_disc)
+                        # LCOE = 0 if electricity consumption and production are equal
+                        if prod_disc < self.zero_threshold:
+                            continue
 
-                                if T in m.StorageTech:
-                                    # Define LCOE for storage output for all possible fuels
-                                    for F1 in [F1 for F1 in m.Fuel1 if m.F_subst[F,F1]]:
-                                        m.tech_LCOEnergy[N,T,F1,Y] = lcoe_temp
-                                else:
-                                    m.tech_LCOEnergy[N,T,F,Y] = lcoe_temp
+                        lcoe_temp = costs_disc / prod_disc
 
+                        if T in m.StorageTech:
+                            # Define LCOE for storage output for all possible fuels
+                            for F1 in m.sub_fuels[F]:
+                                m.tech_LCOEnergy[N,T,F1,Y] = lcoe_temp
                         else:
-                            continue
+                            m.tech_LCOEnergy[N,T,F,Y] = lcoe_temp
 
 
     def calc_annual_values(self, model):
@@ -2232,66 +2409,90 @@ class OptSys:
         start = datetime.now()
         logger_main.info('Calculating annual values')
 
+        # The flows are solved, so the annual values are summed once from the plain values of each variable
+        time_set = frozenset(model.time_idx)
+
+        def annual(var, keep, weight=None):
+            """Values of var summed over the time steps and over all indices not in keep"""
+            totals = {}
+            # extract_values of an Expression returns the expressions themselves
+            data = var.extract_values() if var.ctype is pyo.Var else {k: pyo.value(e) for k, e in var.items()}
+            for key, value in data.items():
+                if value and key[-3:] in time_set:
+                    k = tuple(key[i] for i in keep)
+                    totals[k] = totals.get(k, 0.0) + (value * weight(key) if weight else value)
+            return totals
+
         # Yearly fuel demand [kWh]
         def sum_F_demand(m, F, Y):
             """[kWh]"""
-            return sum(m.F_demand[N,F,Y,D,H,sH] for N in m.Node for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return sum(m.F_demand_arr[N,F,Y].sum() for N in m.Node) * m.time_scale
         model.F_demand_y = pyo.Expression(model.Fuel, model.Year, rule=sum_F_demand)
 
         # Yearly fuel delivery [kWh]
+        f_delivery_y = annual(model.f_delivery, (1, 2, 3))
         def sum_f_delivery(m, F, F1, Y):
             """[kWh]"""
-            return sum(m.f_delivery[N,F,F1,Y,D,H,sH] for N in m.Node for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return f_delivery_y.get((F, F1, Y), 0.0) * m.time_scale
         model.f_delivery_y = pyo.Expression(model.Fuel, model.Fuel1, model.Year, rule=sum_f_delivery)
 
         # Yearly fuel consumption and production
+        f_cons_y = annual(model.f_cons, (0, 1, 2, 3, 4))
         def sum_f_cons(m, N, T, F, F1, Y):
             """[kWh]"""
-            return sum(m.f_cons[N,T,F,F1,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return f_cons_y.get((N, T, F, F1, Y), 0.0) * m.time_scale
         model.f_cons_y = pyo.Expression(model.Node, model.Tech, model.Fuel, model.Fuel1, model.Year, rule=sum_f_cons)
 
+        f_prod_y = annual(model.f_prod, (0, 1, 2, 3))
         def sum_f_prod(m, N, T, F1, Y):
             """[kWh]"""
-            return sum(m.f_prod[N,T,F1,Y,D,H,sH] for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return f_prod_y.get((N, T, F1, Y), 0.0) * m.time_scale
         model.f_prod_y = pyo.Expression(model.Node, model.Tech, model.Fuel1, model.Year, rule=sum_f_prod)
 
         # Yearly sum of auxiliary medium flow
+        Aux_medium_flow_y = annual(model.Aux_medium_flow, (0, 2, 3))
         def sum_Aux_medium_flow(m, N, A, Y):
             """[Nm3]"""
-            return sum(m.Aux_medium_flow[N,T,A,Y,D,H,sH] for T in model.Tech for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return Aux_medium_flow_y.get((N, A, Y), 0.0) * m.time_scale
         model.Aux_medium_flow_y = pyo.Expression(model.Node, model.AuxMedium, model.Year, rule=sum_Aux_medium_flow)
 
         # Yearly fuel import and export
+        f_import_y = annual(model.f_import, (1, 2))
         def sum_f_import(m, F1, Y):
             """[kWh]"""
-            return sum(m.f_import[N,F1,Y,D,H,sH] for N in m.Node for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return f_import_y.get((F1, Y), 0.0) * m.time_scale
         model.f_import_y = pyo.Expression(model.Fuel1, model.Year, rule=sum_f_import)
 
         # Yearly sum of constant fuel consumption of system
+        f_supply_cons_system_y = annual(model.f_supply_cons_system, (1, 2, 3))
         def sum_f_supply_cons_system(m, F, F1, Y):
             """[kWh]"""
-            return sum(m.f_supply_cons_system[N,F,F1,Y,D,H,sH] for N in m.Node for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return f_supply_cons_system_y.get((F, F1, Y), 0.0) * m.time_scale
         model.f_supply_cons_system_y = pyo.Expression(model.Fuel, model.Fuel1, model.Year, rule=sum_f_supply_cons_system)
 
+        f_import_timeseries_y = annual(model.f_import_timeseries, (1, 2))
         def sum_f_import_timeseries(m,F1,Y):
             """[kWh]"""
-            return sum(m.f_import_timeseries[N,F1,Y,D,H,sH] for N in m.Node for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return f_import_timeseries_y.get((F1, Y), 0.0) * m.time_scale
         model.f_import_timeseries_y = pyo.Expression(model.Fuel1, model.Year, rule=sum_f_import_timeseries)
 
 
+        f_fix_quant_import_y = annual(model.f_fix_quant_import, (1, 2), weight=lambda key: model.F_fix_quant_import_size[key[0], key[1]])
         def sum_f_fix_quant_import(m, F1, Y):
             """ ! Fixed quantity fuel import is not scaled by resolution ! [kWh] """
-            return sum(m.f_fix_quant_import[N,F1,Y,D,H,sH] * m.F_fix_quant_import_size[N, F1] for N in m.Node for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Scale_D
+            return f_fix_quant_import_y.get((F1, Y), 0.0) * pyo.value(m.Scale_D)
         model.f_fix_quant_import_y = pyo.Expression(model.Fuel1, model.Year, rule=sum_f_fix_quant_import)
 
+        f_export_y = annual(model.f_export, (1, 2, 3))
         def sum_f_export(m, F, F1, Y):
             """[kWh]"""
-            return sum(m.f_export[N,F,F1,Y,D,H,sH] for N in m.Node for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return f_export_y.get((F, F1, Y), 0.0) * m.time_scale
         model.f_export_y = pyo.Expression(model.Fuel, model.Fuel1, model.Year, rule=sum_f_export)
 
+        f_export_timeseries_y = annual(model.f_export_timeseries, (1, 2, 3))
         def sum_f_export_timeseries(m, F, F1, Y):
             """[kWh]"""
-            return sum(m.f_export_timeseries[N,F,F1,Y,D,H,sH] for N in m.Node for D in m.Day for H in m.Hour for sH in m.SubHour) * m.Delta_T * m.Scale_H * m.Scale_D
+            return f_export_timeseries_y.get((F, F1, Y), 0.0) * m.time_scale
         model.f_export_timeseries_y = pyo.Expression(model.Fuel, model.Fuel1, model.Year, rule=sum_f_export_timeseries)
 
         dt = datetime.now() - start
@@ -2309,51 +2510,40 @@ class OptSys:
         start = datetime.now()
         logger_main.info('Calculating fuel costs')
 
-        # Calc reference values (discounted)
-        model.ref_prod_disc = pyo.value(sum(self.calc_disc_opex_postprocessing(model, model.f_prod_y, index1=N, index2=T, index3=F1) for N in model.Node for T in model.Tech-model.StorageTech for F1 in model.Fuel1 for F in model.RefFuel if model.F_subst[F,F1] and sum(model.F_subst[F1,F2] for F2 in model.Fuel1) == 1))
-        model.ref_demand_disc = pyo.value(sum(self.calc_disc_opex_postprocessing(model, model.F_demand_y, index1=F) for F in model.RefFuel))
-        model.ref_export_disc = pyo.value(sum(self.calc_disc_opex_postprocessing(model, model.f_export_y, index1=F, index2=F1) for F1 in model.Fuel1 for F in model.RefFuel if model.F_subst[F,F1] and sum(model.F_subst[F1,F2] for F2 in model.Fuel1) == 1))
+        # Calc reference values (discounted), each term is evaluated on its own instead of building one large sum
+        ref_pairs = [(F, F1) for F in model.RefFuel for F1 in model.subst_pairs[F]]
+        model.ref_prod_disc = sum(pyo.value(self.calc_disc_opex_postprocessing(model, model.f_prod_y, index1=N, index2=T, index3=F1)) for N in model.Node for T in model.NonStorageTech for _, F1 in ref_pairs)
+        model.ref_demand_disc = sum(pyo.value(self.calc_disc_opex_postprocessing(model, model.F_demand_y, index1=F)) for F in model.RefFuel)
+        model.ref_export_disc = sum(pyo.value(self.calc_disc_opex_postprocessing(model, model.f_export_y, index1=F, index2=F1)) for F, F1 in ref_pairs)
         model.ref_out_disc = model.ref_demand_disc + model.ref_export_disc
 
 
         # Total costs
-        model.tc = pyo.value(model.tc_obj - sum(model.high_storage_level_incentive[StoreT] for StoreT in model.StorageTech))
+        model.tc = pyo.value(model.tc_obj - pyo.quicksum(model.high_storage_level_incentive[StoreT] for StoreT in model.IncentiveStorageTech))
 
-        # Costs of reference fuels [EUR/ unit of fuel]
-        if model.ref_prod_disc > self.zero_threshold:
-            model.ref_prod_price = model.tc / model.ref_prod_disc
-        else:
-            model.ref_prod_price = 0
+        # Costs of reference fuels [EUR/ unit of fuel], 0 if the reference value is below the zero threshold
+        def price(ref_disc):
+            return model.tc / ref_disc if ref_disc > self.zero_threshold else 0
 
-        if model.ref_demand_disc > self.zero_threshold:
-            model.ref_demand_price = model.tc / model.ref_demand_disc
-        else:
-            model.ref_demand_price = 0
-
-        if model.ref_export_disc > self.zero_threshold:
-            model.ref_export_price = model.tc / model.ref_export_disc
-        else:
-            model.ref_export_price = 0
-
-        if model.ref_out_disc > self.zero_threshold:
-            model.ref_out_price = model.tc / model.ref_out_disc
-        else:
-            model.ref_out_price = 0
+        model.ref_prod_price = price(model.ref_prod_disc)
+        model.ref_demand_price = price(model.ref_demand_disc)
+        model.ref_export_price = price(model.ref_export_disc)
+        model.ref_out_price = price(model.ref_out_disc)
 
 
         # Discouting of costs
-        model.total_Capex_disc = pyo.value(sum(model.Capex_disc[T] for T in model.Tech | model.ExternalTech))
+        model.total_Capex_disc = pyo.value(pyo.quicksum(model.Capex_disc[T] for T in model.AllTech))
         model.total_Capex_system_disc = pyo.value(model.Capex_system_disc)
 
-        model.total_Opex_disc = pyo.value(sum(model.Opex_disc[T] for T in model.Tech | model.ExternalTech))
+        model.total_Opex_disc = pyo.value(pyo.quicksum(model.Opex_disc[T] for T in model.AllTech))
         model.total_Opex_system_disc = pyo.value(model.Opex_system_disc)
-        model.total_Opex_fuel_disc = pyo.value(sum(model.Opex_fuel_disc[F1] for F1 in model.Fuel1))
-        model.total_Opex_timeseries_disc = pyo.value(sum(model.Opex_timeseries_disc[F1] for F1 in model.Fuel1))
-        model.total_Opex_auxmedium_disc = pyo.value(sum(model.Opex_auxmedium_disc[A] for A in model.AuxMedium))
-        model.total_Opex_network_capacity_disc = pyo.value(sum(model.Opex_network_capacity_disc[F] for F in model.Fuel))
+        model.total_Opex_fuel_disc = pyo.value(pyo.quicksum(model.Opex_fuel_disc[F1] for F1 in model.Fuel1))
+        model.total_Opex_timeseries_disc = pyo.value(pyo.quicksum(model.Opex_timeseries_disc[F1] for F1 in model.Fuel1))
+        model.total_Opex_auxmedium_disc = pyo.value(pyo.quicksum(model.Opex_auxmedium_disc[A] for A in model.AuxMedium))
+        model.total_Opex_network_capacity_disc = pyo.value(pyo.quicksum(model.Opex_network_capacity_disc[F] for F in model.Fuel))
 
-        model.total_Revenue_disc = pyo.value(sum(model.Revenue_disc[F] for F in model.Fuel))
-        model.total_Revenue_timeseries_disc = pyo.value(sum(model.Revenue_timeseries_disc[F] for F in model.Fuel))
+        model.total_Revenue_disc = pyo.value(pyo.quicksum(model.Revenue_disc[F] for F in model.Fuel))
+        model.total_Revenue_timeseries_disc = pyo.value(pyo.quicksum(model.Revenue_timeseries_disc[F] for F in model.Fuel))
 
         dt = datetime.now() - start
         logger_main.info('\tDuration: {}min {}sec'.format(int(dt.total_seconds()/60), round(dt.total_seconds()%60)))
@@ -2369,13 +2559,13 @@ class OptSys:
 
         # Collect technology names
         searchTech = 'Electrolysis'
-        addTech = [T for T in model.Tech - model.StorageTech if searchTech.lower() in T.lower()]
+        addTech = [T for T in model.NonStorageTech if searchTech.lower() in T.lower()]
 
         searchTech = 'Wind'
-        windTech = [T for T in model.Tech - model.StorageTech if searchTech.lower() in T.lower()]
+        windTech = [T for T in model.NonStorageTech if searchTech.lower() in T.lower()]
 
         searchTech = 'Solar'
-        solarTech = [T for T in model.Tech - model.StorageTech if searchTech.lower() in T.lower()]
+        solarTech = [T for T in model.NonStorageTech if searchTech.lower() in T.lower()]
 
         Tech = [windTech + solarTech] + windTech + solarTech + addTech
 
@@ -2386,19 +2576,19 @@ class OptSys:
             for N in model.Node:
                 for Y in model.Year:
 
-                    (head, ldc) = self.calc_ldc(model, N, T, Y)
+                    (head, load) = self.calc_ldc(model, N, T, Y, sort=False)
 
-                    value.append(ldc)
+                    value.append(load)
                     header.append(head)
 
-        values = np.column_stack(value)
-        index = [i+1 for i in range(values.shape[0])]
+        # Sort all curves in one call, one curve per column
+        values = np.sort(np.column_stack(value), axis=0)[::-1]
+        index = pd.Index(np.arange(1, values.shape[0]+1), name=header[0])
 
-        table = np.column_stack((index, values))
+        df = pd.DataFrame(values, index=index, columns=header[1:])
 
-        file = open(self.repository + file_name, "w")
-        np.savetxt(file, table, fmt='%s', header=';'.join(header), delimiter=';', comments='')
-        file.close()
+        with open(self.repository + file_name, 'w', newline='') as file:
+            df.to_csv(file, sep=';', index=True, header=True, lineterminator='\n')
 
         dt = datetime.now() - start
         logger_main.info('\tDuration: {}min {}sec'.format(int(dt.total_seconds()/60), round(dt.total_seconds()%60)))
@@ -2445,7 +2635,9 @@ class OptSys:
         var2 = ['f_cons']
 
         # Variables type 3: [N,F1, Time]
-        var3 = ['f_import', 'f_import_timeseries', 'f_fix_quant_import', 'f_slack_pos', 'f_slack_neg']
+        var3 = ['f_import', 'f_import_timeseries', 'f_fix_quant_import']
+        if model.Slack_switch == 1:
+            var3 += ['f_slack_pos', 'f_slack_neg']
 
         # Variables type 4: [N,F,F1 Time]
         var4 = ['f_export', 'f_export_timeseries', 'f_delivery']
@@ -2473,21 +2665,52 @@ class OptSys:
        # Note: model resolution is transformed into hourly resolution (with: for _ in range(model.Delta_H))
 
         # Define time stamps
-        timestamp = [datetime.strptime('{} {} {} {}'.format(Y+2018, D, H+dH, int(sH*model.Delta_T*60)), '%Y %j %H %M') for Y in model.Year for D in model.Day for H in model.Hour for dH in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-        timestamp_str = [t.strftime('%Y-%m-%d %H:%M:%S') for t in timestamp]
+        delta_H = int(pyo.value(model.Delta_H))
+        time_steps = [(Y, D, H) for Y in model.Year for D in model.Day for H in model.Hour]
+        sub_hours = list(model.SubHour)
+        # Year, day of year, hour and minute of every row, combined as offsets from the start of each year
+        Y_arr, D_arr, H_arr, M_arr = (np.array(c) for c in zip(*((Y, D, H+dH, int(sH*model.delta_t*60)) for Y, D, H in time_steps for dH in range(delta_H) for sH in sub_hours)))
+        timestamp = (Y_arr + 2018 - 1970).astype('datetime64[Y]').astype('datetime64[m]') \
+                    + ((D_arr - 1) * 24*60 + H_arr * 60 + M_arr).astype('timedelta64[m]')
+        timestamp_str = pd.DatetimeIndex(timestamp).strftime('%Y-%m-%d %H:%M:%S')
 
         values = []
         header = ['timestamp']
 
+        # Solved values are read once per component with extract_values, time steps in output order
+        # Columns are kept at model resolution and expanded to hourly resolution once for the whole table
+        n_sH = len(sub_hours)
+        steps = [(Y,) + t for Y in model.Year for t in model.time_idx]
+        snapshot = {}
+
+        def series(v, idx):
+            """Time series of variable, parameter or expression v at idx"""
+            if v not in snapshot:
+                component = model.component(v)
+                if component.ctype is pyo.Var:
+                    snapshot[v] = (component.extract_values(), None)
+                elif component.ctype is pyo.Param:
+                    # Sparse parameters only hold the given values, all other indices take the default
+                    snapshot[v] = (component.extract_values(), component.default())
+                else:
+                    # extract_values of an Expression returns the expressions themselves
+                    snapshot[v] = ({k: pyo.value(e) for k, e in component.items()}, None)
+            data, default = snapshot[v]
+            return np.fromiter((data.get(idx + ts, default) for ts in steps), dtype=np.float64, count=len(steps))
+
+        def total(v, idx_of):
+            """Sum of the time series of v over the keys given by idx_of"""
+            return sum((series(v, idx) for idx in idx_of), np.zeros(len(steps)))
+
         # Variables type 1
         for v in var1:
-            for T in model.Tech-model.StorageTech:
+            for T in model.NonStorageTech:
                 for N in model.Node:
                     # Determine output fuel of tech
-                    F1 = [F1 for F1 in model.Fuel1 if model.E_output[T,F1]][0]
+                    F1 = model.output_fuels[T][0]
                     # Get values (order of for loops is IMPORTANT)
-                    temp_values = [pyo.value(model.component(v)[N,T,F1,Y,D,H,sH]) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                    if sum([abs(v) for v in temp_values]) == 0:
+                    temp_values = series(v, (N,T,F1))
+                    if not temp_values.any():
                         continue
                     else:
                         values.append(temp_values)
@@ -2495,22 +2718,22 @@ class OptSys:
 
         # Variable type 2
         for v in var2:
-            for T in model.Tech-model.StorageTech:
+            for T in model.NonStorageTech:
                 for N in model.Node:
                     # Determine input fuel of tech
-                    F = [F for F in model.Fuel if model.E_input[T,F]][0]
+                    F = model.input_fuels[T][0]
                     # Total: sum over F1 if F_subst[F,F1]
-                    temp_values = [pyo.value(sum(model.component(v)[N,T,F,F1,Y,D,H,sH] for F1 in model.Fuel1 if model.F_subst[F,F1])) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                    if sum([abs(v) for v in temp_values]) == 0:
+                    temp_values = total(v, ((N,T,F,F1) for F1 in model.sub_fuels[F]))
+                    if not temp_values.any():
                         continue
                     else:
                         values.append(temp_values)
                         header.extend(['{}_total {} {} {}'.format(v, T, N, F)])
 
                     # Wrt. F1
-                    for F1 in (F1 for F1 in model.Fuel1 if model.F_subst[F,F1]):
-                        temp_values = [pyo.value(model.component(v)[N,T,F,F1,Y,D,H,sH]) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                        if sum([abs(v) for v in temp_values]) == 0:
+                    for F1 in model.sub_fuels[F]:
+                        temp_values = series(v, (N,T,F,F1))
+                        if not temp_values.any():
                             continue
                         else:
                             values.append(temp_values)
@@ -2518,10 +2741,11 @@ class OptSys:
 
         # Work around for auxiliary electricity demand 8eg. Compressor_LP)
         v='f_cons'; F='Electricity'
-        for T in (T for T in model.Tech if model.Aux_ed[T] > 0):
+        aux_tech = [T for T in model.Tech if pyo.value(model.Aux_ed[T]) > 0]
+        for T in aux_tech:
             for N in model.Node:
-                temp_values = [pyo.value(sum(model.component(v)[N,T,F,F1,Y,D,H,sH] for F1 in model.Fuel1 if model.F_subst[F,F1])) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                if sum([abs(v) for v in temp_values]) == 0:
+                temp_values = total(v, ((N,T,F,F1) for F1 in model.sub_fuels[F]))
+                if not temp_values.any():
                     continue
                 else:
                     values.append(temp_values)
@@ -2532,8 +2756,8 @@ class OptSys:
             for N in model.Node:
                 for F1 in model.Fuel1:
                     # Get values (order of for loops is IMPORTANT)
-                    temp_values = [pyo.value(model.component(v)[N,F1,Y,D,H,sH]) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                    if sum([abs(v) for v in temp_values]) == 0:
+                    temp_values = series(v, (N,F1))
+                    if not temp_values.any():
                         continue
                     else:
                         values.append(temp_values)
@@ -2544,17 +2768,17 @@ class OptSys:
             for N in model.Node:
                 for F in model.Fuel:
                     # Total: sum over F1 if F_subst[F,F1]
-                    temp_values = [pyo.value(sum(model.component(v)[N,F,F1,Y,D,H,sH] for F1 in model.Fuel1 if model.F_subst[F,F1])) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                    if sum([abs(v) for v in temp_values]) == 0:
+                    temp_values = total(v, ((N,F,F1) for F1 in model.sub_fuels[F]))
+                    if not temp_values.any():
                         continue
                     else:
                         values.append(temp_values)
                         header.extend(['{}_total {} {}'.format(v, N, F)])
 
                     # Wrt. F1
-                    for F1 in (F1 for F1 in model.Fuel1 if model.F_subst[F,F1]):
-                        temp_values = [pyo.value(model.component(v)[N,F,F1,Y,D,H,sH]) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                        if sum([abs(v) for v in temp_values]) == 0:
+                    for F1 in model.sub_fuels[F]:
+                        temp_values = series(v, (N,F,F1))
+                        if not temp_values.any():
                             continue
                         else:
                             values.append(temp_values)
@@ -2566,19 +2790,19 @@ class OptSys:
                 for N in model.Node:
 
                     # Determine input fuel of tech
-                    F = [F for F in model.Fuel if model.E_output[T,F]][0]
+                    F = model.output_fuels[T][0]
                     # Total: sum over F1 if F_subst[F,F1]
-                    temp_values = [pyo.value(sum(model.component(v)[N,T,F1,Y,D,H,sH] for F1 in model.Fuel1 if model.F_subst[F,F1])) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                    if sum([abs(v) for v in temp_values]) == 0:
+                    temp_values = total(v, ((N,T,F1) for F1 in model.sub_fuels[F]))
+                    if not temp_values.any():
                         continue
                     else:
                         values.append(temp_values)
                         header.extend(['{}_total {} {} {}'.format(v, T, N, F)])
 
                     # Wrt. F1
-                    for F1 in (F1 for F1 in model.Fuel1 if model.F_subst[F,F1]):
-                        temp_values = [pyo.value(model.component(v)[N,T,F1,Y,D,H,sH]) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                        if sum([abs(v) for v in temp_values]) == 0:
+                    for F1 in model.sub_fuels[F]:
+                        temp_values = series(v, (N,T,F1))
+                        if not temp_values.any():
                             continue
                         else:
                             values.append(temp_values)
@@ -2590,30 +2814,34 @@ class OptSys:
                 for N in model.Node:
 
                     # Determine input fuel of tech
-                    F = [F for F in model.Fuel if model.E_input[T,F]][0]
+                    F = model.input_fuels[T][0]
                     # Total: sum over F1 if F_subst[F,F1]
-                    temp_values = [pyo.value(sum(model.component(v)[N,T,F,F1,Y,D,H,sH] for F1 in model.Fuel1 if model.F_subst[F,F1])) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                    if sum([abs(v) for v in temp_values]) == 0:
+                    temp_values = total(v, ((N,T,F,F1) for F1 in model.sub_fuels[F]))
+                    if not temp_values.any():
                         continue
                     else:
                         values.append(temp_values)
                         header.extend(['{}_total {} {} {}'.format(v, T, N, F)])
 
                     # Wrt. F1
-                    for F1 in (F1 for F1 in model.Fuel1 if model.F_subst[F,F1]):
-                        temp_values = [pyo.value(model.component(v)[N,T,F,F1,Y,D,H,sH]) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                        if sum([abs(v) for v in temp_values]) == 0:
+                    for F1 in model.sub_fuels[F]:
+                        temp_values = series(v, (N,T,F,F1))
+                        if not temp_values.any():
                             continue
                         else:
                             values.append(temp_values)
                             header.extend(['{} {} {} {} {}'.format(v, T, N, F, F1)])
 
+        # Parameters are only written for techs that can be installed
+        max_inst_cap = model.Max_inst_cap.extract_values()
+        max_inst_cap_default = model.Max_inst_cap.default()
+
         # Parameters type 1
         for v in param1:
             for T in model.Tech:
                 for N in model.Node:
-                    if pyo.value(sum(model.Max_inst_cap[N,T,Y] for Y in model.Year)) > 0:
-                        temp_values = [model.component(v)[N,T,Y,D,H,sH] for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
+                    if any(max_inst_cap.get((N,T,Y), max_inst_cap_default) > 0 for Y in model.Year):
+                        temp_values = series(v, (N,T))
                         values.append(temp_values)
                         header.extend(['{} {} {}'.format(v, T, N)])
 
@@ -2621,8 +2849,8 @@ class OptSys:
         for v in param2:
             for F in model.Fuel:
                 for N in model.Node:
-                    temp_values = [model.component(v)[N,F,Y,D,H,sH] for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                    if sum([abs(v) for v in temp_values]) == 0:
+                    temp_values = series(v, (N,F))
+                    if not temp_values.any():
                         continue
                     else:
                         values.append(temp_values)
@@ -2631,8 +2859,8 @@ class OptSys:
         # Parameters type 3
         for v in param3:
             for F in model.Fuel:
-                temp_values = [model.component(v)[F,Y,D,H,sH] for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                if sum([abs(v) for v in temp_values]) == 0:
+                temp_values = series(v, (F,))
+                if not temp_values.any():
                     continue
                 else:
                     values.append(temp_values)
@@ -2641,11 +2869,11 @@ class OptSys:
         # Parameters type 4
         for v in param4:
             for StoreT in model.StorageTech:
-                F = [F for F in model.Fuel if model.E_output[StoreT,F]][0]
+                F = model.output_fuels[StoreT][0]
                 for N in model.Node:
 
-                    temp_values = [pyo.value(model.component(v)[N,StoreT,F,Y,D,H,sH]) for Y in model.Year for D in model.Day for H in model.Hour for _ in range(pyo.value(model.Delta_H)) for sH in model.SubHour]
-                    if sum([abs(v) for v in temp_values]) == 0:
+                    temp_values = series(v, (N,StoreT,F))
+                    if not temp_values.any():
                         continue
                     else:
                         values.append(temp_values)
@@ -2653,13 +2881,14 @@ class OptSys:
 
 
 
-        value_array = np.array(values).transpose()
+        # Repeat every hour Delta_H times (note above)
+        table = np.column_stack(values)
+        table = np.repeat(table.reshape(-1, 1, n_sH, table.shape[1]), delta_H, axis=1).reshape(-1, table.shape[1])
 
-        table = np.column_stack((timestamp_str, value_array))
+        df = pd.DataFrame(table, index=pd.Index(timestamp_str, name=header[0]), columns=header[1:])
 
-        file = open(self.repository + file_name, "w")
-        np.savetxt(file, table, fmt='%s', header=';'.join(header), delimiter=';', comments='')
-        file.close()
+        with open(self.repository + file_name, 'w', newline='') as file:
+            df.to_csv(file, sep=';', index=True, header=True, lineterminator='\n')
 
         dt = datetime.now() - start
         logger_main.info('\tDuration: {}min {}sec'.format(int(dt.total_seconds()/60), round(dt.total_seconds()%60)))
@@ -2677,20 +2906,49 @@ class OptSys:
         index = []
         value = []
 
+        def key_str(k):
+            """Index as tab separated string, tuples are joined directly"""
+            if type(k) is tuple:
+                return '\t'.join(map(str, k))
+            return '\t'.join([str(i) for i in self._make_interable(k)])
+
+        # Time series of calc_LCOEnergy are arrays instead of Params, they are written at the place of their former Params,
+        # i.e. directly before the anchor Param lcoEnergy_mean
+        # Cells without available energy are written as 0 like the former lcoEnergy Param
+        array_anchor = 'lcoEnergy_mean'
+        array_params = []
+        if hasattr(model, 'lcoEnergy_arr'):
+            lcoEnergy_cells = {k: [0 if f < self.zero_threshold else v for v, f in zip(lcoe.tolist(), model.f_node_arr[k].tolist())] for k, lcoe in model.lcoEnergy_arr.items()}
+            array_params = [('f_prod_node', {k: f_node.tolist() for k, f_node in model.f_node_arr.items()}),
+                            ('lcoEnergy', lcoEnergy_cells)]
+        time_str = [key_str(t) for t in getattr(model, 'time_idx', [])]
+
         for param in model.component_objects(pyo.Param, active=True):
+            if param.name == array_anchor:
+                for name, cells in array_params:
+                    if name in exclude:
+                        continue
+                    for k, v in cells.items():
+                        prefix = name + '\t' + key_str(k) + '\t'
+                        index.extend([prefix + t for t in time_str])
+                        value.extend(v)
+                array_params = []
 
             if param.name in exclude:
                 continue
-
             param_dict = param.extract_values()
-            index.extend([param.name + '\t' + '\t'.join([str(i) for i in self._make_interable(k)]) for k in param_dict.keys()])
+            prefix = param.name + '\t'
+            index.extend([prefix + key_str(k) for k in param_dict.keys()])
             #value.extend([round(v, round_digit) for v in param_dict.values()])
-            value.extend([v for v in param_dict.values()])
+            value.extend(param_dict.values())
 
-        table = np.column_stack((index, value))
+        if array_params:
+            raise RuntimeError('write_parameters_to_file: Param {} not found, {} cannot be written'.format(array_anchor, ', '.join(name for name, _ in array_params)))
 
+        # The index entries contain tabs themselves, so the lines are joined directly instead of through a csv writer
         file = open(self.repository + file_name, "w")
-        np.savetxt(file, table, fmt='%s', header=header, delimiter='\t', comments='#')
+        file.write('#' + header.replace('\n', '\n#') + '\n')
+        file.write(''.join('{}\t{}\n'.format(i, v) for i, v in zip(index, np.asarray(value).astype(str))))
         file.close()
 
         dt = datetime.now() - start
@@ -2714,7 +2972,7 @@ class OptSys:
             file.write('param: {} :=\n'.format(p))
             for Y in model.Year:
                 for N in model.Node:
-                    for T in model.Tech - model.StorageTech:
+                    for T in model.NonStorageTech:
                         value = pyo.value(model.inst_cap[N, T, Y])
                         file.write('{}\t{}\t{}\t{}\n'.format(N, T, Y, value))
 
@@ -2751,10 +3009,35 @@ class OptSys:
 
         values = []
 
+        # Sets as plain tuples, iterated many times by the nested loops below
+        nodes = tuple(model.Node)
+        years = tuple(model.Year)
+        techs = tuple(model.Tech)
+        storage_techs = tuple(model.StorageTech)
+        non_storage_techs = tuple(model.NonStorageTech)
+        fuels = tuple(model.Fuel)
+        fuel1 = tuple(model.Fuel1)
+
+        # Unit and conversion factor of every fuel, looked up once
+        f_units = {F: (self.unitConv[model.F_unit[F]]['newUnit'], self.unitConv[model.F_unit[F]]['conv']) for F in fuel1}
+        ref_fuels = list(model.RefFuel)
+        ref_label = ' + '.join(ref_fuels)
+
+        # Values of a component by index, read once per component instead of one pyo.value call per index
+        def dump(component):
+            if component.ctype is pyo.Var:
+                return component.extract_values()
+            if component.ctype is pyo.Param:
+                # Sparse parameters only hold the values set, all other indices take the default
+                data = dict.fromkeys(component.index_set(), pyo.value(component.default()))
+                data.update(component.extract_values())
+                return data
+            # extract_values of an Expression returns the expressions themselves
+            return {k: pyo.value(e) for k, e in component.items()}
+
         # Prices of reference fuel
-        keys = create_keys(F=' + '.join(model.RefFuel))
-        unit = self.unitConv[model.F_unit[list(model.RefFuel)[0]]]['newUnit']
-        conv = self.unitConv[model.F_unit[list(model.RefFuel)[0]]]['conv']
+        keys = create_keys(F=ref_label)
+        unit, conv = f_units[ref_fuels[0]]
 
         values.append(['Price (ref: production)'] + keys + ['EUR/{}'.format(unit), model.ref_prod_price / conv])
         values.append(['Price (ref: demand)'] + keys + ['EUR/{}'.format(unit), model.ref_demand_price / conv])
@@ -2763,25 +3046,24 @@ class OptSys:
 
         # Demand of reference fuel
         cat = 'F_demand'
-        for F in model.Fuel:
-            for Y in model.Year:
+        for F in fuels:
+            for Y in years:
                 value = pyo.value(model.F_demand_y[F, Y])
                 if value != 0 or F in model.RefFuel:
-                    unit = self.unitConv[model.F_unit[F]]['newUnit']
-                    conv = self.unitConv[model.F_unit[F]]['conv']
+                    unit, conv = f_units[F]
                     values.append([cat] + create_keys(F=F,Y=Y) + ['{}/a'.format(unit), value * conv])
 
 
         # Objective (not objective value)
-        values.append(['Objective function value'] + create_keys() + ['', round(pyo.value(model.tc_obj - sum(model.high_storage_level_incentive[StoreT] for StoreT in model.StorageTech)))])
+        values.append(['Objective function value'] + create_keys() + ['', round(pyo.value(model.tc_obj - sum(model.high_storage_level_incentive[StoreT] for StoreT in model.IncentiveStorageTech)))])
 
         # Slack balance
-        for F in model.Fuel:
+        for F in fuels:
             values.append(['Slack pos balance'] + create_keys(F=F) + [model.F_unit[F], round(pyo.value(model.slack_pos_balance[F]),2)])
             values.append(['Slack neg balance'] + create_keys(F=F) + [model.F_unit[F], round(pyo.value(model.slack_neg_balance[F]),2)])
 
         # Energy balance
-        for F1 in model.Fuel:
+        for F1 in fuels:
             values.append(['Energy balance [F1]'] + create_keys(F1=F1) + [model.F_unit[F1], round(pyo.value(model.energy_balance[F1]),2)])
 
         # Optim dimensions
@@ -2790,12 +3072,12 @@ class OptSys:
                    'Capacity sub':      'cap_sub'}
 
         for k,i in mapping.items():
-            component = model.component(i)
+            component = dump(model.component(i))
 
-            for N in model.Node:
-                for T in model.Tech:
-                    for Y in model.Year:
-                        values.append([k] + create_keys(N=N,T=T,Y=Y) + [model.T_unit[T], pyo.value(component[N,T,Y])])
+            for N in nodes:
+                for T in techs:
+                    for Y in years:
+                        values.append([k] + create_keys(N=N,T=T,Y=Y) + [model.T_unit[T], component[N,T,Y]])
 
         # Optim storage dimensions
         mapping = {'Inst Storage Capacity':     'inst_storage_vol',
@@ -2803,12 +3085,12 @@ class OptSys:
                    'Storage Capacity sub':      'storage_vol_sub'}
 
         for k,i in mapping.items():
-            component = model.component(i)
+            component = dump(model.component(i))
 
-            for N in model.Node:
-                for T in model.StorageTech:
-                    for Y in model.Year:
-                        values.append([k] + create_keys(N=N,T=T,Y=Y) + [model.St_unit[T], pyo.value(component[N,T,Y])])
+            for N in nodes:
+                for T in storage_techs:
+                    for Y in years:
+                        values.append([k] + create_keys(N=N,T=T,Y=Y) + [model.St_unit[T], component[N,T,Y]])
 
         # Costs
         mapping = {'Total_disc':         'tc',
@@ -2832,13 +3114,12 @@ class OptSys:
             values.append([k] + create_keys() + ['EUR', pyo.value(getattr(model, i))])
 
         # Discounted demand
-        unit = self.unitConv[model.F_unit[list(model.RefFuel)[0]]]['newUnit']
-        conv = self.unitConv[model.F_unit[list(model.RefFuel)[0]]]['conv']
+        unit, conv = f_units[ref_fuels[0]]
 
-        values.append(['Total_disc Production'] + create_keys(F=' + '.join(model.RefFuel)) + [unit, model.ref_prod_disc * conv])
-        values.append(['Total_disc Demand'] + create_keys(F=' + '.join(model.RefFuel)) + [unit, model.ref_demand_disc * conv])
-        values.append(['Total_disc Export'] + create_keys(F=' + '.join(model.RefFuel)) + [unit, model.ref_export_disc * conv])
-        values.append(['Total_disc Output'] + create_keys(F=' + '.join(model.RefFuel)) + [unit, model.ref_out_disc * conv])
+        values.append(['Total_disc Production'] + create_keys(F=ref_label) + [unit, model.ref_prod_disc * conv])
+        values.append(['Total_disc Demand'] + create_keys(F=ref_label) + [unit, model.ref_demand_disc * conv])
+        values.append(['Total_disc Export'] + create_keys(F=ref_label) + [unit, model.ref_export_disc * conv])
+        values.append(['Total_disc Output'] + create_keys(F=ref_label) + [unit, model.ref_out_disc * conv])
 
         # Partial costs
         mapping = {'Partial_CAPEX':     'Capex_disc',
@@ -2856,16 +3137,15 @@ class OptSys:
                    'Partial_REVENUE_timeseries':   'Revenue_timeseries_disc',
                    'Partial_TAXES': 'Opex_taxes_disc'}
 
-        unit = self.unitConv[model.F_unit[list(model.RefFuel)[0]]]['newUnit']
-        conv = self.unitConv[model.F_unit[list(model.RefFuel)[0]]]['conv']
+        unit, conv = f_units[ref_fuels[0]]
 
         if not model.ref_prod_disc == 0:
 
             for k,i in mapping.items():
-                component = model.component(i)
+                component = dump(model.component(i))
 
                 for T in component.keys():
-                    value = pyo.value(component[T]) / model.ref_prod_disc / conv
+                    value = component[T] / model.ref_prod_disc / conv
                     if value == 0:
                         continue
                     else:
@@ -2873,102 +3153,97 @@ class OptSys:
 
 
         # Annual costs
-        mapping = {'CAPEX':     'capex',
-                   'OPEX':      'opex'}
-
-        for k,i in mapping.items():
-            component = model.component(i)
-
-            for N in model.Node:
-                for T in model.Tech | model.ExternalTech:
-                    for Y in model.Year:
-                        value = pyo.value(component[N,T,Y])
-                        if value == 0: continue
-                        values.append([k] + create_keys(N=N,T=T,Y=Y) + ['EUR', value])
+        # CAPEX and OPEX in one pass over (N,T,Y), rows are collected separately to keep all CAPEX rows before the OPEX rows
+        capex = dump(model.capex)
+        opex = dump(model.opex)
+        capex_rows = []
+        opex_rows = []
+        for N in nodes:
+            for T in model.AllTech:
+                for Y in years:
+                    keys = create_keys(N=N,T=T,Y=Y)
+                    if capex[N,T,Y] != 0:
+                        capex_rows.append(['CAPEX'] + keys + ['EUR', capex[N,T,Y]])
+                    # opex only holds entries with operational costs
+                    if opex.get((N,T,Y), 0) != 0:
+                        opex_rows.append(['OPEX'] + keys + ['EUR', opex[N,T,Y]])
+        values.extend(capex_rows)
+        values.extend(opex_rows)
 
         values.append(['SUBSIDY'] + create_keys() + ['EUR', pyo.value(model.Subsidy_CAPEX)])
         values.append(['SUBSIDY_share'] + create_keys(N=N,Y=Y) + ['EUR', pyo.value(model.capex_subsidy[N,Y])])
 
-        for N in model.Node:
-            for Y in model.Year:
+        for N in nodes:
+            for Y in years:
                 values.append(['CAPEX system'] + create_keys(N=N,Y=Y) + ['EUR', pyo.value(model.capex_system[N,Y])])
                 values.append(['OPEX system'] + create_keys(N=N,Y=Y) + ['EUR/a', pyo.value(model.opex_system[N,Y])])
 
-        for F1 in model.Fuel1:
-            for Y in model.Year:
+        for F1 in fuel1:
+            for Y in years:
                 value = pyo.value(model.opex_timeseries[F1,Y])
                 if value == 0: continue
                 values.append(['OPEX_timeseries'] + create_keys(F1=F1,Y=Y) + ['EUR/a', value])
 
-        for N in model.Node:
-            for F1 in model.Fuel1:
-                for Y in model.Year:
+        for N in nodes:
+            for F1 in fuel1:
+                for Y in years:
                     value = pyo.value(model.opex_fuel[N,F1,Y])
                     if value == 0: continue
                     values.append(['OPEX fuel'] + create_keys(N=N,F1=F1,Y=Y) + ['EUR/a', value])
 
-        for N in model.Node:
-            for F in model.Fuel:
-                for Y in model.Year:
-                    if model.F_network_capacity_charge[N,F,Y] == 0: continue
-                    values.append(['OPEX network capacity'] + create_keys(N=N,F=F,Y=Y) + ['EUR/a', pyo.value(model.opex_network_capacity[N,F,Y])])
+        # Only (N,F,Y) with a capacity charge, in the order of the former N, F, Y loops
+        for N, F, Y in model.OpexNetworkCapacityIndex:
+            values.append(['OPEX network capacity'] + create_keys(N=N,F=F,Y=Y) + ['EUR/a', pyo.value(model.opex_network_capacity[N,F,Y])])
 
-        for N in model.Node:
+        opex_auxmedium = dump(model.opex_auxmedium)
+        for N in nodes:
             for A in model.AuxMedium:
-                for Y in model.Year:
-                    values.append(['OPEX aux medium'] + create_keys(N=N,F=A,Y=Y) + ['EUR/a', pyo.value(sum(model.opex_auxmedium[N,T,A,Y] for T in model.Tech-model.StorageTech))])
+                for Y in years:
+                    values.append(['OPEX aux medium'] + create_keys(N=N,F=A,Y=Y) + ['EUR/a', sum(opex_auxmedium[N,T,A,Y] for T in non_storage_techs)])
 
-        for Y in model.Year:
+        for Y in years:
             values.append(['OPEX taxes'] + create_keys(Y=Y) + ['EUR/a', pyo.value(model.Opex_taxes[Y])])
 
-        for F in model.Fuel:
-            for Y in model.Year:
+        for F in fuels:
+            for Y in years:
                 value = pyo.value(model.revenue[F,Y])
                 if value == 0: continue
-                values.append(['REVENUE'] + create_keys(F=F,Y=Y) + ['EUR/a', pyo.value(model.revenue[F,Y])])
+                values.append(['REVENUE'] + create_keys(F=F,Y=Y) + ['EUR/a', value])
 
-        for F in model.Fuel:
-            for Y in model.Year:
+        for F in fuels:
+            for Y in years:
                 value = pyo.value(model.revenue_timeseries[F,Y])
                 if value == 0: continue
                 values.append(['REVENUE_timeseries'] + create_keys(F=F,Y=Y) + ['EUR/a', value])
 
         # Annual values
-        # Annual fuel production
-        for N in model.Node:
-            for T in model.Tech - model.StorageTech:
-                for F1 in (F1 for F1 in model.Fuel1 if model.E_output[T,F1]):
-                    for Y in model.Year:
-                        unit = self.unitConv[model.F_unit[F1]]['newUnit']
-                        conv = self.unitConv[model.F_unit[F1]]['conv']
-                        value = pyo.value(model.f_prod_y[N,T,F1,Y]) * conv
-                        values.append(['Annual PRODUCTION'] + create_keys(N=N,T=T,F1=F1,Y=Y) + [unit, value])
+        # Annual values of component for keys x years as (key, year) array, converted to the unit of fuel F1 of each key
+        def annual_array(component, keys, F1_of):
+            arr = np.fromiter((component[key + (Y,)] for key in keys for Y in years), dtype=np.float64, count=len(keys) * len(years))
+            conv_vec = np.array([f_units[F1_of(key)][1] for key in keys], dtype=np.float64)
+            return arr.reshape(len(keys), len(years)) * conv_vec[:, None]
 
-        for N in model.Node:
-            for T in model.StorageTech:
-                for F in (F for F in model.Fuel if model.E_output[T,F]):
-                    for F1 in (F1 for F1 in model.Fuel1 if model.F_subst[F,F1]):
-                        for Y in model.Year:
-                            unit = self.unitConv[model.F_unit[F1]]['newUnit']
-                            conv = self.unitConv[model.F_unit[F1]]['conv']
-                            value = pyo.value(model.f_prod_y[N,T,F1,Y]) * conv
-                            values.append(['Annual PRODUCTION'] + create_keys(N=N,T=T,F1=F1,Y=Y) + [unit, value])
+        # Annual fuel production
+        f_prod_y = dump(model.f_prod_y)
+        keys = [(N, T, F1) for N in nodes for T in non_storage_techs for F1 in model.output_fuels[T]] \
+             + [(N, T, F1) for N in nodes for T in storage_techs for F in model.output_fuels[T] for F1 in model.sub_fuels[F]]
+        for (N, T, F1), row in zip(keys, annual_array(f_prod_y, keys, lambda key: key[2])):
+            unit = f_units[F1][0]
+            for Y, value in zip(years, row):
+                values.append(['Annual PRODUCTION'] + create_keys(N=N,T=T,F1=F1,Y=Y) + [unit, value])
 
         # Annual fuel consumption
-        for N in model.Node:
-            for T in model.Tech:
-                for F in (F for F in model.Fuel if model.E_input[T,F] or F == 'Electricity'):
-                    for F1 in (F1 for F1 in model.Fuel1 if model.F_subst[F,F1]):
-                        for Y in model.Year:
-                            unit = self.unitConv[model.F_unit[F1]]['newUnit']
-                            conv = self.unitConv[model.F_unit[F1]]['conv']
-                            value = pyo.value(model.f_cons_y[N,T,F,F1,Y]) * conv
-                            values.append(['Annual CONSUMPTION'] + create_keys(N=N,T=T,F=F,F1=F1,Y=Y) + [unit, value])
+        f_cons_y = dump(model.f_cons_y)
+        keys = [(N, T, F, F1) for N in nodes for T in techs for F in model.cost_fuels[T] for F1 in model.sub_fuels[F]]
+        for (N, T, F, F1), row in zip(keys, annual_array(f_cons_y, keys, lambda key: key[3])):
+            unit = f_units[F1][0]
+            for Y, value in zip(years, row):
+                values.append(['Annual CONSUMPTION'] + create_keys(N=N,T=T,F=F,F1=F1,Y=Y) + [unit, value])
 
         # Annual aux medium volume
-        for N in model.Node:
+        for N in nodes:
             for A in model.AuxMedium:
-                for Y in model.Year:
+                for Y in years:
                     values.append(['Annual VOLUME'] + create_keys(N=N,F=A,Y=Y) + ['Nm3', pyo.value(model.Aux_medium_flow_y[N,A,Y])])
 
         # Annual fuel import
@@ -2976,15 +3251,14 @@ class OptSys:
                    'Annual IMPORT_timeseries':  'f_import_timeseries_y',
                    'Annual IMPORT_fix_quantity':'f_fix_quant_import_y'}
 
+        keys = [(F1,) for F1 in fuel1]
         for k,i in mapping.items():
-            component = model.component(i)
-            for F1 in model.Fuel1:
-                for Y in model.Year:
-                    unit = self.unitConv[model.F_unit[F1]]['newUnit']
-                    conv = self.unitConv[model.F_unit[F1]]['conv']
-                    value = pyo.value(component[F1,Y]) * conv
-                    if value == 0: continue
-                    values.append([k] + create_keys(F1=F1,Y=Y) + [unit, value])
+            component = dump(model.component(i))
+            arr = annual_array(component, keys, lambda key: key[0])
+            # Only nonzero values are written, nonzero returns them in the order of the loops before
+            for r, c in zip(*np.nonzero(arr)):
+                (F1,), Y = keys[r], years[c]
+                values.append([k] + create_keys(F1=F1,Y=Y) + [f_units[F1][0], arr[r, c]])
 
         # Annual fuel export
         mapping = {'Annual EXPORT':             'f_export_y',
@@ -2992,62 +3266,59 @@ class OptSys:
                    'Annual DELIVERY':           'f_delivery_y',
                    'Annual CONS_system':        'f_supply_cons_system_y'}
 
+        keys = [(F, F1) for F in fuels for F1 in model.sub_fuels[F]]
         for k,i in mapping.items():
-            component = model.component(i)
-            for F in model.Fuel:
-                for F1 in (F1 for F1 in model.Fuel1 if model.F_subst[F,F1]):
-                    for Y in model.Year:
-                        unit = self.unitConv[model.F_unit[F1]]['newUnit']
-                        conv = self.unitConv[model.F_unit[F1]]['conv']
-                        value = pyo.value(component[F,F1,Y]) * conv
-                        if value == 0: continue
-                        values.append([k] + create_keys(F=F,F1=F1,Y=Y) + [unit, value])
+            component = dump(model.component(i))
+            arr = annual_array(component, keys, lambda key: key[1])
+            for r, c in zip(*np.nonzero(arr)):
+                (F, F1), Y = keys[r], years[c]
+                values.append([k] + create_keys(F=F,F1=F1,Y=Y) + [f_units[F1][0], arr[r, c]])
 
         # Full Load Hours
         mapping = {'FLH':           'flh',
                    'FLH possible':  'flh_possible'}
 
         for k,i in mapping.items():
-            component = getattr(model, i)
-            for N in model.Node:
-                for T in model.Tech - model.StorageTech:
-                    for Y in model.Year:
-                        values.append([k] + create_keys(N=N,T=T,Y=Y) + ['h', pyo.value(component[N,T,Y])])
+            component = dump(getattr(model, i))
+            for N in nodes:
+                for T in non_storage_techs:
+                    for Y in years:
+                        values.append([k] + create_keys(N=N,T=T,Y=Y) + ['h', component[N,T,Y]])
 
         # Storage ratio
-        for N in model.Node:
-            for T in model.StorageTech:
-                F = [F for F in model.Fuel if model.E_output[T,F]][0]
-                for Y in model.Year:
+        for N in nodes:
+            for T in storage_techs:
+                F = model.output_fuels[T][0]
+                for Y in years:
                     values.append(['STORAGE ratio'] + create_keys(N=N,T=T,F=F,Y=Y) + ['d', pyo.value(model.storage_ratio[N,T,F,Y])])
 
         # Peak demand
-        for N in model.Node:
-            for Y in model.Year:
+        for N in nodes:
+            for Y in years:
                 values.append(['peak el demand'] + create_keys(N=N,Y=Y) + ['kW', pyo.value(model.peak_el_demand[N,Y])])
 
         # Network capacity
-        for N in model.Node:
-            for F in model.Fuel:
-                for Y in model.Year:
-                    if model.F_network_capacity_charge[N,F,Y] == 0: continue
-
-                    unit = model.F_unit[F] + '/h'
-                    value = pyo.value(model.f_network_capacity[N,F,Y])
-                    values.append(['Network capacity required'] + create_keys(N=N,F=F,Y=Y) + [unit, value])
+        for N, F, Y in model.OpexNetworkCapacityIndex:
+            unit = model.F_unit[F] + '/h'
+            value = pyo.value(model.f_network_capacity[N,F,Y])
+            values.append(['Network capacity required'] + create_keys(N=N,F=F,Y=Y) + [unit, value])
 
         # Land use
-        for N in model.Node:
-            for Y in model.Year:
+        for N in nodes:
+            for Y in years:
                 values.append(['Land use'] + create_keys(N=N,Y=Y) + ['m2', pyo.value(model.land_use[N,Y])])
 
         # Min of storage levels
-        for N in model.Node:
-            for T in model.StorageTech:
-                for Y in model.Year:
-                    unit = self.unitConv[model.St_unit[T]]['newUnit']
-                    conv = self.unitConv[model.St_unit[T]]['conv']
-                    value = conv * min([pyo.value(sum(model.storage_energy_level[N,T,F1,Y,D,H,sH] for F1 in model.Fuel1)) for D in model.Day for H in model.Hour for sH in model.SubHour])
+        storage_energy_level = dump(model.storage_energy_level)
+        n_t = len(model.time_idx)
+        for N in nodes:
+            for T in storage_techs:
+                unit = self.unitConv[model.St_unit[T]]['newUnit']
+                conv = self.unitConv[model.St_unit[T]]['conv']
+                for Y in years:
+                    # Levels as (F1, time) array, summed over F1 before taking the minimum over time
+                    level = np.fromiter((storage_energy_level[(N,T,F1,Y) + ts] for F1 in fuel1 for ts in model.time_idx), dtype=np.float64, count=len(fuel1) * n_t)
+                    value = conv * level.reshape(len(fuel1), n_t).sum(axis=0).min()
                     values.append(['Min storage level'] + create_keys(N=N,T=T,Y=Y) + [unit, value])
 
 
@@ -3055,16 +3326,15 @@ class OptSys:
         if 'Electrolysis' in model.Tech:
             # Look for technologies
             cons = 'Electrolysis'
-            consumer = [T for T in model.Tech if cons.lower() in T.lower()]
-            producer = [T for T in model.Tech] + ['f_import', 'f_import_timeseries']
+            consumer = [T for T in techs if cons.lower() in T.lower()]
+            producer = [T for T in techs] + ['f_import', 'f_import_timeseries']
 
             # Considered fuel
             F='Electricity'
 
+            unit, conv = f_units[F]
             for C in consumer:
                 for P in producer:
-                    unit = self.unitConv[model.F_unit[F]]['newUnit']
-                    conv = self.unitConv[model.F_unit[F]]['conv']
                     value = conv * model.energy_share.loc[P,C]
 
                     values.append(['Consumption share'] + create_keys(T=C,F=F,F1=P) + [unit, value])
@@ -3081,31 +3351,30 @@ class OptSys:
         mapping = {'LCOEnergy ideal':   'tech_LCOEnergy_ideal',
                    'LCOEnergy':         'tech_LCOEnergy'}
         for k,i in mapping.items():
-            component = model.component(i)
-            for N in model.Node:
-                for T in model.Tech:
+            component = dump(model.component(i))
+            for N in nodes:
+                for T in techs:
 
                     if T in model.StorageTech:
-                        F_list = [F1 for F in model.Fuel if model.E_output[T,F] for F1 in model.Fuel1 if model.F_subst[F,F1]]
+                        F_list = [F1 for F in model.output_fuels[T] for F1 in model.sub_fuels[F]]
                     else:
-                        F_list = [F for F in model.Fuel if model.E_output[T,F]]
+                        F_list = model.output_fuels[T]
 
                     for F in F_list:
-                        unit = self.unitConv[model.F_unit[F]]['newUnit']
-                        conv = self.unitConv[model.F_unit[F]]['conv']
+                        unit, conv = f_units[F]
 
-                        for Y in model.Year:
-                            value = pyo.value(component[N,T,F,Y]) / conv
+                        for Y in years:
+                            value = component[N,T,F,Y] / conv
                             values.append([k] + create_keys(N=N,T=T,F=F,Y=Y) + ['EUR/{}'.format(unit), value])
 
-        for N in model.Node:
-            for T in model.Tech:
-                for F in (F for F in model.Fuel if model.E_input[T,F] or F == 'Electricity'):
-                    unit = self.unitConv[model.F_unit[F]]['newUnit']
-                    conv = self.unitConv[model.F_unit[F]]['conv']
+        tech_LCOEnergy_cons = dump(model.tech_LCOEnergy_cons)
+        for N in nodes:
+            for T in techs:
+                for F in model.cost_fuels[T]:
+                    unit, conv = f_units[F]
 
-                    for Y in model.Year:
-                        value = pyo.value(model.tech_LCOEnergy_cons[N,T,F,Y]) / conv
+                    for Y in years:
+                        value = tech_LCOEnergy_cons[N,T,F,Y] / conv
                         values.append(['LCOEnergy consumed'] + create_keys(N=N,T=T,F=F,Y=Y) + ['EUR/{}'.format(unit), value])
 
         # LCOE of exported energy
@@ -3113,63 +3382,71 @@ class OptSys:
                    'LCOEnergy exported':    'export_LCOEnergy'}
 
         for k,i in mapping.items():
-            component = model.component(i)
+            component = dump(model.component(i))
 
-            for N in model.Node:
-                for F in model.Fuel:
-                    unit = self.unitConv[model.F_unit[F]]['newUnit']
-                    conv = self.unitConv[model.F_unit[F]]['conv']
+            for N in nodes:
+                for F in fuels:
+                    unit, conv = f_units[F]
 
-                    for Y in model.Year:
-                        value = pyo.value(component[N,F,Y]) / conv
+                    for Y in years:
+                        value = component[N,F,Y] / conv
                         values.append([k] + create_keys(N=N,F=F,Y=Y) + ['EUR/{}'.format(unit), value])
 
         # Debugging (set True for debugging)
         if False:
             values.append(['--- DEBUGGING ---'] + create_keys(T='---',F='---', F1='---', N='---',Y='---') + ['----', 0])
 
-            for N in model.Node:
-                for T in model.StorageTech:
-                    for F1 in model.Fuel1:
+            for N in nodes:
+                for T in storage_techs:
+                    for F1 in fuel1:
                         values.append(['start_storage_energy_level'] + create_keys(N=N,T=T,F=F1) + ['kWh', pyo.value(model.start_storage_energy_level[N,T,F1])])
 
-            for N in model.Node:
-                for T in model.StorageTech:
-                    for F1 in model.Fuel1:
-                        values.append(['end_storage_energy_level'] + create_keys(N=N,T=T,F=F1) + ['kWh', pyo.value(model.storage_energy_level[N,T,F1,max(model.Year),max(model.Day),max(model.Hour),max(model.SubHour)])])
+            for N in nodes:
+                for T in storage_techs:
+                    for F1 in fuel1:
+                        values.append(['end_storage_energy_level'] + create_keys(N=N,T=T,F=F1) + ['kWh', pyo.value(model.storage_energy_level[N,T,F1,model.y_max,model.d_max,model.h_max,model.sh_max])])
 
 
-            for N in model.Node:
-                for T in model.StorageTech:
-                    for F1 in model.Fuel1:
-                        for Y in model.Year:
+            for N in nodes:
+                for T in storage_techs:
+                    for F1 in fuel1:
+                        for Y in years:
                             values.append(['Annual PRODUCTION'] + create_keys(N=N,T=T,F1=F1,Y=Y) + ['kWh', pyo.value(model.f_prod_y[N,T,F1,Y])])
 
             # Annual fuel consumption
-            for N in model.Node:
-                for T in model.StorageTech:
-                    for F in model.Fuel:
-                        for F1 in model.Fuel1:
-                            for Y in model.Year:
+            for N in nodes:
+                for T in storage_techs:
+                    for F in fuels:
+                        for F1 in fuel1:
+                            for Y in years:
                                 values.append(['Annual CONSUMPTION'] + create_keys(N=N,T=T,F=F,F1=F1,Y=Y) + ['kWh', pyo.value(model.f_cons_y[N,T,F,F1,Y])])
 
         # Writing of results
         # Define column keys
         sets = ['Tech', 'Fuel', 'Fuel1', 'Node', 'Year']
 
-        # Base data frame
         header = ['Category'] + sets + ['Unit', 'Value']
-        df = pd.DataFrame(values, columns=header)
+
+        # Rows are written directly instead of copying them into a data frame first
+        # Values are written as float, missing values (None, NaN) as empty field like before
+        def value_field(v):
+            return '' if v is None or v != v else float(v)
 
         files = [self.repository + file_name,
                  'scenario_collection' + os.path.sep + '{}_{}'.format(self.scenario, file_name)]
 
+        # Serialize once, both files get the same content
+        buf = io.StringIO()
+        buf.write(str(self.scenario) + '\n')
+        w = csv.writer(buf, delimiter='\t', lineterminator='\n')
+        w.writerow(header)
+        w.writerows(row[:-1] + [value_field(row[-1])] for row in values)
+        data = buf.getvalue()
+
         for file in files:
             try:
-                f = open(file, 'w')
-                f.write(str(self.scenario) + '\n')
-                df.to_csv(f, sep='\t', index=False, line_terminator='\n')
-                f.close()
+                with open(file, 'w', newline='') as f:
+                    f.write(data)
             except Exception as e:
                 print(e)
 
@@ -3207,57 +3484,37 @@ class OptSys:
 
         # Optional inputs: if input.dat is in repository than load data else raise warning
         # List content of repository
-        ls = os.listdir(self.repository)
+        ls = set(os.listdir(self.repository))
 
-        # Import data sources for F_demand
-        if data_F_demand_exo_H2.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_F_demand_exo_H2, index=(self.m.Node, self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_demand)
-        else: msg = 'Missing input: ' + str(data_F_demand_exo_H2); logger_main.warning(msg); print(msg)
+        def load_optional(filename, **kwargs):
+            if os.path.basename(filename) in ls:
+                data.load(filename=filename, **kwargs)
+            else: msg = 'Missing input: ' + str(filename); logger_main.warning(msg); print(msg)
 
-        if data_F_demand_exo_El.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_F_demand_exo_El, index=(self.m.Node, self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_demand)
-        else: msg = 'Missing input: ' + str(data_F_demand_exo_El); logger_main.warning(msg); print(msg)
+        # Import data sources for F_demand
+        load_optional(data_F_demand_exo_H2, index=(self.m.Node, self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_demand)
+        load_optional(data_F_demand_exo_El, index=(self.m.Node, self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_demand)
 
-        if data_F_demand_exo.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_F_demand_exo, index=(self.m.Node, self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_demand)
-        else: msg = 'Missing input: ' + str(data_F_demand_exo); logger_main.warning(msg); print(msg)
+        load_optional(data_F_demand_exo, index=(self.m.Node, self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_demand)
 
         # Import data for F_export_timeseries_price
-        if data_F_export_timeseries_price.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_F_export_timeseries_price, index=(self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_export_timeseries_price)
-        else: msg = 'Missing input: ' + str(data_F_export_timeseries_price); logger_main.warning(msg); print(msg)
+        load_optional(data_F_export_timeseries_price, index=(self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_export_timeseries_price)
 
         # Import data for F_import_timeseries_price
-        if data_F_import_timeseries_price.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_F_import_timeseries_price, index=(self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_import_timeseries_price)
-        else: msg = 'Missing input: ' + str(data_F_import_timeseries_price); logger_main.warning(msg); print(msg)
+        load_optional(data_F_import_timeseries_price, index=(self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_import_timeseries_price)
 
         # Import data sportmarket prices
-        if data_F_network_flow.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_F_network_flow, index=(self.m.Node, self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_network_flow)
-        else: msg = 'Missing input: ' + str(data_F_network_flow); logger_main.warning(msg); print(msg)
+        load_optional(data_F_network_flow, index=(self.m.Node, self.m.Fuel, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_network_flow)
 
         # Import data sources for Availability
-        if data_wind.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_wind, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.Availability)
-        else: msg = 'Missing input: ' + str(data_wind); logger_main.warning(msg); print(msg)
+        load_optional(data_wind, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.Availability)
+        load_optional(data_solar, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.Availability)
 
-        if data_solar.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_solar, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.Availability)
-        else: msg = 'Missing input: ' + str(data_solar); logger_main.warning(msg); print(msg)
-
-        if data_electrolysis.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_electrolysis, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.Availability)
-        else: msg = 'Missing input: ' + str(data_electrolysis); logger_main.warning(msg); print(msg)
+        load_optional(data_electrolysis, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.Availability)
 
         # Import data sources for Fixed and Variable Electricity Demand
-        if data_F_edp.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_F_edp, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_edp)
-        else: msg = 'Missing input: ' + str(data_F_edp); logger_main.warning(msg); print(msg)
-
-        if data_V_edp.split(os.path.sep)[-1] in ls:
-            data.load(filename=data_V_edp, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.V_edp)
-        else: msg = 'Missing input: ' + str(data_V_edp); logger_main.warning(msg); print(msg)
+        load_optional(data_F_edp, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.F_edp)
+        load_optional(data_V_edp, index=(self.m.Node, self.m.Tech, self.m.Year_All, self.m.Day_All, self.m.Hour, self.m.SubHour), param=self.m.V_edp)
 
         # Obligatory input:
         # Import general configuration
@@ -3267,21 +3524,11 @@ class OptSys:
             logger_main.info('Loading fixed data')
             data.load(filename=data_config_fixed)
 
-            if data_F_demand_exo_H2_fixed.split(os.path.sep)[-1] in ls:
-                data.load(filename=data_F_demand_exo_H2_fixed)
-            else: msg = 'Missing input: ' + str(data_F_demand_exo_H2_fixed); logger_main.warning(msg); print(msg)
-
-            if data_F_demand_exo_El_fixed.split(os.path.sep)[-1] in ls:
-                data.load(filename=data_F_demand_exo_El_fixed)
-            else: msg = 'Missing input: ' + str(data_F_demand_exo_El_fixed); logger_main.warning(msg); print(msg)
-
-            if data_wind_fixed.split(os.path.sep)[-1] in ls:
-                data.load(filename=data_wind_fixed)
-            else: msg = 'Missing input: ' + str(data_wind_fixed); logger_main.warning(msg); print(msg)
+            load_optional(data_F_demand_exo_H2_fixed)
+            load_optional(data_F_demand_exo_El_fixed)
 
-            if data_solar_fixed.split(os.path.sep)[-1] in ls:
-                data.load(filename=data_solar_fixed)
-            else: msg = 'Missing input: ' + str(data_solar_fixed); logger_main.warning(msg); print(msg)
+            load_optional(data_wind_fixed)
+            load_optional(data_solar_fixed)
 
         dt = datetime.now() - start
         logger_main.info('\tDuration: {}min {}sec'.format(int(dt.total_seconds()/60), round(dt.total_seconds()%60)))
@@ -3293,7 +3540,12 @@ class OptSys:
         start = datetime.now()
         logger_main.info('Create instance of abstract model')
 
-        instance = self.m.create_instance(data=self.data)
+        if self.profile:
+            # Report construction time of each component (the abstract model is only constructed here)
+            with report_timing():
+                instance = self.m.create_instance(data=self.data)
+        else:
+            instance = self.m.create_instance(data=self.data)
 
         dt = datetime.now() - start
         logger_main.info('\tDuration: {}min {}sec'.format(int(dt.total_seconds()/60), round(dt.total_seconds()%60)))
@@ -3352,12 +3604,23 @@ class OptSys:
     def store_model(self):
         start = datetime.now()
 
-        file_name = self.repository + 'model_file' + ('_fixed' if self.fixed else '') + '.pkl'
+        if self.save_method == 'values':
+            # Store only solution values, the instance is rebuilt from the input data in load_model
+            file_name = self.repository + 'model_file' + ('_fixed' if self.fixed else '') + '_values.pkl'
+            logger_main.info('Store solution values as pickle-file: {}'.format(file_name))
+
+            values = {v.name: v.extract_values() for v in self.instance.component_objects(pyo.Var, active=True)}
+            with open(file_name, mode='wb', buffering=pickle_buffer) as f:
+                pickle.dump(values, f, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            file_name = self.repository + 'model_file' + ('_fixed' if self.fixed else '') + '.pkl'
+            logger_main.info('Store model as pickle-file: {}'.format(file_name))
 
-        logger_main.info('Store model as pickle-file: {}'.format(file_name))
+            # Rules are nested functions of build_model, which only cloudpickle can serialise
+            import cloudpickle
 
-        with open(file_name, mode='wb') as f:
-            cloudpickle.dump(self.instance, f)
+            with open(file_name, mode='wb', buffering=pickle_buffer) as f:
+                cloudpickle.dump(self.instance, f, protocol=pickle.HIGHEST_PROTOCOL)
 
         dt = datetime.now() - start
         logger_main.info('\tDuration: {}min {}sec'.format(int(dt.total_seconds()/60), round(dt.total_seconds()%60)))
@@ -3365,11 +3628,26 @@ class OptSys:
 
     def load_model(self):
         start = datetime.now()
-        file_name = self.repository + 'model_file' + ('_fixed' if self.fixed else '') + '.pkl'
-        logger_main.info('Read model from pickle-file: {}'.format(file_name))
 
-        with open(file_name, mode='rb') as f:
-            model = cloudpickle.load(f)
+        if self.save_method == 'values':
+            file_name = self.repository + 'model_file' + ('_fixed' if self.fixed else '') + '_values.pkl'
+            logger_main.info('Rebuild model and read solution values from pickle-file: {}'.format(file_name))
+
+            self.m = self.build_model()
+            self.data = self.load_data()
+            model = self.create_instance()
+
+            with open(file_name, mode='rb', buffering=pickle_buffer) as f:
+                values = pickle.load(f)
+            for name, v in values.items():
+                model.component(name).set_values(v)
+        else:
+            file_name = self.repository + 'model_file' + ('_fixed' if self.fixed else '') + '.pkl'
+            logger_main.info('Read model from pickle-file: {}'.format(file_name))
+
+            # Files written by cloudpickle are read by the standard unpickler
+            with open(file_name, mode='rb', buffering=pickle_buffer) as f:
+                model = pickle.load(f)
 
         dt = datetime.now() - start
         logger_main.info('\tDuration: {}min {}sec'.format(int(dt.total_seconds()/60), round(dt.total_seconds()%60)))
@@ -3457,6 +3735,9 @@ class OptSys:
         # Enable/disable debugging mode (model saved to pickle file for separated postprocessing)
         pickle_model = False
 
+        # Save whole model ('pickle') or only solution values ('values') for separated postprocessing
+        save_method = 'pickle'
+
         # Write LP file
         write_lp = False
 
@@ -3484,7 +3765,7 @@ class OptSys:
         fixed = False
 
         # Create class
-        optSys = OptSys(scenario=scenario, fixed=fixed, pickle_model=pickle_model, write_lp=write_lp, unitConv=unitConv, start_disc=start_disc)
+        optSys = OptSys(scenario=scenario, fixed=fixed, pickle_model=pickle_model, write_lp=write_lp, unitConv=unitConv, start_disc=start_disc, save_method=save_method)
 
         # Run and build model
         if not skip_optim:
@@ -3518,7 +3799,7 @@ class OptSys:
             fixed = True
 
             # Create class
-            optSys2 = OptSys(scenario=scenario, fixed=fixed, pickle_model=pickle_model, write_lp=write_lp, unitConv=unitConv, start_disc=start_disc)
+            optSys2 = OptSys(scenario=scenario, fixed=fixed, pickle_model=pickle_model, write_lp=write_lp, unitConv=unitConv, start_disc=start_disc, save_method=save_method)
 
             # Run and build model
             try: